@@ -2317,6 +2317,12 @@ function doPost(e) {
       return r;
     }
 
+    // ── Route: Batch of row updates (PC Hub dirty-row push) ──
+    if (data.action === 'batch_update') {
+      if (!isAdminAuthed(data)) return unauthorisedResponse();
+      return handleBatchUpdate(data);
+    }
+
     // (Duplicate log_mobile_activity route removed — canonical route at ~line 1406)
 
     // ── Route: Generic send_email (Hub fallback when Brevo is down) ──
@@ -2539,7 +2545,54 @@ function doPost(e) {
 }
 
 
+/**
+ * Web app GET entry point.
+ * Wraps routeGet_() with a lightweight revision check for delta sync:
+ * when the caller passes `since` (the revision it last saw), the JSON
+ * payload is hashed and, if identical, a tiny {unchanged:true} body is
+ * returned instead of the full table. Otherwise the fresh revision is
+ * attached to the response as `_revision` so the Hub can store it.
+ */
 function doGet(e) {
+  var out = routeGet_(e);
+  var since = (e && e.parameter && e.parameter.since) ? String(e.parameter.since) : '';
+  if (!since || !out || typeof out.getContent !== 'function') return out;
+  try {
+    var body = out.getContent();
+    var parsed = JSON.parse(body);
+    if (!parsed || typeof parsed !== 'object' || parsed.status === 'error' || parsed.error) return out;
+    var revision = computeRevision_(body);
+    if (revision === since) {
+      return ContentService
+        .createTextOutput(JSON.stringify({ status: 'success', unchanged: true, _revision: revision }))
+        .setMimeType(ContentService.MimeType.JSON);
+    }
+    if (Array.isArray(parsed)) {
+      parsed = { status: 'success', data: parsed };
+    }
+    parsed._revision = revision;
+    return ContentService
+      .createTextOutput(JSON.stringify(parsed))
+      .setMimeType(ContentService.MimeType.JSON);
+  } catch (revErr) {
+    // Non-JSON routes (HTML, plain text) pass through untouched
+    return out;
+  }
+}
+
+/** MD5 hex digest of a response body — used as a cheap table revision */
+function computeRevision_(text) {
+  var digest = Utilities.computeDigest(Utilities.DigestAlgorithm.MD5, text, Utilities.Charset.UTF_8);
+  var hex = '';
+  for (var i = 0; i < digest.length; i++) {
+    var b = (digest[i] + 256) % 256;
+    hex += (b < 16 ? '0' : '') + b.toString(16);
+  }
+  return hex;
+}
+
+
+function routeGet_(e) {
   try {
   var action = (e && e.parameter && e.parameter.action) ? e.parameter.action : '';
   
@@ -21811,6 +21864,57 @@ function handleUpdateEnquiry(data) {
 }
 
 
+// ============================================
+// BATCH UPDATE — PC Hub pushes a table's dirty rows in one call
+// ============================================
+
+/**
+ * Apply a list of row updates with one of the single-row handlers.
+ * Called by PC Hub sync.py _push_rows() with
+ *   { updateAction: 'update_invoice', items: [ {...}, {...} ] }
+ * Each item is handled independently; one failing doesn't stop the rest.
+ * Returns results[i] = { ok: true } or { ok: false, error: '...' } in item order.
+ */
+function handleBatchUpdate(data) {
+  var handlers = {
+    'update_client': updateClientRow,
+    'update_invoice': handleUpdateInvoice,
+    'update_quote': handleUpdateQuote,
+    'update_enquiry': handleUpdateEnquiry
+  };
+  var action = String(data.updateAction || '');
+  var handler = handlers[action];
+  var items = data.items;
+  if (!handler || !(items instanceof Array)) {
+    return ContentService.createTextOutput(JSON.stringify({
+      status: 'error', error: 'Unsupported batch: ' + action
+    })).setMimeType(ContentService.MimeType.JSON);
+  }
+
+  var results = [];
+  for (var i = 0; i < items.length; i++) {
+    try {
+      var out = JSON.parse(handler(items[i]).getContent());
+      // Handlers report failure as status 'error' / 'not_found' (with a
+      // message) or as an error field — only 'success' means the row was written
+      if (out.error || out.status !== 'success') {
+        results.push({ ok: false, error: String(out.error || out.message || out.status) });
+      } else {
+        mirrorActionToSupabase(action, items[i]);
+        results.push({ ok: true });
+      }
+    } catch (e) {
+      Logger.log('Batch ' + action + ' item ' + i + ' error: ' + e);
+      results.push({ ok: false, error: e.toString() });
+    }
+  }
+
+  return ContentService.createTextOutput(JSON.stringify({
+    status: 'success', results: results
+  })).setMimeType(ContentService.MimeType.JSON);
+}
+
+
 // ============================================
 // MOBILE ACTIVITY LOG — Track field app actions
 // ============================================
@@ -24,6 +24,7 @@ import requests
 from datetime import datetime, timedelta
 
 from . import config
+from . import http_client
 
 log = logging.getLogger("ggm.agents")
 
@@ -186,7 +187,7 @@ def fetch_pexels_image(topic: str, fallback_query: str = "cornwall garden",
         return None
 
     try:
-        resp = requests.get(
+        resp = http_client.get(
             "https://api.pexels.com/v1/search",
             headers={"Authorization": api_key},
             params={"query": query, "per_page": 15, "orientation": "landscape"},
@@ -201,7 +202,7 @@ def fetch_pexels_image(topic: str, fallback_query: str = "cornwall garden",
                 return pick
 
         # Fallback to generic garden query
-        resp = requests.get(
+        resp = http_client.get(
             "https://api.pexels.com/v1/search",
             headers={"Authorization": api_key},
             params={"query": fallback_query, "per_page": 10, "orientation": "landscape"},
@@ -757,6 +758,17 @@ class AgentScheduler:
                         error_message="No report generated",
                     )
 
+            elif agent_type == "round_planner":
+                # Subscription round planning — proposes day changes for review
+                from .round_planner import RoundPlanner
+                result = RoundPlanner(self.db, self.api).run(config_json)
+                self.db.update_agent_run(
+                    run_id, "success",
+                    output_title=result.get("title", "Round Plan"),
+                    output_text=result.get("report", ""),
+                )
+                log.info(f"Round planner completed: {len(result.get('moves', []))} moves proposed")
+
             else:
                 self.db.update_agent_run(
                     run_id, "failed",
@@ -19,6 +19,13 @@ class APIError(Exception):
     pass
 
 
+class APIConnectionError(APIError):
+    """The webhook couldn't be reached at all (offline) — nothing will get
+    through until the connection is back. Timeouts are plain APIErrors: a
+    slow action can time out on its own while the webhook is up."""
+    pass
+
+
 class APIClient:
     """Thin wrapper around requests to call the GAS webhook."""
 
@@ -33,14 +40,20 @@ class APIClient:
     # ------------------------------------------------------------------
     # GET — read data from Sheets
     # ------------------------------------------------------------------
-    def get(self, action: str, params: dict = None) -> dict:
+    def get(self, action: str, params: dict = None, since: str = None) -> dict:
         """
         Call the webhook with a GET request.
         Returns parsed JSON response.
+
+        If ``since`` is given (a revision previously returned as
+        ``_revision``), GAS replies with ``{"unchanged": true}`` when the
+        data has not changed instead of re-sending the full payload.
         """
         query = {"action": action}
         if params:
             query.update(params)
+        if since:
+            query["since"] = since
         # Inject admin API key for authenticated endpoints
         if config.ADMIN_API_KEY:
             query["adminToken"] = config.ADMIN_API_KEY
@@ -137,7 +150,7 @@ class APIClient:
                 log.warning(f"Timeout on attempt {attempt + 1}/{max_retries}")
 
             except requests.exceptions.ConnectionError:
-                last_error = APIError("No internet connection")
+                last_error = APIConnectionError("No internet connection")
                 log.warning(f"Connection error on attempt {attempt + 1}/{max_retries}")
 
             except APIError:
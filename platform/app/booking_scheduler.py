@@ -0,0 +1,109 @@
+"""
+Booking Scheduler for GGM Hub.
+Ranks candidate dates for a new booking by how cheaply the van can serve
+it: the drive minutes it adds to that day's optimised route, then how
+full the day already is against MAX_JOBS_PER_DAY.
+
+Each candidate day is optimised as booked and again with the new stop
+added, over one distance matrix covering every stop in the window.
+Postcodes resolve through the geocode cache, so ranking a fortnight
+normally costs no API calls. Days where the new job would make an
+appointment late or run past WORK_END_HOUR sort after days it fits.
+"""
+
+import logging
+import time
+
+from . import config
+from .distance import bulk_lookup, format_drive_time
+from .distance_matrix import matrix_for_geos
+from .route_optimiser import (
+    DayRouteOptimiser, Stop, appointment_minutes, service_minutes,
+)
+
+log = logging.getLogger("ggm.booking_scheduler")
+
+
+def suggest_dates(db, postcode: str, service: str = "",
+                  days_ahead: int = None, preferred_day: str = "",
+                  exclude_weekends: bool = True, limit: int = 5) -> list[dict]:
+    """
+    Best dates to book a `service` job at `postcode`, cheapest to serve first.
+
+    Returns Database.suggest_best_dates() entries with added keys:
+        added_drive_minutes  extra driving for the day (None if unknown)
+        added_drive_text     e.g. "12 min"
+        fits                 False if the job would make the day overrun
+                             or an appointment late
+        near                 nearest job already booked that day ("" if none)
+
+    Without a postcode that geocodes, the job-count ranking is returned
+    unchanged with added_drive_minutes None.
+    """
+    days_ahead = config.BOOKING_SUGGEST_DAYS if days_ahead is None else days_ahead
+    candidates = db.suggest_best_dates(days_ahead=days_ahead,
+                                       preferred_day=preferred_day,
+                                       exclude_weekends=exclude_weekends,
+                                       limit=None)
+    for c in candidates:
+        c.update(added_drive_minutes=None, added_drive_text="", fits=True, near="")
+
+    postcode = (postcode or "").strip()
+    if not candidates or not postcode:
+        return candidates[:limit]
+
+    started = time.monotonic()
+    dates = [c["date"] for c in candidates]
+    jobs_by_date = db.get_jobs_in_range(min(dates), max(dates))
+
+    # ── Geocode the new job and every booked stop in one batch ──
+    booked = sorted({(j.get("postcode") or "").strip()
+                     for d in dates for j in jobs_by_date.get(d, [])} - {""})
+    geos = bulk_lookup([postcode] + booked)
+    new_geo = geos[0]
+    if not new_geo:
+        log.info(f"Can't geocode {postcode} — ranking dates by job count only")
+        return candidates[:limit]
+    geo_by_pc = dict(zip(booked, geos[1:]))
+
+    matrix = matrix_for_geos(geos)
+    legs = matrix.legs()
+    new_idx = matrix.index(new_geo["postcode"])
+    new_stop = Stop(new_idx, service_minutes(service))
+    # Two solves per day share the scoring budget
+    budget = config.BOOKING_SCORE_SECONDS / (2 * len(candidates))
+
+    for c in candidates:
+        day_jobs = jobs_by_date.get(c["date"], [])
+        stops, names = [], []
+        for j in day_jobs:
+            geo = geo_by_pc.get((j.get("postcode") or "").strip())
+            stops.append(Stop(matrix.index(geo["postcode"]) if geo else None,
+                              service_minutes(j.get("service", "")),
+                              appointment_minutes(j.get("time", ""))))
+            names.append(j.get("client_name") or j.get("name") or "")
+
+        before = _best_cost(legs, stops, budget)
+        after = _best_cost(legs, stops + [new_stop], budget)
+        added = after[2] - before[2]
+
+        c["added_drive_minutes"] = added
+        c["added_drive_text"] = format_drive_time(added)
+        c["fits"] = after[0] <= before[0] and after[1] <= before[1]
+
+        nearby = [(legs[s.idx][new_idx], name)
+                  for s, name in zip(stops, names) if s.idx is not None]
+        if nearby:
+            c["near"] = min(nearby)[1]
+
+    candidates.sort(key=lambda c: (not c["fits"], c["added_drive_minutes"],
+                                   c["job_count"], c["date"]))
+    log.debug(f"Ranked {len(candidates)} dates for {postcode} in "
+              f"{(time.monotonic() - started) * 1000:.0f} ms")
+    return candidates[:limit]
+
+
+def _best_cost(legs, stops: list[Stop], budget: float) -> tuple:
+    """(late, overrun, drive, finish) of the optimised route over `stops`."""
+    optimiser = DayRouteOptimiser(legs, stops, budget_seconds=budget)
+    return optimiser.cost(optimiser.solve())
@@ -99,6 +99,11 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "") or IMAP_PASSWORD  # default to IM
 # ---------------------------------------------------------------------------
 BREVO_API_KEY = os.getenv("BREVO_API_KEY", "")
 BREVO_SENDER_EMAIL = os.getenv("BREVO_SENDER_EMAIL", "info@gardnersgm.co.uk")
+# Brevo transactional API pacing — one token bucket shared by every send
+BREVO_RATE_PER_SECOND = float(os.getenv("BREVO_RATE_PER_SECOND", "10"))
+BREVO_RATE_BURST = int(os.getenv("BREVO_RATE_BURST", "20"))
+# Concurrent HTTP sends for bulk delivery (newsletters, queue drain)
+BREVO_SEND_WORKERS = int(os.getenv("BREVO_SEND_WORKERS", "4"))
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "cgardner37@icloud.com")
 ADMIN_NAME = "Chris"
 
@@ -126,6 +131,41 @@ OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "")
 # ---------------------------------------------------------------------------
 SYNC_INTERVAL_SECONDS = int(os.getenv("SYNC_INTERVAL", "300"))  # 5 minutes
 SYNC_TIMEOUT_SECONDS = int(os.getenv("SYNC_TIMEOUT", "30"))
+# Delta sync: unchanged tables are skipped, but force a full pull this often
+SYNC_FULL_REFRESH_SECONDS = int(os.getenv("SYNC_FULL_REFRESH", "3600"))  # 1 hour
+# Concurrent GAS fetches per sync cycle (keep low — GAS limits simultaneous executions)
+SYNC_MAX_WORKERS = int(os.getenv("SYNC_MAX_WORKERS", "4"))
+# Persistent outbox for writes queued to Sheets: entries drained per pass,
+# retry backoff (doubling from OUTBOX_BACKOFF_SECONDS) and the attempt
+# limit before an entry is parked as failed
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "25"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "5"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "900"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+# Dirty rows sent per batch_update call when pushing local edits
+# (each GAS execution must finish inside Apps Script's time limit)
+SYNC_PUSH_BATCH_SIZE = int(os.getenv("SYNC_PUSH_BATCH_SIZE", "25"))
+
+# ---------------------------------------------------------------------------
+# Database
+# ---------------------------------------------------------------------------
+# WAL read connections shared by fetchall/fetchone (0 = single connection)
+DB_READ_CONNECTIONS = int(os.getenv("DB_READ_CONNECTIONS", "4"))
+
+# Days ahead that subscription visits are materialised in the occurrences table
+OCCURRENCE_HORIZON_DAYS = int(os.getenv("OCCURRENCE_HORIZON_DAYS", "120"))
+
+# ---------------------------------------------------------------------------
+# Outbound HTTP (shared pooled client — app/http_client.py)
+# ---------------------------------------------------------------------------
+# Read timeout used when a caller doesn't pass one; connects give up sooner
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+# Retries for connection errors/timeouts and 429/5xx on idempotent requests
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF", "0.5"))
+# Keep-alive connections kept open per host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
 
 # ---------------------------------------------------------------------------
 # Supabase (PostgreSQL — replaces Google Sheets as primary database)
@@ -134,6 +174,8 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY", "")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 USE_SUPABASE = bool(SUPABASE_URL and SUPABASE_SERVICE_KEY)
+# Rows per bulk upsert request when mirroring to Supabase after a sync
+SUPABASE_MIRROR_BATCH = int(os.getenv("SUPABASE_MIRROR_BATCH", "500"))
 
 # ---------------------------------------------------------------------------
 # Xero Accounting Integration (v5.0.0)
@@ -274,10 +316,25 @@ SPEED_MODERATE = 28     # B-roads, village roads
 SPEED_A_ROAD = 35       # A30, A38, A39
 WINDING_FACTOR = 1.35   # Cornwall roads are rarely straight
 
+# Persistent geocode cache — postcodes rarely move; unknown ones are retried
+GEOCODE_TTL_DAYS = int(os.getenv("GEOCODE_TTL_DAYS", "365"))
+GEOCODE_NEGATIVE_TTL_DAYS = int(os.getenv("GEOCODE_NEGATIVE_TTL_DAYS", "7"))
+
 # Working day
 WORK_START_HOUR = 8     # 08:00
 WORK_END_HOUR = 17      # 17:00
 MAX_JOBS_PER_DAY = 5
+# Time budget for 2-opt/Or-opt improvement of a day's route (route_optimiser.py)
+ROUTE_OPTIMISE_SECONDS = float(os.getenv("ROUTE_OPTIMISE_SECONDS", "0.5"))
+# New-booking date ranking by added drive time (booking_scheduler.py)
+BOOKING_SUGGEST_DAYS = int(os.getenv("BOOKING_SUGGEST_DAYS", "14"))
+BOOKING_SCORE_SECONDS = float(os.getenv("BOOKING_SCORE_SECONDS", "2.0"))
+# Subscription round planning (round_planner.py) — 4 weeks covers weekly,
+# fortnightly and 4-weekly cycles; moves must save this much driving a week
+ROUND_PLAN_WEEKS = 4
+ROUND_PLAN_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+ROUND_PLAN_MIN_SAVING_MINUTES = int(os.getenv("ROUND_PLAN_MIN_SAVING_MINUTES", "5"))
+ROUND_PLAN_SECONDS = float(os.getenv("ROUND_PLAN_SECONDS", "30"))
 
 # Invoice PDFs - saved to E: drive on Node 1 (PC Hub)
 # Falls back to platform/data/invoices if E: drive not available
@@ -407,6 +464,11 @@ AGENT_TYPES = {
         "description": "Drafts newsletters with seasonal tips and company news",
         "icon": "📨",
     },
+    "round_planner": {
+        "label": "🗺️ Round Planner",
+        "description": "Proposes subscription day changes that cut weekly driving",
+        "icon": "🗺️",
+    },
 }
 
 AGENT_SCHEDULE_TYPES = ["Daily", "Weekly", "Fortnightly", "Monthly"]
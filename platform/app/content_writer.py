@@ -10,10 +10,10 @@ Cornwall-based gardener who genuinely cares about his customers.
 import logging
 import re
 import random
-import requests
 from datetime import datetime
 
 from . import config
+from . import http_client
 from . import llm
 
 log = logging.getLogger("ggm.content")
@@ -354,7 +354,7 @@ def _fetch_cornwall_weather() -> str:
     Falls back to season-based defaults if API fails.
     """
     try:
-        resp = requests.get(
+        resp = http_client.get(
             "https://api.open-meteo.com/v1/forecast",
             params={
                 "latitude": 50.27,   # Cornwall (Truro area)
@@ -5,23 +5,31 @@ All data is stored locally for instant access; sync engine handles cloud updates
 """
 
 import sqlite3
+import hashlib
 import json
 import logging
+import queue
+import re
 import shutil
 import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from . import config
 
 log = logging.getLogger("ggm.db")
 
 # ──────────────────────────────────────────────────────────────────
-# Schema version — bump this when adding migrations
+# Schema version — stored in PRAGMA user_version. Bump this when adding
+# an entry to Database.MIGRATIONS.
 # ──────────────────────────────────────────────────────────────────
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 15
 
+# Baseline schema (migration 1). New tables, columns and indexes belong in
+# a new Database.MIGRATIONS entry so existing installs pick them up.
 SCHEMA_SQL = """
 -- ─── Clients / Jobs (from Jobs sheet) ─────────────────────────
 CREATE TABLE IF NOT EXISTS clients (
@@ -812,14 +820,22 @@ CREATE INDEX IF NOT EXISTS idx_inbox_msgid ON inbox(message_id);
 class Database:
     """SQLite database manager with CRUD operations.
 
-    Thread-safe: all execute/commit operations are protected by an RLock
-    to prevent concurrent access from UI, sync, email, and agent threads.
+    Thread-safe: all execute/commit operations go through a single writer
+    connection protected by an RLock. fetchall/fetchone use a small pool
+    of WAL read connections, so UI reads never wait behind a sync write
+    (a thread with its own uncommitted writes reads from the writer so it
+    still sees them).
     """
 
     def __init__(self, db_path: Path = None):
         self.db_path = db_path or config.DB_PATH
         self.conn: Optional[sqlite3.Connection] = None
         self._lock = threading.RLock()
+        self._columns_cache: dict[str, set] = {}
+        self._readers: Optional[queue.LifoQueue] = None
+        self._reader_conns: list[sqlite3.Connection] = []
+        self._txn_owner: Optional[int] = None
+        self._dirty_listeners: list[Callable[[str], None]] = []
 
     # ------------------------------------------------------------------
     # Connection lifecycle
@@ -835,93 +851,216 @@ class Database:
         self.conn.execute("PRAGMA journal_mode=WAL")
         self.conn.execute("PRAGMA foreign_keys=ON")
         self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute("PRAGMA temp_store=MEMORY")  # bulk upsert staging
+        self._open_readers(config.DB_READ_CONNECTIONS)
         log.info(f"Database opened: {self.db_path}")
 
+    def _open_readers(self, count: int):
+        """Open the pool of read-only WAL connections."""
+        if count <= 0:
+            return
+        pool = queue.LifoQueue()
+        try:
+            for _ in range(count):
+                rc = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+                rc.row_factory = sqlite3.Row
+                rc.execute("PRAGMA busy_timeout=5000")
+                rc.execute("PRAGMA query_only=ON")
+                self._reader_conns.append(rc)
+                pool.put(rc)
+        except Exception as e:
+            log.warning(f"Read pool unavailable, using the writer for reads: {e}")
+            self._close_readers()
+            return
+        self._readers = pool
+
+    def _close_readers(self):
+        self._readers = None
+        for rc in self._reader_conns:
+            try:
+                rc.close()
+            except Exception:
+                pass
+        self._reader_conns = []
+
     def close(self):
         """Close the database connection."""
+        self._close_readers()
         if self.conn:
             self.conn.close()
             self.conn = None
             log.info("Database closed")
 
+    # ------------------------------------------------------------------
+    # Schema migrations
+    # ------------------------------------------------------------------
+    # (version, description, method). Each pending migration runs once, in
+    # its own transaction, then PRAGMA user_version is set to its version.
+    MIGRATIONS = [
+        (1, "baseline schema and legacy column additions", "_migrate_baseline"),
+        (2, "unique natural-key indexes for bulk sync upserts", "_ensure_sync_key_indexes"),
+        (3, "row_hash columns and sync_log change counters", "_migrate_row_hashes"),
+        (4, "normalised client-name index for the day view join", "_migrate_client_name_key"),
+        (5, "materialised subscription occurrences", "_migrate_occurrences"),
+        (6, "trigger-maintained search index over six entities", "_install_search_index"),
+        (7, "trigger-maintained revenue/KPI aggregates", "_install_kpi_buckets"),
+        (8, "normalised email/type keys and dedup indexes on email_tracking", "_migrate_email_tracking_keys"),
+        (9, "persistent postcode geocode cache", "_migrate_geocode_cache"),
+        (10, "content hashes of rows mirrored to Supabase", "_migrate_mirror_state"),
+        (11, "durable outbox for writes queued to Sheets", "_migrate_outbox"),
+        (12, "partial indexes on locally-modified rows awaiting push", "_migrate_dirty_indexes"),
+        (13, "occurrence queue triggers that survive an outer upsert", "_migrate_occurrence_triggers"),
+        (14, "clear row_hash on local edits to wholesale-reloaded tables", "_migrate_local_edit_hash_reset"),
+        (15, "clear row_hash on local edits to keyed sync tables", "_migrate_local_edit_hash_reset"),
+    ]
+
+    # Columns added to the baseline tables before versioned migrations
+    _LEGACY_COLUMNS = [
+        ("invoices", "job_number", "TEXT DEFAULT ''"),
+        ("invoices", "stripe_invoice_id", "TEXT DEFAULT ''"),
+        ("invoices", "payment_url", "TEXT DEFAULT ''"),
+        ("invoices", "payment_method", "TEXT DEFAULT ''"),
+        ("job_photos", "job_number", "TEXT DEFAULT ''"),
+        ("job_photos", "drive_url", "TEXT DEFAULT ''"),
+        ("job_photos", "drive_file_id", "TEXT DEFAULT ''"),
+        ("job_photos", "telegram_file_id", "TEXT DEFAULT ''"),
+        ("job_photos", "source", "TEXT DEFAULT 'local'"),
+        ("subscribers", "tier", "TEXT DEFAULT 'Free'"),
+        ("clients", "waste_collection", "TEXT DEFAULT 'Not Set'"),
+        ("business_costs", "waste_disposal", "REAL DEFAULT 0"),
+        ("business_costs", "treatment_products", "REAL DEFAULT 0"),
+        ("business_costs", "consumables", "REAL DEFAULT 0"),
+        ("email_tracking", "provider", "TEXT DEFAULT ''"),
+        ("email_tracking", "message_id", "TEXT DEFAULT ''"),
+        # Schedule table alignment with GAS Schedule sheet (v4.6.0)
+        ("schedule", "email", "TEXT DEFAULT ''"),
+        ("schedule", "package", "TEXT DEFAULT ''"),
+        ("schedule", "preferred_day", "TEXT DEFAULT ''"),
+        ("schedule", "parent_job", "TEXT DEFAULT ''"),
+        ("schedule", "distance", "TEXT DEFAULT ''"),
+        ("schedule", "drive_time", "TEXT DEFAULT ''"),
+        ("schedule", "google_maps", "TEXT DEFAULT ''"),
+        ("schedule", "created_by", "TEXT DEFAULT ''"),
+        # Enquiry photos & discount codes (v4.3.0)
+        ("enquiries", "photo_urls", "TEXT DEFAULT ''"),
+        ("enquiries", "discount_code", "TEXT DEFAULT ''"),
+        # Enquiry garden details + location (v4.8.0)
+        ("enquiries", "garden_details", "TEXT DEFAULT ''"),
+        ("enquiries", "address", "TEXT DEFAULT ''"),
+        ("enquiries", "postcode", "TEXT DEFAULT ''"),
+        ("enquiries", "preferred_date", "TEXT DEFAULT ''"),
+        ("enquiries", "preferred_time", "TEXT DEFAULT ''"),
+        # Quote ↔ Job ↔ Enquiry linkage (v4.9.0)
+        ("quotes", "job_number", "TEXT DEFAULT ''"),
+        ("quotes", "enquiry_id", "INTEGER DEFAULT 0"),
+        ("quotes", "enquiry_message", "TEXT DEFAULT ''"),
+        ("clients", "quote_number", "TEXT DEFAULT ''"),
+        ("enquiries", "quote_number", "TEXT DEFAULT ''"),
+        # Deposit/payment tracking (v4.9.1)
+        ("clients", "payment_type", "TEXT DEFAULT ''"),
+        ("clients", "deposit_amount", "REAL DEFAULT 0"),
+        # Xero/accounting readiness (v5.0.0)
+        ("invoices", "subtotal", "REAL DEFAULT 0"),
+        ("invoices", "vat_rate", "REAL DEFAULT 20.0"),
+        ("invoices", "vat_amount", "REAL DEFAULT 0"),
+        ("invoices", "currency", "TEXT DEFAULT 'GBP'"),
+        ("invoices", "xero_invoice_id", "TEXT DEFAULT ''"),
+        ("invoices", "payment_terms", "TEXT DEFAULT 'DueOnReceipt'"),
+        ("invoices", "reference", "TEXT DEFAULT ''"),
+        ("invoices", "is_finalised", "INTEGER DEFAULT 0"),
+        ("business_costs", "category", "TEXT DEFAULT ''"),
+        ("business_costs", "xero_account_code", "TEXT DEFAULT ''"),
+        ("business_costs", "receipt_url", "TEXT DEFAULT ''"),
+        ("business_costs", "vat_amount", "REAL DEFAULT 0"),
+        # Inbox soft-delete (v5.0.1)
+        ("inbox", "is_deleted", "INTEGER DEFAULT 0"),
+        # PDF invoice storage (v5.0.2)
+        ("invoices", "pdf_path", "TEXT DEFAULT ''"),
+        # Enquiry service extraction (v5.0.3)
+        ("enquiries", "service", "TEXT DEFAULT ''"),
+    ]
+
     def initialize(self):
-        """Create tables and run migrations."""
-        self.conn.executescript(SCHEMA_SQL)
-        self.conn.commit()
-
-        # ── Migrations — add columns to existing tables ──
-        migrations = [
-            ("invoices", "job_number", "TEXT DEFAULT ''"),
-            ("invoices", "stripe_invoice_id", "TEXT DEFAULT ''"),
-            ("invoices", "payment_url", "TEXT DEFAULT ''"),
-            ("invoices", "payment_method", "TEXT DEFAULT ''"),
-            ("job_photos", "job_number", "TEXT DEFAULT ''"),
-            ("job_photos", "drive_url", "TEXT DEFAULT ''"),
-            ("job_photos", "drive_file_id", "TEXT DEFAULT ''"),
-            ("job_photos", "telegram_file_id", "TEXT DEFAULT ''"),
-            ("job_photos", "source", "TEXT DEFAULT 'local'"),
-            ("subscribers", "tier", "TEXT DEFAULT 'Free'"),
-            ("clients", "waste_collection", "TEXT DEFAULT 'Not Set'"),
-            ("business_costs", "waste_disposal", "REAL DEFAULT 0"),
-            ("business_costs", "treatment_products", "REAL DEFAULT 0"),
-            ("business_costs", "consumables", "REAL DEFAULT 0"),
-            ("email_tracking", "provider", "TEXT DEFAULT ''"),
-            ("email_tracking", "message_id", "TEXT DEFAULT ''"),
-            # Schedule table alignment with GAS Schedule sheet (v4.6.0)
-            ("schedule", "email", "TEXT DEFAULT ''"),
-            ("schedule", "package", "TEXT DEFAULT ''"),
-            ("schedule", "preferred_day", "TEXT DEFAULT ''"),
-            ("schedule", "parent_job", "TEXT DEFAULT ''"),
-            ("schedule", "distance", "TEXT DEFAULT ''"),
-            ("schedule", "drive_time", "TEXT DEFAULT ''"),
-            ("schedule", "google_maps", "TEXT DEFAULT ''"),
-            ("schedule", "created_by", "TEXT DEFAULT ''"),
-            # Enquiry photos & discount codes (v4.3.0)
-            ("enquiries", "photo_urls", "TEXT DEFAULT ''"),
-            ("enquiries", "discount_code", "TEXT DEFAULT ''"),
-            # Enquiry garden details + location (v4.8.0)
-            ("enquiries", "garden_details", "TEXT DEFAULT ''"),
-            ("enquiries", "address", "TEXT DEFAULT ''"),
-            ("enquiries", "postcode", "TEXT DEFAULT ''"),
-            ("enquiries", "preferred_date", "TEXT DEFAULT ''"),
-            ("enquiries", "preferred_time", "TEXT DEFAULT ''"),
-            # Quote ↔ Job ↔ Enquiry linkage (v4.9.0)
-            ("quotes", "job_number", "TEXT DEFAULT ''"),
-            ("quotes", "enquiry_id", "INTEGER DEFAULT 0"),
-            ("quotes", "enquiry_message", "TEXT DEFAULT ''"),
-            ("clients", "quote_number", "TEXT DEFAULT ''"),
-            ("enquiries", "quote_number", "TEXT DEFAULT ''"),
-            # Deposit/payment tracking (v4.9.1)
-            ("clients", "payment_type", "TEXT DEFAULT ''"),
-            ("clients", "deposit_amount", "REAL DEFAULT 0"),
-            # Xero/accounting readiness (v5.0.0)
-            ("invoices", "subtotal", "REAL DEFAULT 0"),
-            ("invoices", "vat_rate", "REAL DEFAULT 20.0"),
-            ("invoices", "vat_amount", "REAL DEFAULT 0"),
-            ("invoices", "currency", "TEXT DEFAULT 'GBP'"),
-            ("invoices", "xero_invoice_id", "TEXT DEFAULT ''"),
-            ("invoices", "payment_terms", "TEXT DEFAULT 'DueOnReceipt'"),
-            ("invoices", "reference", "TEXT DEFAULT ''"),
-            ("invoices", "is_finalised", "INTEGER DEFAULT 0"),
-            ("business_costs", "category", "TEXT DEFAULT ''"),
-            ("business_costs", "xero_account_code", "TEXT DEFAULT ''"),
-            ("business_costs", "receipt_url", "TEXT DEFAULT ''"),
-            ("business_costs", "vat_amount", "REAL DEFAULT 0"),
-            # Inbox soft-delete (v5.0.1)
-            ("inbox", "is_deleted", "INTEGER DEFAULT 0"),
-            # PDF invoice storage (v5.0.2)
-            ("invoices", "pdf_path", "TEXT DEFAULT ''"),
-            # Enquiry service extraction (v5.0.3)
-            ("enquiries", "service", "TEXT DEFAULT ''"),
-        ]
-        for table, col, col_type in migrations:
+        """Create tables and run any pending migrations."""
+        self._run_migrations()
+
+        # Seed default data
+        self.seed_expense_categories()
+
+    def _run_migrations(self):
+        """Apply every migration newer than PRAGMA user_version, in order.
+        Each runs in a single transaction; timings are recorded in
+        schema_migrations."""
+        conn = self.conn
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        pending = [m for m in self.MIGRATIONS if m[0] > current]
+        if not pending:
+            log.info(f"Database schema up to date (v{current})")
+            return
+
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS schema_migrations (
+                version     INTEGER PRIMARY KEY,
+                description TEXT DEFAULT '',
+                applied_at  TEXT DEFAULT '',
+                duration_ms REAL DEFAULT 0
+            )"""
+        )
+        conn.commit()
+
+        for version, description, method in pending:
+            started = time.perf_counter()
             try:
-                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
-                log.info(f"Migration: added {table}.{col}")
+                conn.execute("BEGIN")
+                getattr(self, method)()
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_migrations "
+                    "(version, description, applied_at, duration_ms) VALUES (?, ?, ?, ?)",
+                    (version, description, datetime.now().isoformat(), round(elapsed_ms, 1)),
+                )
+                conn.commit()
             except Exception:
-                pass  # Column already exists
+                conn.rollback()
+                log.exception(f"Migration v{version} failed: {description}")
+                raise
+            log.info(f"Migration v{version} applied in {elapsed_ms:.0f} ms: {description}")
+        self._columns_cache.clear()
+
+        log.info(f"Database schema initialized (v{SCHEMA_VERSION})")
 
-        # Create indices that depend on migrated columns
+    @staticmethod
+    def _split_sql(script: str) -> list[str]:
+        """Split a SQL script into complete statements (executescript would
+        commit, so migrations run statements one by one)."""
+        statements, buf = [], ""
+        for line in script.splitlines(keepends=True):
+            buf += line
+            if sqlite3.complete_statement(buf):
+                if buf.strip():
+                    statements.append(buf.strip())
+                buf = ""
+        if buf.strip() and not buf.strip().startswith("--"):
+            statements.append(buf.strip())
+        return statements
+
+    def _add_column(self, table: str, col: str, col_type: str):
+        """ALTER TABLE ADD COLUMN unless the column already exists."""
+        existing = {r[1] for r in self.conn.execute(f"PRAGMA table_info({table})")}
+        if col not in existing:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
+            log.info(f"Migration: added {table}.{col}")
+
+    def _migrate_baseline(self):
+        """v1 — SCHEMA_SQL plus the columns/indexes older installs gained
+        via the pre-versioning ALTER TABLE loop. Idempotent, so databases
+        created before user_version was tracked are brought level."""
+        for stmt in self._split_sql(SCHEMA_SQL):
+            self.conn.execute(stmt)
+        for table, col, col_type in self._LEGACY_COLUMNS:
+            self._add_column(table, col, col_type)
+        # Indices that depend on migrated columns
         for idx_sql in [
             "CREATE INDEX IF NOT EXISTS idx_invoices_job ON invoices(job_number)",
             "CREATE INDEX IF NOT EXISTS idx_photos_job ON job_photos(job_number)",
@@ -929,16 +1068,210 @@ class Database:
             "CREATE INDEX IF NOT EXISTS idx_quotes_enquiry ON quotes(enquiry_id)",
             "CREATE INDEX IF NOT EXISTS idx_clients_quote ON clients(quote_number)",
         ]:
-            try:
-                self.conn.execute(idx_sql)
-            except Exception:
-                pass
-        self.conn.commit()
+            self.conn.execute(idx_sql)
+
+    def _migrate_row_hashes(self):
+        """v3 — content hash column on synced tables + sync_log counters."""
+        for table, col, col_type in [
+        # Content hash for skip-unchanged sync upserts
+        ("clients", "row_hash", "TEXT DEFAULT ''"),
+        ("schedule", "row_hash", "TEXT DEFAULT ''"),
+        ("invoices", "row_hash", "TEXT DEFAULT ''"),
+        ("quotes", "row_hash", "TEXT DEFAULT ''"),
+        ("business_costs", "row_hash", "TEXT DEFAULT ''"),
+        ("savings_pots", "row_hash", "TEXT DEFAULT ''"),
+        ("enquiries", "row_hash", "TEXT DEFAULT ''"),
+        ("blog_posts", "row_hash", "TEXT DEFAULT ''"),
+        ("job_photos", "row_hash", "TEXT DEFAULT ''"),
+        ("job_tracking", "row_hash", "TEXT DEFAULT ''"),
+        ("subscribers", "row_hash", "TEXT DEFAULT ''"),
+        ("complaints", "row_hash", "TEXT DEFAULT ''"),
+        ("vacancies", "row_hash", "TEXT DEFAULT ''"),
+        ("applications", "row_hash", "TEXT DEFAULT ''"),
+        ("products", "row_hash", "TEXT DEFAULT ''"),
+        ("orders", "row_hash", "TEXT DEFAULT ''"),
+        # Per-sync change counters
+        ("sync_log", "inserted", "INTEGER DEFAULT 0"),
+        ("sync_log", "updated", "INTEGER DEFAULT 0"),
+        ("sync_log", "unchanged", "INTEGER DEFAULT 0"),
+        ("sync_log", "deleted", "INTEGER DEFAULT 0"),
+        ]:
+            self._add_column(table, col, col_type)
 
-        log.info(f"Database schema initialized (v{SCHEMA_VERSION})")
+    def _migrate_client_name_key(self):
+        """v4 — expression index matching schedule.client_name to clients."""
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_clients_name_key ON clients(LOWER(TRIM(name)))"
+        )
 
-        # Seed default data
-        self.seed_expense_categories()
+    def _migrate_email_tracking_keys(self):
+        """v8 — canonical email/type columns on email_tracking, kept current
+        by triggers, with composite indexes for the dedup lookups."""
+        self._add_column("email_tracking", "email_norm", "TEXT DEFAULT ''")
+        self._add_column("email_tracking", "type_norm", "TEXT DEFAULT ''")
+        norm = ("email_norm = LOWER(TRIM(COALESCE({r}.client_email, ''))), "
+                "type_norm = REPLACE(LOWER(TRIM(COALESCE({r}.email_type, ''))), '-', '_')")
+        self.conn.execute(f"UPDATE email_tracking SET {norm.format(r='email_tracking')}")
+        for stmt in self._split_sql(f"""
+CREATE TRIGGER IF NOT EXISTS trg_email_tracking_norm_ins AFTER INSERT ON email_tracking
+BEGIN
+    UPDATE email_tracking SET {norm.format(r='NEW')} WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_email_tracking_norm_upd
+AFTER UPDATE OF client_email, email_type ON email_tracking
+BEGIN
+    UPDATE email_tracking SET {norm.format(r='NEW')} WHERE id = NEW.id;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_email_tracking_dedup
+    ON email_tracking(email_norm, type_norm, status, sent_at);
+CREATE INDEX IF NOT EXISTS idx_email_tracking_type_status
+    ON email_tracking(type_norm, status, sent_at, email_norm);
+"""):
+            self.conn.execute(stmt)
+
+    def _migrate_geocode_cache(self):
+        """v9 — postcodes.io results kept across restarts. found = 0 rows
+        are negative entries for postcodes the API doesn't recognise."""
+        for stmt in self._split_sql("""
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    postcode    TEXT PRIMARY KEY,
+    lat         REAL,
+    lng         REAL,
+    parish      TEXT DEFAULT '',
+    district    TEXT DEFAULT '',
+    found       INTEGER NOT NULL DEFAULT 1,
+    fetched_at  TEXT NOT NULL
+) WITHOUT ROWID;
+"""):
+            self.conn.execute(stmt)
+
+    def _migrate_mirror_state(self):
+        """v10 — hash of each row's last successful Supabase mirror, keyed
+        by the remote table's natural key, so unchanged rows are skipped."""
+        for stmt in self._split_sql("""
+CREATE TABLE IF NOT EXISTS mirror_state (
+    table_name  TEXT NOT NULL,
+    row_key     TEXT NOT NULL,
+    hash        TEXT NOT NULL,
+    mirrored_at TEXT NOT NULL,
+    PRIMARY KEY (table_name, row_key)
+) WITHOUT ROWID;
+"""):
+            self.conn.execute(stmt)
+
+    def _migrate_outbox(self):
+        """v11 — writes waiting to be pushed to Sheets, so they survive a
+        restart or a spell offline. Drained oldest first by SyncEngine."""
+        for stmt in self._split_sql("""
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    action       TEXT NOT NULL,
+    payload      TEXT NOT NULL,
+    coalesce_key TEXT DEFAULT '',
+    status       TEXT NOT NULL DEFAULT 'pending',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error   TEXT DEFAULT '',
+    created_at   TEXT NOT NULL,
+    updated_at   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt, id);
+CREATE INDEX IF NOT EXISTS idx_outbox_coalesce ON outbox(coalesce_key)
+    WHERE coalesce_key != '';
+"""):
+            self.conn.execute(stmt)
+
+    # Tables whose dirty rows SyncEngine pushes back to Sheets
+    DIRTY_PUSH_TABLES = ("clients", "invoices", "quotes", "enquiries", "email_preferences")
+
+    def _migrate_dirty_indexes(self):
+        """v12 — partial indexes so the push scans for ``dirty = 1`` only
+        touch the handful of rows edited since the last push."""
+        for table in self.DIRTY_PUSH_TABLES:
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_dirty ON {table}(id) WHERE dirty = 1"
+            )
+
+    def _migrate_occurrences(self):
+        """v5 — occurrences table, change queue and the clients triggers
+        that feed it. The table is filled by refresh_occurrences()."""
+        for stmt in self._split_sql("""
+CREATE TABLE IF NOT EXISTS occurrences (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id   INTEGER NOT NULL,
+    date        TEXT NOT NULL,
+    source      TEXT DEFAULT 'subscription',
+    status      TEXT DEFAULT 'scheduled',
+    UNIQUE(client_id, date, source)
+);
+CREATE INDEX IF NOT EXISTS idx_occurrences_date ON occurrences(date, source);
+
+CREATE TABLE IF NOT EXISTS occurrence_queue (
+    client_id   INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_clients_occ_delete AFTER DELETE ON clients
+BEGIN
+    DELETE FROM occurrences WHERE client_id = OLD.id;
+    DELETE FROM occurrence_queue WHERE client_id = OLD.id;
+END;
+"""):
+            self.conn.execute(stmt)
+        for stmt in self._split_sql(self._OCC_QUEUE_TRIGGERS):
+            self.conn.execute(stmt)
+        self.conn.execute("DELETE FROM app_settings WHERE key = 'occurrences_window'")
+
+    # Triggers queueing subscription clients for refresh_occurrences().
+    # ON CONFLICT DO NOTHING rather than INSERT OR IGNORE: a trigger's OR
+    # clause is overridden by the outer statement's conflict handling, so
+    # under _bulk_upsert's upsert a queued client raised UNIQUE failed.
+    _OCC_QUEUE_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_clients_occ_insert AFTER INSERT ON clients
+WHEN LOWER(NEW.type) = 'subscription'
+BEGIN
+    INSERT INTO occurrence_queue (client_id) VALUES (NEW.id)
+        ON CONFLICT(client_id) DO NOTHING;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_clients_occ_update
+AFTER UPDATE OF type, status, preferred_day, frequency, date ON clients
+WHEN LOWER(OLD.type) = 'subscription' OR LOWER(NEW.type) = 'subscription'
+BEGIN
+    INSERT INTO occurrence_queue (client_id) VALUES (NEW.id)
+        ON CONFLICT(client_id) DO NOTHING;
+END;
+"""
+
+    def _migrate_occurrence_triggers(self):
+        """v13 — recreate the occurrence queue triggers (see
+        _OCC_QUEUE_TRIGGERS) on databases migrated before the fix."""
+        self.conn.execute("DROP TRIGGER IF EXISTS trg_clients_occ_insert")
+        self.conn.execute("DROP TRIGGER IF EXISTS trg_clients_occ_update")
+        for stmt in self._split_sql(self._OCC_QUEUE_TRIGGERS):
+            self.conn.execute(stmt)
+
+    # Tables reloaded from Sheets by _bulk_replace, which trusts the stored
+    # row_hash to skip unchanged rows; the SYNC_KEYS tables are added by v15
+    # (_bulk_upsert skips rows whose stored hash matches)
+    _HASH_RESET_TABLES = ("schedule", "enquiries", "complaints", "vacancies",
+                          "applications", "products", "orders", "subscribers")
+
+    def _migrate_local_edit_hash_reset(self):
+        """v14/v15 — a local UPDATE that leaves row_hash alone (e.g. dispatch
+        marking a visit Completed, or a blog status change) clears it, so
+        the next pull no longer sees the row as matching Sheets and
+        reconciles it."""
+        for table in (*self._HASH_RESET_TABLES, *self.SYNC_KEYS):
+            self.conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_local_edit
+                AFTER UPDATE ON {table}
+                WHEN NEW.row_hash IS OLD.row_hash AND COALESCE(OLD.row_hash, '') != ''
+                BEGIN
+                    UPDATE {table} SET row_hash = '' WHERE id = NEW.id;
+                END
+            """)
 
     # ------------------------------------------------------------------
     # Pending Deletes — tombstone registry
@@ -1038,24 +1371,322 @@ class Database:
     def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
         with self._lock:
             self._ensure_connected()
-            return self.conn.execute(sql, params)
+            was_open = self.conn.in_transaction
+            cursor = self.conn.execute(sql, params)
+            self._note_txn(was_open)
+            return cursor
+
+    @contextmanager
+    def _reader(self):
+        """Yield a connection for a read.
+        Pooled WAL readers never block on the writer lock. Falls back to the
+        writer when there is no pool, or when this thread has uncommitted
+        writes it must be able to read back."""
+        readers = self._readers
+        if readers is None or (
+            self._txn_owner == threading.get_ident()
+            and self.conn is not None and self.conn.in_transaction
+        ):
+            with self._lock:
+                self._ensure_connected()
+                yield self.conn
+            return
+        rc = readers.get()
+        try:
+            yield rc
+        finally:
+            readers.put(rc)
 
     def fetchall(self, sql: str, params: tuple = ()) -> list[dict]:
-        with self._lock:
-            self._ensure_connected()
-            cursor = self.conn.execute(sql, params)
+        with self._reader() as conn:
+            cursor = conn.execute(sql, params)
             return [dict(row) for row in cursor.fetchall()]
 
     def fetchone(self, sql: str, params: tuple = ()) -> Optional[dict]:
-        with self._lock:
-            self._ensure_connected()
-            cursor = self.conn.execute(sql, params)
+        with self._reader() as conn:
+            cursor = conn.execute(sql, params)
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    def executemany(self, sql: str, seq_of_params) -> sqlite3.Cursor:
+        with self._lock:
+            self._ensure_connected()
+            was_open = self.conn.in_transaction
+            cursor = self.conn.executemany(sql, seq_of_params)
+            self._note_txn(was_open)
+            return cursor
+
+    def _note_txn(self, was_open: bool):
+        """Remember which thread opened the writer's current transaction
+        (caller holds the lock)."""
+        if self.conn.in_transaction and not was_open:
+            self._txn_owner = threading.get_ident()
+
     def commit(self):
         with self._lock:
             self.conn.commit()
+            self._txn_owner = None
+
+    def add_dirty_listener(self, callback: Callable[[str], None]):
+        """Call ``callback(table)`` whenever a local save marks a row dirty
+        (after the commit), e.g. to wake the sync engine's push."""
+        self._dirty_listeners.append(callback)
+
+    def _notify_dirty(self, table: str):
+        for callback in self._dirty_listeners:
+            try:
+                callback(table)
+            except Exception as e:
+                log.warning(f"Dirty listener failed for {table}: {e}")
+
+    # ------------------------------------------------------------------
+    # Bulk upsert engine (sync write path)
+    # ------------------------------------------------------------------
+    # Natural key of each Sheets-synced table: (key columns, predicate).
+    # Each gets a partial UNIQUE index so upserts can use ON CONFLICT; the
+    # predicate excludes local-only rows (no sheets_row / blank number).
+    SYNC_KEYS = {
+        "clients": (("sheets_row",), "typeof(sheets_row) = 'integer' AND sheets_row > 0"),
+        "invoices": (("invoice_number",), "invoice_number != ''"),
+        "quotes": (("quote_number",), "quote_number != ''"),
+        "business_costs": (("month",), "month != ''"),
+        "job_photos": (("job_number", "drive_file_id"),
+                       "job_number != '' AND drive_file_id != ''"),
+        # Already UNIQUE in the schema
+        "blog_posts": (("post_id",), ""),
+        "savings_pots": (("name",), ""),
+        "job_tracking": (("job_ref", "start_time"), ""),
+    }
+
+    def _ensure_sync_key_indexes(self):
+        """v2 — partial UNIQUE indexes for SYNC_KEYS.
+        Older databases may hold duplicate keys left by the per-row upsert;
+        those are collapsed to the newest row first. If that is blocked
+        (e.g. a foreign key), the index is skipped and _bulk_upsert falls
+        back to its non-ON-CONFLICT path for that table."""
+        for table, (keys, where) in self.SYNC_KEYS.items():
+            if not where:
+                continue
+            key_sql = ", ".join(keys)
+            self.conn.execute("SAVEPOINT sync_key")
+            try:
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE {where} AND id NOT IN ("
+                    f"SELECT MAX(id) FROM {table} WHERE {where} GROUP BY {key_sql})"
+                )
+                self.conn.execute(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{table}_sync_key "
+                    f"ON {table}({key_sql}) WHERE {where}"
+                )
+            except Exception as e:
+                self.conn.execute("ROLLBACK TO sync_key")
+                log.warning(f"Could not create unique sync key on {table}: {e}")
+            self.conn.execute("RELEASE sync_key")
+
+    def _table_columns(self, table: str) -> set:
+        """Column names of a table (cached)."""
+        cols = self._columns_cache.get(table)
+        if cols is None:
+            cols = {r["name"] for r in self.fetchall(f"PRAGMA table_info({table})")}
+            self._columns_cache[table] = cols
+        return cols
+
+    def _stage_rows(self, table: str, rows: list[dict], extra: tuple = ()) -> tuple[str, list]:
+        """Load rows into a fresh TEMP table with one executemany.
+        Returns (stage table name, columns). Caller must hold the lock."""
+        known = self._table_columns(table)
+        cols = [c for c in dict.fromkeys(k for r in rows for k in r)
+                if c in known and c != "id"]
+        stage = f"_stage_{table}"
+        self.conn.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+        self.conn.execute(f"CREATE TEMP TABLE {stage} ({', '.join(cols + list(extra))})")
+        if rows:
+            placeholders = ", ".join("?" for _ in range(len(cols) + len(extra)))
+            self.conn.executemany(
+                f"INSERT INTO temp.{stage} VALUES ({placeholders})",
+                ([r.get(c) for c in cols] + [r.get(x) for x in extra] for r in rows),
+            )
+        return stage, cols
+
+    # Bookkeeping fields left out of the content hash
+    _HASH_IGNORE = frozenset({"id", "dirty", "last_synced", "updated_at", "row_hash", "_apply"})
+
+    @classmethod
+    def _row_hash(cls, row: dict) -> str:
+        """Stable content hash of a mapped sync row."""
+        payload = json.dumps(
+            [(k, row[k]) for k in sorted(row) if k not in cls._HASH_IGNORE],
+            default=str, separators=(",", ":"),
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _bulk_upsert(self, table: str, rows: list[dict],
+                     skip: Callable[[dict], bool] = None,
+                     delete_stale_where: str = None) -> dict:
+        """
+        Set-based upsert of synced rows on the table's SYNC_KEYS key.
+
+        Rows are staged into a temp table with a single executemany and
+        applied with one INSERT ... ON CONFLICT DO UPDATE, all inside one
+        transaction. Each row carries a content hash (row_hash); rows whose
+        hash matches the stored one are left untouched, so an unchanged
+        pull writes nothing. Rows for which ``skip(row)`` is true are not
+        written but still count as present in Sheets. If
+        ``delete_stale_where`` is given, local rows matching it whose key
+        is not in the batch are deleted (e.g. "dirty = 0").
+
+        Returns {"inserted", "updated", "unchanged", "deleted"} counts.
+        """
+        keys, where = self.SYNC_KEYS[table]
+        key_sql = ", ".join(keys)
+        key_where = where or "1"
+        now = datetime.now().isoformat()
+        for row in rows:
+            row["row_hash"] = self._row_hash(row)
+            row["last_synced"] = now
+            row["dirty"] = 0
+            row["_apply"] = 0 if (skip and skip(row)) else 1
+
+        with self._lock:
+            self._ensure_connected()
+            try:
+                stage, cols = self._stage_rows(table, rows, extra=("_apply",))
+                col_sql = ", ".join(cols)
+                match = " AND ".join(f"s.{k} = {table}.{k}" for k in keys)
+                hashed = "row_hash" in cols
+
+                # Classify the batch before applying it
+                same = f" AND {table}.row_hash = s.row_hash" if hashed else " AND 0"
+                total, inserted, unchanged = self.conn.execute(
+                    f"SELECT COUNT(*),"
+                    f" COALESCE(SUM(NOT EXISTS (SELECT 1 FROM {table} WHERE {match})), 0),"
+                    f" COALESCE(SUM(EXISTS (SELECT 1 FROM {table} WHERE {match}{same})), 0)"
+                    f" FROM temp.{stage} s WHERE _apply = 1 AND ({key_where})"
+                ).fetchone()
+
+                updates = [c for c in cols if c not in keys]
+                source = (f"SELECT {col_sql} FROM temp.{stage}"
+                          f" WHERE _apply = 1 AND ({key_where}) ORDER BY rowid")
+                changed = f" WHERE {table}.row_hash IS NOT excluded.row_hash" if hashed else ""
+                try:
+                    self.conn.execute(
+                        f"INSERT INTO {table} ({col_sql}) {source} "
+                        f"ON CONFLICT({key_sql}){' WHERE ' + where if where else ''} "
+                        f"DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in updates)}"
+                        f"{changed}"
+                    )
+                except sqlite3.OperationalError as e:
+                    if "ON CONFLICT" not in str(e):
+                        raise
+                    self._bulk_upsert_without_index(
+                        table, stage, cols, keys, key_where)
+
+                deleted = 0
+                if delete_stale_where and rows:
+                    # Only when the batch carried at least one usable key
+                    cur = self.conn.execute(
+                        f"DELETE FROM {table} WHERE ({delete_stale_where})"
+                        f" AND ({key_where}) AND NOT EXISTS ("
+                        f"SELECT 1 FROM temp.{stage} s WHERE {match})"
+                        f" AND EXISTS (SELECT 1 FROM temp.{stage} WHERE {key_where})"
+                    )
+                    deleted = cur.rowcount
+                    if deleted:
+                        log.info("Removed %d stale %s rows not in Sheets", deleted, table)
+
+                self.conn.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                for row in rows:
+                    row.pop("_apply", None)
+
+        return {
+            "inserted": inserted,
+            "updated": total - inserted - unchanged,
+            "unchanged": unchanged,
+            "deleted": deleted,
+        }
+
+    def _bulk_upsert_without_index(self, table: str, stage: str, cols: list,
+                                   keys: tuple, key_where: str):
+        """Fallback for tables whose unique sync-key index could not be
+        created: one UPDATE ... FROM plus one INSERT ... WHERE NOT EXISTS."""
+        match = " AND ".join(f"s.{k} = {table}.{k}" for k in keys)
+        updates = [c for c in cols if c not in keys]
+        changed = f" AND {table}.row_hash IS NOT s.row_hash" if "row_hash" in cols else ""
+        # Last staged row per key wins, as with ON CONFLICT
+        latest = (f"SELECT * FROM temp.{stage} WHERE rowid IN ("
+                  f"SELECT MAX(rowid) FROM temp.{stage}"
+                  f" WHERE _apply = 1 AND ({key_where}) GROUP BY {', '.join(keys)})")
+        self.conn.execute(
+            f"UPDATE {table} SET {', '.join(f'{c} = s.{c}' for c in updates)}"
+            f" FROM ({latest}) AS s WHERE {match}{changed}"
+        )
+        col_sql = ", ".join(cols)
+        self.conn.execute(
+            f"INSERT INTO {table} ({col_sql}) SELECT {col_sql} FROM ({latest}) AS s"
+            f" WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {match})"
+        )
+
+    def _bulk_replace(self, table: str, rows: list[dict], keep_where: str = None) -> dict:
+        """
+        Make a keyless synced table match the incoming rows in one
+        transaction. Rows are matched on content hash: identical rows are
+        left in place, missing ones deleted and new ones inserted with one
+        executemany, so an unchanged pull writes nothing. Rows matching
+        ``keep_where`` (e.g. unpushed local edits) are never touched.
+
+        Returns {"inserted", "updated", "unchanged", "deleted"} counts.
+        """
+        now = datetime.now().isoformat()
+        for row in rows:
+            row["row_hash"] = self._row_hash(row)
+            row["last_synced"] = now
+            row["dirty"] = 0
+        with self._lock:
+            self._ensure_connected()
+            try:
+                sql = f"SELECT id, row_hash FROM {table}"
+                if keep_where:
+                    sql += f" WHERE NOT ({keep_where})"
+                by_hash: dict[str, list] = {}
+                for rid, h in self.conn.execute(sql).fetchall():
+                    by_hash.setdefault(h or "", []).append(rid)
+
+                to_insert = []
+                for row in rows:
+                    ids = by_hash.get(row["row_hash"])
+                    if ids:
+                        ids.pop()
+                    else:
+                        to_insert.append(row)
+                stale = [rid for ids in by_hash.values() for rid in ids]
+
+                if stale:
+                    self.conn.executemany(
+                        f"DELETE FROM {table} WHERE id = ?", ((rid,) for rid in stale))
+                if to_insert:
+                    known = self._table_columns(table)
+                    cols = [c for c in dict.fromkeys(k for r in to_insert for k in r)
+                            if c in known and c != "id"]
+                    placeholders = ", ".join("?" for _ in cols)
+                    self.conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({placeholders})",
+                        ([r.get(c) for c in cols] for r in to_insert),
+                    )
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return {
+            "inserted": len(to_insert),
+            "updated": 0,
+            "unchanged": len(rows) - len(to_insert),
+            "deleted": len(stale),
+        }
 
     # ------------------------------------------------------------------
     # Clients
@@ -1168,63 +1799,126 @@ class Database:
         """Get all bookings (one-off + recurring subscriptions + schedule) within a date range.
         Returns dict of date_str -> list[booking_dict].
         """
-        by_date = {}
+        return self.get_jobs_in_range(start_date, end_date)
+
+    # Client fields merged onto schedule rows (the schedule sheet lacks them)
+    _SCHEDULE_CLIENT_FIELDS = (
+        "email", "phone", "price", "job_number", "paid", "deposit_amount",
+        "type", "frequency", "sheets_row", "waste_collection", "stripe_customer_id",
+    )
+
+    def get_jobs_in_range(self, start_date: str, end_date: str) -> dict:
+        """Merged day view for every date in [start_date, end_date].
+
+        Returns dict of date_str -> list[job_dict] sorted by time, built from
+        three set-based queries regardless of range length:
+          1. schedule rows, joined to their client record on the normalised
+             name key (LOWER(TRIM(name)), expression-indexed)
+          2. one-off client bookings dated in range
+          3. subscription visits from the occurrences table
+        Every schedule row is kept (a client can have two visits in a day);
+        per date, client and subscription entries are skipped when that
+        client name is already listed, preferring schedule > client >
+        subscription.
+        """
+        try:
+            range_start = date.fromisoformat(start_date)
+            range_end = date.fromisoformat(end_date)
+        except (ValueError, TypeError):
+            return {}
+        end_excl = (range_end + timedelta(days=1)).isoformat()
 
-        # 1. One-off clients with an actual date in range
-        client_bookings = self.fetchall(
-            """SELECT id, name, service, date, time, status, price, postcode, type, paid,
-                       frequency, preferred_day
-               FROM clients
-               WHERE date >= ? AND date <= ? AND date != ''
-               ORDER BY date ASC, time ASC""",
-            (start_date, end_date)
-        )
-        for b in client_bookings:
-            d = self._normalise_date(b.get("date", ""))
-            if d:
-                entry = dict(b)
-                entry["date"] = d
-                by_date.setdefault(d, []).append(entry)
-
-        # 2. Recurring subscriptions — generate dates from preferred_day + frequency
-        subs = self.fetchall(
-            """SELECT id, name, service, time, status, price, postcode, type, paid,
-                       frequency, preferred_day, date
-               FROM clients
-               WHERE type IN ('Subscription', 'subscription')
-                 AND status NOT IN ('Cancelled', 'Complete', 'Completed')
-                 AND preferred_day != ''"""
+        joined = ", ".join(f"c.{f} AS c_{f}" for f in self._SCHEDULE_CLIENT_FIELDS)
+        schedule_jobs = self.fetchall(
+            f"""SELECT s.*, 'schedule' as source, c.id AS c_id, {joined}
+                FROM schedule s
+                LEFT JOIN clients c ON s.client_name != '' AND c.id = (
+                    SELECT MIN(id) FROM clients
+                    WHERE LOWER(TRIM(name)) = LOWER(TRIM(s.client_name)))
+                WHERE s.date >= ? AND s.date < ?
+                ORDER BY s.date ASC, s.time ASC""",
+            (start_date, end_excl)
         )
-        recurring = self._generate_recurring_dates(subs, start_date, end_date)
-        for d, entries in recurring.items():
-            by_date.setdefault(d, []).extend(entries)
-
-        # 3. Schedule table entries
-        schedule_bookings = self.fetchall(
-            """SELECT id, client_name as name, service, date, time, status, 'schedule' as source
-               FROM schedule
-               WHERE date >= ? AND date <= ?
+        client_jobs = self.fetchall(
+            """SELECT *, 'client' as source FROM clients
+               WHERE date >= ? AND date < ?
+                 AND LOWER(status) NOT IN ('cancelled', 'completed', 'complete')
                ORDER BY date ASC, time ASC""",
-            (start_date, end_date)
+            (start_date, end_excl)
         )
-        for s in schedule_bookings:
-            d = self._normalise_date(s.get("date", ""))
-            if d:
-                entry = dict(s)
-                entry["date"] = d
-                by_date.setdefault(d, []).append(entry)
-
-        # Sort each day's entries by time
-        for d in by_date:
-            by_date[d].sort(key=lambda x: x.get("time", "99:99"))
 
+        by_date: dict[str, list] = {}
+        seen: dict[str, set] = {}
+
+        def add(d: str, name: str, job: dict, always: bool = False):
+            key = (name or "").strip().lower()
+            names = seen.setdefault(d, set())
+            if key in names and not always:
+                return
+            names.add(key)
+            by_date.setdefault(d, []).append(job)
+
+        # Schedule entries first — enriched with the matching client record
+        for j in schedule_jobs:
+            d = self._normalise_date(j.get("date", ""))
+            client_fields = {f: j.pop(f"c_{f}") for f in self._SCHEDULE_CLIENT_FIELDS}
+            client_id = j.pop("c_id")
+            j["schedule_id"] = j.get("id")
+            j["name"] = j.get("client_name", "")
+            if client_id is not None:
+                j["client_id"] = client_id
+                for f, v in client_fields.items():
+                    if f in ("email", "phone") and j.get(f):
+                        continue
+                    j[f] = v
+            else:
+                j["waste_collection"] = "Not Set"
+            add(d, j["name"], j, always=True)
+
+        # One-off clients
+        for cj in client_jobs:
+            d = self._normalise_date(cj.get("date", ""))
+            add(d, cj["name"], {
+                "id": cj["id"],
+                "client_name": cj["name"],
+                "name": cj["name"],
+                "service": cj["service"],
+                "date": d,
+                "time": cj["time"],
+                "postcode": cj["postcode"],
+                "address": cj.get("address", ""),
+                "phone": cj["phone"],
+                "email": cj.get("email", ""),
+                "status": cj["status"],
+                "notes": cj.get("notes", ""),
+                "source": "client",
+                "price": cj.get("price", 0),
+                "job_number": cj.get("job_number", ""),
+                "type": cj.get("type", ""),
+                "paid": cj.get("paid", ""),
+                "deposit_amount": cj.get("deposit_amount", 0),
+                "waste_collection": cj.get("waste_collection", "Not Set"),
+            })
+
+        # Recurring subscriptions (materialised occurrences)
+        for d, entries in sorted(self.get_occurrences_in_range(
+                range_start.isoformat(), range_end.isoformat()).items()):
+            for sj in entries:
+                add(d, sj["name"], sj)
+
+        for d in by_date:
+            by_date[d].sort(key=lambda j: j.get("time", "99:99"))
         return by_date
 
     def _generate_recurring_dates(self, subs: list[dict],
                                   start_date: str, end_date: str) -> dict:
-        """Generate calendar entries for recurring subscriptions within a date range."""
-        from datetime import timedelta
+        """Generate calendar entries for recurring subscriptions within a date range.
 
+        Visits fall on the preferred weekday every ``frequency`` weeks. The
+        cycle is anchored on the client's start date (or a fixed reference
+        week when it has none), so a fortnightly client lands on the same
+        weeks whatever range is asked for.
+        """
         day_map = {
             "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
             "friday": 4, "saturday": 5, "sunday": 6,
@@ -1247,7 +1941,7 @@ class Database:
 
         for sub in subs:
             pref_day = str(sub.get("preferred_day", "")).strip().lower()
-            freq = str(sub.get("frequency", "weekly")).strip().lower()
+            freq = str(sub.get("frequency", "weekly") or "weekly").strip().lower()
             target_weekday = day_map.get(pref_day)
 
             if target_weekday is None:
@@ -1257,31 +1951,226 @@ class Database:
             if interval == 0:
                 continue  # One-off, skip
 
-            # Find first occurrence of the preferred weekday on or after range_start
-            current = range_start
-            days_ahead = (target_weekday - current.weekday()) % 7
-            current = current + timedelta(days=days_ahead)
+            try:
+                anchor = date.fromisoformat(self._normalise_date(sub.get("date", "")))
+            except ValueError:
+                anchor = self._RECURRENCE_EPOCH
+            anchor += timedelta(days=(target_weekday - anchor.weekday()) % 7)
+
+            # First occurrence of the preferred weekday on or after range_start
+            current = range_start + timedelta(days=(target_weekday - range_start.weekday()) % 7)
+            if current < anchor:
+                current = anchor
+            else:
+                # Step forward onto the client's own cycle
+                offset = ((current - anchor).days // 7) % interval
+                if offset:
+                    current += timedelta(weeks=interval - offset)
 
             while current <= range_end:
                 d = current.isoformat()
-                # Avoid duplicating if this client already has a one-off booking on this date
-                entry = {
-                    "id": sub["id"],
-                    "name": sub.get("name", ""),
-                    "service": sub.get("service", ""),
-                    "date": d,
-                    "time": sub.get("time", ""),
-                    "status": sub.get("status", "Active"),
-                    "price": sub.get("price", 0),
-                    "postcode": sub.get("postcode", ""),
-                    "type": "Subscription",
-                    "recurring": True,
-                }
-                by_date.setdefault(d, []).append(entry)
+                by_date.setdefault(d, []).append(self._subscription_entry(sub, d))
                 current += timedelta(weeks=interval)
 
         return by_date
 
+    # Reference week for subscriptions without a start date (a Monday)
+    _RECURRENCE_EPOCH = date(2024, 1, 1)
+
+    @staticmethod
+    def _subscription_entry(sub: dict, d: str) -> dict:
+        """Day-view entry for one visit of a subscription client."""
+        return {
+            "id": sub["id"],
+            "client_name": sub.get("name", ""),
+            "name": sub.get("name", ""),
+            "service": sub.get("service", ""),
+            "date": d,
+            "time": sub.get("time", ""),
+            "postcode": sub.get("postcode", ""),
+            "address": sub.get("address", ""),
+            "phone": sub.get("phone", ""),
+            "email": sub.get("email", ""),
+            "status": sub.get("status", "Active"),
+            "notes": sub.get("notes", ""),
+            "source": "subscription",
+            "price": sub.get("price", 0),
+            "job_number": sub.get("job_number", ""),
+            "type": sub.get("type", "Subscription"),
+            "paid": sub.get("paid", ""),
+            "deposit_amount": sub.get("deposit_amount", 0),
+            "frequency": sub.get("frequency", ""),
+            "preferred_day": sub.get("preferred_day", ""),
+            "waste_collection": sub.get("waste_collection", "Not Set"),
+            "recurring": True,
+        }
+
+    def get_active_subscriptions(self) -> list[dict]:
+        """Subscription clients with a visiting day that aren't cancelled."""
+        return self.fetchall(f"{self._ACTIVE_SUBS_SQL} ORDER BY name ASC")
+
+    def get_subscription_visit_dates(self, sub: dict, start_date: str, end_date: str,
+                                     preferred_day: str = None) -> list[str]:
+        """Visit dates for one subscription in [start_date, end_date],
+        or the dates it would get if moved to ``preferred_day``."""
+        if preferred_day is not None:
+            sub = dict(sub, preferred_day=preferred_day)
+        return sorted(self._generate_recurring_dates([sub], start_date, end_date))
+
+    # ------------------------------------------------------------------
+    # Subscription occurrences — materialised recurring visits
+    # ------------------------------------------------------------------
+    # Visits are expanded once into the occurrences table over a rolling
+    # window. Triggers on clients queue a subscription for re-expansion
+    # when its type/status/day/frequency/start date changes (any write
+    # path, including sync). The sync thread drains the queue; reads never
+    # write, and expand still-queued clients on the fly instead.
+
+    _ACTIVE_SUBS_SQL = """SELECT * FROM clients
+               WHERE LOWER(type) = 'subscription'
+                 AND LOWER(status) NOT IN ('cancelled', 'completed', 'complete')
+                 AND preferred_day != ''"""
+
+    def _expand_occurrences(self, subs: list[dict], start: date, end: date) -> int:
+        """Insert subscription occurrences for ``subs`` in [start, end]."""
+        if start > end or not subs:
+            return 0
+        expanded = self._generate_recurring_dates(subs, start.isoformat(), end.isoformat())
+        rows = [(e["id"], d) for d, entries in expanded.items() for e in entries]
+        self.executemany(
+            "INSERT OR IGNORE INTO occurrences (client_id, date, source) "
+            "VALUES (?, ?, 'subscription')",
+            rows,
+        )
+        return len(rows)
+
+    def refresh_occurrences(self, full: bool = False):
+        """Bring the occurrences table up to date.
+
+        Drains the change queue (re-expanding those clients from today
+        onwards) and rolls the horizon forward to today +
+        OCCURRENCE_HORIZON_DAYS. ``full`` rebuilds the whole window.
+        Past occurrences are kept as a record of what was scheduled.
+        """
+        today = date.today()
+        horizon = today + timedelta(days=config.OCCURRENCE_HORIZON_DAYS)
+        window = None if full else self._occurrence_window()
+        if window and window[1] >= horizon and not self.fetchone(
+                "SELECT 1 FROM occurrence_queue LIMIT 1"):
+            return
+
+        with self._lock:
+            if window is None:
+                # Start of last month, so the calendar can look back a page
+                win_from = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+                self.execute("DELETE FROM occurrences WHERE source = 'subscription'")
+                self.execute("DELETE FROM occurrence_queue")
+                count = self._expand_occurrences(
+                    self.fetchall(self._ACTIVE_SUBS_SQL), win_from, horizon)
+                log.info(f"Occurrences rebuilt: {count} visits "
+                         f"{win_from.isoformat()} → {horizon.isoformat()}")
+            else:
+                win_from, win_to = window
+                queued = [r["client_id"] for r in self.fetchall(
+                    "SELECT client_id FROM occurrence_queue")]
+                if queued:
+                    marks = ",".join("?" * len(queued))
+                    redo_from = max(today, win_from)
+                    self.execute(
+                        f"DELETE FROM occurrences WHERE source = 'subscription' "
+                        f"AND date >= ? AND client_id IN ({marks})",
+                        (redo_from.isoformat(), *queued),
+                    )
+                    self._expand_occurrences(
+                        self.fetchall(f"{self._ACTIVE_SUBS_SQL} AND id IN ({marks})",
+                                      tuple(queued)),
+                        redo_from, win_to,
+                    )
+                    self.execute(
+                        f"DELETE FROM occurrence_queue WHERE client_id IN ({marks})",
+                        tuple(queued),
+                    )
+                if win_to < horizon:
+                    self._expand_occurrences(
+                        self.fetchall(self._ACTIVE_SUBS_SQL),
+                        win_to + timedelta(days=1), horizon)
+            self.execute(
+                "INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)",
+                ("occurrences_window", f"{win_from.isoformat()}|{horizon.isoformat()}"),
+            )
+            self.commit()
+
+    def _occurrence_window(self) -> Optional[tuple]:
+        """(from, to) dates covered by the occurrences table, or None."""
+        raw = self.get_setting("occurrences_window")
+        try:
+            lo, hi = raw.split("|")
+            return date.fromisoformat(lo), date.fromisoformat(hi)
+        except ValueError:
+            return None
+
+    def get_occurrences_in_range(self, start_date: str, end_date: str) -> dict:
+        """Subscription visits in [start_date, end_date] as date_str -> entries.
+
+        Read-only, so UI loaders never wait on the writer. Dates inside
+        the materialised window come from an indexed range query; anything
+        outside it, and clients still in occurrence_queue (from today on,
+        as refresh_occurrences would redo them), are expanded on the fly.
+        """
+        try:
+            range_start = date.fromisoformat(start_date)
+            range_end = date.fromisoformat(end_date)
+        except (ValueError, TypeError):
+            return {}
+        win_from, win_to = self._occurrence_window() or (range_end, range_start)
+        today = date.today().isoformat()
+
+        by_date: dict[str, list] = {}
+        lo, hi = max(range_start, win_from), min(range_end, win_to)
+        if lo <= hi:
+            for row in self.fetchall(
+                """SELECT o.date AS occ_date, c.* FROM occurrences o
+                   JOIN clients c ON c.id = o.client_id
+                   WHERE o.source = 'subscription' AND o.status != 'cancelled'
+                     AND o.date BETWEEN ? AND ?
+                     AND NOT (o.date >= ? AND o.client_id IN (
+                         SELECT client_id FROM occurrence_queue))
+                   ORDER BY o.date ASC, c.time ASC""",
+                (lo.isoformat(), hi.isoformat(), today)
+            ):
+                d = row.pop("occ_date")
+                by_date.setdefault(d, []).append(self._subscription_entry(row, d))
+
+            redo_from = max(lo.isoformat(), today)
+            if redo_from <= hi.isoformat():
+                queued = self.fetchall(
+                    f"{self._ACTIVE_SUBS_SQL} AND id IN "
+                    f"(SELECT client_id FROM occurrence_queue) ORDER BY time ASC")
+                for d, entries in self._generate_recurring_dates(
+                        queued, redo_from, hi.isoformat()).items():
+                    by_date.setdefault(d, []).extend(entries)
+
+        # Outside the window (e.g. browsing old months) — expand in Python
+        gaps = [(range_start, min(range_end, win_from - timedelta(days=1))),
+                (max(range_start, win_to + timedelta(days=1)), range_end)]
+        if lo > hi:
+            gaps = [(range_start, range_end)]
+        gaps = [(a, b) for a, b in gaps if a <= b]
+        if gaps:
+            subs = self.fetchall(f"{self._ACTIVE_SUBS_SQL} ORDER BY time ASC")
+            for a, b in gaps:
+                for d, entries in self._generate_recurring_dates(
+                        subs, a.isoformat(), b.isoformat()).items():
+                    by_date.setdefault(d, []).extend(entries)
+        return by_date
+
+    def get_recurring_revenue_forecast(self, start_date: str, end_date: str) -> dict:
+        """Projected subscription visits and revenue for a date range."""
+        visits = self.get_occurrences_in_range(start_date, end_date)
+        count = sum(len(v) for v in visits.values())
+        revenue = sum(float(e.get("price") or 0) for v in visits.values() for e in v)
+        return {"visits": count, "revenue": round(revenue, 2)}
+
     @staticmethod
     def _normalise_date(val: str) -> str:
         """Normalise a date string to YYYY-MM-DD."""
@@ -1302,8 +2191,8 @@ class Database:
         if not name:
             return None
         return self.fetchone(
-            "SELECT * FROM clients WHERE LOWER(name) = LOWER(?) ORDER BY id DESC LIMIT 1",
-            (name.strip(),)
+            "SELECT * FROM clients WHERE LOWER(TRIM(name)) = LOWER(TRIM(?)) ORDER BY id DESC LIMIT 1",
+            (name,)
         )
 
     def get_dates_with_bookings(self, year: int, month: int) -> dict:
@@ -1315,8 +2204,8 @@ class Database:
         last_day = _cal.monthrange(year, month)[1]
         end = f"{year}-{month:02d}-{last_day:02d}"
 
-        # Use the full booking range method which handles recurring entries
-        all_bookings = self.get_bookings_in_range(start, end)
+        # Same merged view as the day planner, so counts always agree
+        all_bookings = self.get_jobs_in_range(start, end)
         return {d: len(entries) for d, entries in all_bookings.items()}
 
     def save_client(self, data: dict) -> int:
@@ -1330,6 +2219,7 @@ class Database:
             vals = [data[c] for c in cols] + [data["id"]]
             self.execute(f"UPDATE clients SET {sets} WHERE id = ?", tuple(vals))
             self.commit()
+            self._notify_dirty("clients")
             return data["id"]
         else:
             cols = [k for k in data if k != "id"]
@@ -1340,9 +2230,10 @@ class Database:
                 tuple(vals)
             )
             self.commit()
+            self._notify_dirty("clients")
             return cursor.lastrowid
 
-    def upsert_clients(self, rows: list[dict]):
+    def upsert_clients(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert clients from Sheets sync. Does NOT mark dirty.
         After upserting, deletes any local rows whose sheets_row is
         NOT in the fresh pull (i.e. removed from Sheets).
@@ -1357,81 +2248,27 @@ class Database:
                 len(rows), existing_count,
             )
             # Still upsert the rows we got, but skip the DELETE pass
-            self._upsert_client_rows(rows)
-            return
-
-        now = datetime.now().isoformat()
-        synced_sheet_rows = set()
-        pending = self.get_pending_deletes("clients")
-        for row in rows:
-            sr = row.get("sheets_row", 0)
-            synced_sheet_rows.add(sr)
-            # Skip records pending deletion — use job_number or name as key
-            jn = row.get("job_number", "")
-            cname = row.get("name", "")
-            if (jn and jn in pending) or (cname and cname in pending):
-                log.debug(f"Skipping client {jn or cname} — pending delete")
-                continue
-            existing = self.fetchone(
-                "SELECT id FROM clients WHERE sheets_row = ?",
-                (sr,)
-            )
-            row["last_synced"] = now
-            row["dirty"] = 0
-
-            if existing:
-                cols = [k for k in row if k not in ("id",)]
-                sets = ", ".join(f"{c} = ?" for c in cols)
-                vals = [row[c] for c in cols] + [existing["id"]]
-                self.execute(f"UPDATE clients SET {sets} WHERE id = ?", tuple(vals))
-            else:
-                cols = list(row.keys())
-                placeholders = ", ".join("?" for _ in cols)
-                vals = [row[c] for c in cols]
-                self.execute(
-                    f"INSERT INTO clients ({', '.join(cols)}) VALUES ({placeholders})",
-                    tuple(vals)
-                )
+            return self._upsert_client_rows(rows)
 
-        # Remove stale clients no longer in Sheets (skip locally-dirty rows)
-        if synced_sheet_rows:
-            placeholders = ", ".join("?" for _ in synced_sheet_rows)
-            deleted = self.execute(
-                f"DELETE FROM clients WHERE sheets_row > 0 AND dirty = 0"
-                f" AND sheets_row NOT IN ({placeholders})",
-                tuple(synced_sheet_rows),
-            )
-            if deleted.rowcount:
-                log.info("Removed %d stale client rows not in Sheets", deleted.rowcount)
-        self.commit()
+        return self._bulk_upsert(
+            "clients", rows,
+            skip=self._client_pending_filter(),
+            delete_stale_where="dirty = 0",
+        )
 
-    def _upsert_client_rows(self, rows: list[dict]):
+    def _upsert_client_rows(self, rows: list[dict]) -> dict:
         """Upsert client rows without the stale-row deletion pass (safety fallback)."""
-        now = datetime.now().isoformat()
+        return self._bulk_upsert("clients", rows, skip=self._client_pending_filter())
+
+    def _client_pending_filter(self) -> Callable[[dict], bool]:
+        """Skip predicate for clients pending deletion — keyed on job_number or name."""
         pending = self.get_pending_deletes("clients")
-        for row in rows:
+
+        def skip(row: dict) -> bool:
             jn = row.get("job_number", "")
             cname = row.get("name", "")
-            if (jn and jn in pending) or (cname and cname in pending):
-                continue
-            sr = row.get("sheets_row", 0)
-            existing = self.fetchone("SELECT id FROM clients WHERE sheets_row = ?", (sr,))
-            row["last_synced"] = now
-            row["dirty"] = 0
-            if existing:
-                cols = [k for k in row if k not in ("id",)]
-                sets = ", ".join(f"{c} = ?" for c in cols)
-                vals = [row[c] for c in cols] + [existing["id"]]
-                self.execute(f"UPDATE clients SET {sets} WHERE id = ?", tuple(vals))
-            else:
-                cols = list(row.keys())
-                placeholders = ", ".join("?" for _ in cols)
-                vals = [row[c] for c in cols]
-                self.execute(
-                    f"INSERT INTO clients ({', '.join(cols)}) VALUES ({placeholders})",
-                    tuple(vals)
-                )
-        self.commit()
+            return bool((jn and jn in pending) or (cname and cname in pending))
+        return skip
 
     def get_dirty_clients(self) -> list[dict]:
         """Get clients that have been modified locally but not synced."""
@@ -1465,141 +2302,11 @@ class Database:
     def get_todays_jobs(self, target_date: str = None) -> list[dict]:
         """Get jobs scheduled for a specific date (default: today).
         Includes one-off bookings, schedule entries, AND recurring subscriptions
-        matched by day-of-week.
+        matched by day-of-week. See get_jobs_in_range.
         """
         if not target_date:
             target_date = date.today().isoformat()
-
-        # Parse target date to get day name
-        try:
-            from datetime import datetime as _dt
-            dt = _dt.strptime(target_date, "%Y-%m-%d")
-            day_name = dt.strftime("%A")
-        except Exception:
-            day_name = ""
-
-        # Check schedule table first (subscription visits)
-        schedule_jobs = self.fetchall(
-            "SELECT *, 'schedule' as source FROM schedule WHERE date = ? ORDER BY time ASC",
-            (target_date,)
-        )
-
-        # Also check clients with matching date (one-off bookings)
-        client_jobs = self.fetchall(
-            """SELECT *, 'client' as source FROM clients
-               WHERE date = ? AND LOWER(status) NOT IN ('cancelled', 'completed', 'complete')
-               ORDER BY time ASC""",
-            (target_date,)
-        )
-
-        # Recurring subscriptions: match by preferred_day
-        sub_jobs = []
-        if day_name:
-            sub_jobs = self.fetchall(
-                """SELECT *, 'subscription' as source FROM clients
-                   WHERE type = 'Subscription'
-                     AND LOWER(status) NOT IN ('cancelled', 'completed', 'complete')
-                     AND preferred_day = ?
-                   ORDER BY time ASC""",
-                (day_name,)
-            )
-
-        # Merge and deduplicate (prefer schedule > client > subscription)
-        seen_names = set()
-        combined = []
-
-        # Schedule entries first — enrich with client record data
-        for j in schedule_jobs:
-            n = j.get("client_name", "")
-            seen_names.add(n.lower())
-            # Store the schedule table's own ID separately
-            j["schedule_id"] = j.get("id")
-            # Look up the matching client record by name to get price,
-            # email, job_number, etc. that the schedule table lacks.
-            if n:
-                client_rec = self.fetchone(
-                    "SELECT * FROM clients WHERE LOWER(name) = LOWER(?) LIMIT 1", (n,)
-                )
-                if client_rec:
-                    j["client_id"] = client_rec.get("id")
-                    # Merge fields the schedule table doesn't have
-                    if not j.get("email"):
-                        j["email"] = client_rec.get("email", "")
-                    if not j.get("phone"):
-                        j["phone"] = client_rec.get("phone", "")
-                    j["price"] = client_rec.get("price", 0)
-                    j["job_number"] = client_rec.get("job_number", "")
-                    j["paid"] = client_rec.get("paid", "")
-                    j["deposit_amount"] = client_rec.get("deposit_amount", 0)
-                    j["type"] = client_rec.get("type", "")
-                    j["frequency"] = client_rec.get("frequency", "")
-                    j["sheets_row"] = client_rec.get("sheets_row", j.get("sheets_row", ""))
-                    j["waste_collection"] = client_rec.get("waste_collection", "Not Set")
-                    j["stripe_customer_id"] = client_rec.get("stripe_customer_id", "")
-                else:
-                    j["waste_collection"] = "Not Set"
-            else:
-                j["waste_collection"] = "Not Set"
-            combined.append(j)
-
-        # One-off clients
-        for cj in client_jobs:
-            n = cj.get("name", "")
-            if n.lower() not in seen_names:
-                seen_names.add(n.lower())
-                combined.append({
-                    "id": cj["id"],
-                    "client_name": cj["name"],
-                    "name": cj["name"],
-                    "service": cj["service"],
-                    "date": cj["date"],
-                    "time": cj["time"],
-                    "postcode": cj["postcode"],
-                    "address": cj.get("address", ""),
-                    "phone": cj["phone"],
-                    "email": cj.get("email", ""),
-                    "status": cj["status"],
-                    "notes": cj.get("notes", ""),
-                    "source": "client",
-                    "price": cj.get("price", 0),
-                    "job_number": cj.get("job_number", ""),
-                    "type": cj.get("type", ""),
-                    "paid": cj.get("paid", ""),
-                    "deposit_amount": cj.get("deposit_amount", 0),
-                    "waste_collection": cj.get("waste_collection", "Not Set"),
-                })
-
-        # Recurring subscriptions
-        for sj in sub_jobs:
-            n = sj.get("name", "")
-            if n.lower() not in seen_names:
-                seen_names.add(n.lower())
-                combined.append({
-                    "id": sj["id"],
-                    "client_name": sj["name"],
-                    "name": sj["name"],
-                    "service": sj["service"],
-                    "date": target_date,
-                    "time": sj["time"],
-                    "postcode": sj["postcode"],
-                    "address": sj.get("address", ""),
-                    "phone": sj["phone"],
-                    "email": sj.get("email", ""),
-                    "status": sj["status"],
-                    "notes": sj.get("notes", ""),
-                    "source": "subscription",
-                    "price": sj.get("price", 0),
-                    "job_number": sj.get("job_number", ""),
-                    "type": sj.get("type", ""),
-                    "paid": sj.get("paid", ""),
-                    "deposit_amount": sj.get("deposit_amount", 0),
-                    "frequency": sj.get("frequency", ""),
-                    "preferred_day": sj.get("preferred_day", ""),
-                    "waste_collection": sj.get("waste_collection", "Not Set"),
-                })
-
-        combined.sort(key=lambda j: j.get("time", "99:99"))
-        return combined
+        return self.get_jobs_in_range(target_date, target_date).get(target_date, [])
 
     # ------------------------------------------------------------------
     # Scheduling Conflict Detection
@@ -1662,16 +2369,25 @@ class Database:
 
     def suggest_best_dates(self, days_ahead: int = 14,
                            preferred_day: str = "",
-                           exclude_weekends: bool = True) -> list[dict]:
+                           exclude_weekends: bool = True,
+                           limit: Optional[int] = 5) -> list[dict]:
         """Suggest the best available dates for scheduling a new job.
 
         Returns list of {date, day_name, job_count, max_jobs, available_slots}
-        sorted by availability (fewest existing jobs first).
+        sorted by availability (fewest existing jobs first), at most `limit`
+        of them (None for every day with room). booking_scheduler ranks
+        these by drive time when the new job's postcode is known.
         """
         max_jobs = getattr(config, "MAX_JOBS_PER_DAY", 5)
         candidates = []
         today = date.today()
 
+        # One range query for the whole window
+        jobs_by_date = self.get_jobs_in_range(
+            (today + timedelta(days=1)).isoformat(),
+            (today + timedelta(days=days_ahead)).isoformat(),
+        )
+
         for i in range(1, days_ahead + 1):
             candidate = today + timedelta(days=i)
             day_name = candidate.strftime("%A")
@@ -1685,7 +2401,7 @@ class Database:
                 continue
 
             date_str = candidate.isoformat()
-            job_count = self.get_jobs_count_for_date(date_str)
+            job_count = len(jobs_by_date.get(date_str, []))
 
             if job_count < max_jobs:
                 candidates.append({
@@ -1699,7 +2415,7 @@ class Database:
 
         # Sort by fewest existing jobs (most availability first)
         candidates.sort(key=lambda c: c["job_count"])
-        return candidates[:5]  # Return top 5 suggestions
+        return candidates if limit is None else candidates[:limit]
 
     def get_upcoming_confirmed(self, days: int = 7) -> list[dict]:
         """Get confirmed/scheduled bookings for the next N days.
@@ -1753,24 +2469,12 @@ class Database:
     # ------------------------------------------------------------------
     # Schedule
     # ------------------------------------------------------------------
-    def upsert_schedule(self, rows: list[dict]):
+    def upsert_schedule(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert schedule entries from Sheets."""
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
         # Clear and reload (schedule changes wholesale)
-        self.execute("DELETE FROM schedule")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO schedule ({', '.join(cols)}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("schedule", rows)
 
     # ------------------------------------------------------------------
     # Invoices
@@ -1784,52 +2488,15 @@ class Database:
         sql += " ORDER BY issue_date DESC"
         return self.fetchall(sql, tuple(params))
 
-    def upsert_invoices(self, rows: list[dict]):
+    def upsert_invoices(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert invoices. Removes stale local invoices not in Sheets.
         Skips records that are in pending_deletes to prevent resurrection."""
-        now = datetime.now().isoformat()
-        synced_numbers = set()
         pending = self.get_pending_deletes("invoices")
-        for row in rows:
-            inv_num = row.get("invoice_number", "")
-            if inv_num:
-                synced_numbers.add(inv_num)
-            # Skip records pending deletion
-            if inv_num in pending:
-                log.debug(f"Skipping invoice {inv_num} — pending delete")
-                continue
-            existing = self.fetchone(
-                "SELECT id FROM invoices WHERE invoice_number = ?",
-                (inv_num,)
-            )
-            row["last_synced"] = now
-            row["dirty"] = 0
-            if existing:
-                cols = [k for k in row if k not in ("id",)]
-                sets = ", ".join(f"{c} = ?" for c in cols)
-                vals = [row[c] for c in cols] + [existing["id"]]
-                self.execute(f"UPDATE invoices SET {sets} WHERE id = ?", tuple(vals))
-            else:
-                cols = list(row.keys())
-                placeholders = ", ".join("?" for _ in cols)
-                vals = [row[c] for c in cols]
-                self.execute(
-                    f"INSERT INTO invoices ({', '.join(cols)}) VALUES ({placeholders})",
-                    tuple(vals)
-                )
-
-        # Remove stale invoices no longer in Sheets (skip locally-dirty rows)
-        if synced_numbers:
-            placeholders = ", ".join("?" for _ in synced_numbers)
-            deleted = self.execute(
-                f"DELETE FROM invoices WHERE dirty = 0"
-                f" AND invoice_number != ''"
-                f" AND invoice_number NOT IN ({placeholders})",
-                tuple(synced_numbers),
-            )
-            if deleted.rowcount:
-                log.info("Removed %d stale invoices not in Sheets", deleted.rowcount)
-        self.commit()
+        return self._bulk_upsert(
+            "invoices", rows,
+            skip=lambda r: r.get("invoice_number", "") in pending,
+            delete_stale_where="dirty = 0",
+        )
 
     def save_invoice(self, data: dict) -> int:
         data["dirty"] = 1
@@ -1839,6 +2506,7 @@ class Database:
             vals = [data[c] for c in cols] + [data["id"]]
             self.execute(f"UPDATE invoices SET {sets} WHERE id = ?", tuple(vals))
             self.commit()
+            self._notify_dirty("invoices")
             return data["id"]
         else:
             cols = [k for k in data if k != "id"]
@@ -1849,6 +2517,7 @@ class Database:
                 tuple(vals)
             )
             self.commit()
+            self._notify_dirty("invoices")
             return cursor.lastrowid
 
     def get_invoice(self, invoice_id: int) -> Optional[dict]:
@@ -1886,52 +2555,15 @@ class Database:
         sql += " ORDER BY date_created DESC"
         return self.fetchall(sql, tuple(params))
 
-    def upsert_quotes(self, rows: list[dict]):
+    def upsert_quotes(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert quotes. Removes stale local quotes not in Sheets.
         Skips records that are in pending_deletes to prevent resurrection."""
-        now = datetime.now().isoformat()
-        synced_numbers = set()
         pending = self.get_pending_deletes("quotes")
-        for row in rows:
-            qn = row.get("quote_number", "")
-            if qn:
-                synced_numbers.add(qn)
-            # Skip records pending deletion — don't resurrect them
-            if qn in pending:
-                log.debug(f"Skipping quote {qn} — pending delete")
-                continue
-            existing = self.fetchone(
-                "SELECT id FROM quotes WHERE quote_number = ?",
-                (qn,)
-            )
-            row["last_synced"] = now
-            row["dirty"] = 0
-            if existing:
-                cols = [k for k in row if k not in ("id",)]
-                sets = ", ".join(f"{c} = ?" for c in cols)
-                vals = [row[c] for c in cols] + [existing["id"]]
-                self.execute(f"UPDATE quotes SET {sets} WHERE id = ?", tuple(vals))
-            else:
-                cols = list(row.keys())
-                placeholders = ", ".join("?" for _ in cols)
-                vals = [row[c] for c in cols]
-                self.execute(
-                    f"INSERT INTO quotes ({', '.join(cols)}) VALUES ({placeholders})",
-                    tuple(vals)
-                )
-
-        # Remove stale quotes no longer in Sheets (skip locally-dirty rows)
-        if synced_numbers:
-            placeholders = ", ".join("?" for _ in synced_numbers)
-            deleted = self.execute(
-                f"DELETE FROM quotes WHERE dirty = 0"
-                f" AND quote_number != ''"
-                f" AND quote_number NOT IN ({placeholders})",
-                tuple(synced_numbers),
-            )
-            if deleted.rowcount:
-                log.info("Removed %d stale quotes not in Sheets", deleted.rowcount)
-        self.commit()
+        return self._bulk_upsert(
+            "quotes", rows,
+            skip=lambda r: r.get("quote_number", "") in pending,
+            delete_stale_where="dirty = 0",
+        )
 
     def generate_quote_number(self) -> str:
         """Generate the next sequential quote number: QUO-YYYYMMDD-NNN."""
@@ -1966,6 +2598,7 @@ class Database:
             vals = [data[c] for c in cols] + [data["id"]]
             self.execute(f"UPDATE quotes SET {sets} WHERE id = ?", tuple(vals))
             self.commit()
+            self._notify_dirty("quotes")
             return data["id"]
         else:
             cols = [k for k in data if k != "id" and k in self._QUOTE_COLUMNS]
@@ -1976,6 +2609,7 @@ class Database:
                 tuple(vals)
             )
             self.commit()
+            self._notify_dirty("quotes")
             return cursor.lastrowid
 
     def get_quote(self, quote_id: int) -> Optional[dict]:
@@ -2007,46 +2641,9 @@ class Database:
     def get_business_costs(self) -> list[dict]:
         return self.fetchall("SELECT * FROM business_costs ORDER BY month DESC")
 
-    def upsert_business_costs(self, rows: list[dict]):
+    def upsert_business_costs(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert business costs. Removes stale months not in Sheets."""
-        now = datetime.now().isoformat()
-        synced_months = set()
-        for row in rows:
-            month = row.get("month", "")
-            if month:
-                synced_months.add(month)
-            existing = self.fetchone(
-                "SELECT id FROM business_costs WHERE month = ?",
-                (month,)
-            )
-            row["last_synced"] = now
-            row["dirty"] = 0
-            if existing:
-                cols = [k for k in row if k not in ("id",)]
-                sets = ", ".join(f"{c} = ?" for c in cols)
-                vals = [row[c] for c in cols] + [existing["id"]]
-                self.execute(f"UPDATE business_costs SET {sets} WHERE id = ?", tuple(vals))
-            else:
-                cols = list(row.keys())
-                placeholders = ", ".join("?" for _ in cols)
-                vals = [row[c] for c in cols]
-                self.execute(
-                    f"INSERT INTO business_costs ({', '.join(cols)}) VALUES ({placeholders})",
-                    tuple(vals)
-                )
-
-        # Remove stale cost months no longer in Sheets
-        if synced_months:
-            placeholders = ", ".join("?" for _ in synced_months)
-            deleted = self.execute(
-                f"DELETE FROM business_costs WHERE dirty = 0"
-                f" AND month != ''"
-                f" AND month NOT IN ({placeholders})",
-                tuple(synced_months),
-            )
-            if deleted.rowcount:
-                log.info("Removed %d stale business_costs rows not in Sheets", deleted.rowcount)
-        self.commit()
+        return self._bulk_upsert("business_costs", rows, delete_stale_where="dirty = 0")
 
     def save_business_cost(self, data: dict) -> int:
         """Insert or update a business cost row."""
@@ -2087,26 +2684,14 @@ class Database:
     def get_savings_pots(self) -> list[dict]:
         return self.fetchall("SELECT * FROM savings_pots ORDER BY name")
 
-    def upsert_savings_pots(self, rows: list[dict]):
+    def upsert_savings_pots(self, rows: list[dict]) -> Optional[dict]:
         now = datetime.now().isoformat()
-        for row in rows:
-            existing = self.fetchone(
-                "SELECT id FROM savings_pots WHERE name = ?",
-                (row.get("name", ""),)
-            )
-            row["last_synced"] = now
-            row["dirty"] = 0
-            if existing:
-                self.execute(
-                    "UPDATE savings_pots SET balance=?, target=?, updated_at=?, dirty=0, last_synced=? WHERE id=?",
-                    (row.get("balance", 0), row.get("target", 0), now, now, existing["id"])
-                )
-            else:
-                self.execute(
-                    "INSERT INTO savings_pots (name, balance, target, updated_at, dirty, last_synced) VALUES (?,?,?,?,0,?)",
-                    (row["name"], row.get("balance", 0), row.get("target", 0), now, now)
-                )
-        self.commit()
+        rows = [
+            {"name": r["name"], "balance": r.get("balance", 0),
+             "target": r.get("target", 0), "updated_at": now}
+            for r in rows
+        ]
+        return self._bulk_upsert("savings_pots", rows)
 
     def save_savings_pot(self, data: dict) -> int:
         """Insert or update a savings pot."""
@@ -2153,33 +2738,11 @@ class Database:
         sql += " ORDER BY date DESC"
         return self.fetchall(sql, tuple(params))
 
-    def upsert_enquiries(self, rows: list[dict]):
+    def upsert_enquiries(self, rows: list[dict]) -> Optional[dict]:
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
         # Preserve dirty rows (local edits not yet pushed)
-        dirty_rows = self.fetchall("SELECT * FROM enquiries WHERE dirty = 1")
-        self.execute("DELETE FROM enquiries")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO enquiries ({', '.join(cols)}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        # Restore dirty rows that were destroyed by the DELETE
-        for dr in dirty_rows:
-            cols = [k for k in dr.keys() if k != "id"]
-            placeholders = ", ".join("?" for _ in cols)
-            vals = [dr[c] for c in cols]
-            self.execute(
-                f"INSERT INTO enquiries ({', '.join(cols)}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("enquiries", rows, keep_where="dirty = 1")
 
     def save_enquiry(self, data: dict) -> int:
         """Insert or update an enquiry."""
@@ -2190,6 +2753,7 @@ class Database:
             vals = [data[c] for c in cols] + [data["id"]]
             self.execute(f"UPDATE enquiries SET {sets} WHERE id = ?", tuple(vals))
             self.commit()
+            self._notify_dirty("enquiries")
             return data["id"]
         else:
             cols = [k for k in data if k != "id"]
@@ -2200,6 +2764,7 @@ class Database:
                 tuple(vals)
             )
             self.commit()
+            self._notify_dirty("enquiries")
             return cursor.lastrowid
 
     def get_enquiry(self, enquiry_id: int) -> Optional[dict]:
@@ -2227,13 +2792,12 @@ class Database:
     # ------------------------------------------------------------------
     def upsert_site_analytics(self, daily_data: list[dict]):
         """Upsert daily page view counts from GAS analytics."""
-        for row in daily_data:
-            self.execute("""
-                INSERT INTO site_analytics (date, page, views)
-                VALUES (?, ?, ?)
-                ON CONFLICT(date, page)
-                DO UPDATE SET views = excluded.views
-            """, (row["date"], row.get("page", "/"), row.get("views", 0)))
+        self.executemany("""
+            INSERT INTO site_analytics (date, page, views)
+            VALUES (?, ?, ?)
+            ON CONFLICT(date, page)
+            DO UPDATE SET views = excluded.views
+        """, [(row["date"], row.get("page", "/"), row.get("views", 0)) for row in daily_data])
         self.commit()
 
     def save_analytics_summary(self, summary: dict):
@@ -2402,24 +2966,11 @@ class Database:
     def get_complaint(self, complaint_id: int) -> Optional[dict]:
         return self.fetchone("SELECT * FROM complaints WHERE id = ?", (complaint_id,))
 
-    def upsert_complaints(self, rows: list[dict]):
+    def upsert_complaints(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert complaints from sync."""
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
-        self.execute("DELETE FROM complaints")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            col_names = ", ".join(cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO complaints ({col_names}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("complaints", rows)
 
     # ------------------------------------------------------------------
     # Vacancies
@@ -2458,24 +3009,11 @@ class Database:
         self.execute("DELETE FROM vacancies WHERE id = ?", (vacancy_id,))
         self.commit()
 
-    def upsert_vacancies(self, rows: list[dict]):
+    def upsert_vacancies(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert vacancies from sync."""
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
-        self.execute("DELETE FROM vacancies")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            col_names = ", ".join(cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO vacancies ({col_names}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("vacancies", rows)
 
     # ------------------------------------------------------------------
     # Applications
@@ -2516,24 +3054,11 @@ class Database:
     def get_application(self, app_id: int) -> Optional[dict]:
         return self.fetchone("SELECT * FROM applications WHERE id = ?", (app_id,))
 
-    def upsert_applications(self, rows: list[dict]):
+    def upsert_applications(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert applications from sync."""
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
-        self.execute("DELETE FROM applications")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            col_names = ", ".join(cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO applications ({col_names}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("applications", rows)
 
     # ------------------------------------------------------------------
     # Products
@@ -2571,24 +3096,11 @@ class Database:
         self.execute("DELETE FROM products WHERE id = ?", (product_id,))
         self.commit()
 
-    def upsert_products(self, rows: list[dict]):
+    def upsert_products(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert products from sync."""
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
-        self.execute("DELETE FROM products")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            col_names = ", ".join(cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO products ({col_names}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("products", rows)
 
     # ------------------------------------------------------------------
     # Orders
@@ -2622,44 +3134,18 @@ class Database:
             self.commit()
             return cursor.lastrowid
 
-    def upsert_orders(self, rows: list[dict]):
+    def upsert_orders(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert orders from sync."""
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
-        self.execute("DELETE FROM orders")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            col_names = ", ".join(cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO orders ({col_names}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("orders", rows)
 
     # ------------------------------------------------------------------
-    def upsert_subscribers(self, rows: list[dict]):
+    def upsert_subscribers(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert subscribers from sync."""
         if not rows:
             return  # Safety: never wipe table on empty response
-        now = datetime.now().isoformat()
-        self.execute("DELETE FROM subscribers")
-        for row in rows:
-            row["last_synced"] = now
-            row["dirty"] = 0
-            cols = list(row.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            col_names = ", ".join(cols)
-            vals = [row[c] for c in cols]
-            self.execute(
-                f"INSERT INTO subscribers ({col_names}) VALUES ({placeholders})",
-                tuple(vals)
-            )
-        self.commit()
+        return self._bulk_replace("subscribers", rows)
 
     # Subscribers (extended)
     # ------------------------------------------------------------------
@@ -2795,126 +3281,87 @@ class Database:
             tuple(params),
         )
 
-    def upsert_job_photos(self, rows: list[dict]):
+    def upsert_job_photos(self, rows: list[dict]) -> Optional[dict]:
         """Upsert job photos from Sheets sync. Keyed on job_number + drive_file_id.
         Also removes stale photos no longer in the Sheets data."""
-        synced_keys = set()
-        for row in rows:
-            jn = row.get("job_number", "")
-            fid = row.get("drive_file_id", "")
-            if not jn or not fid:
-                continue
-            synced_keys.add(f"{jn}|{fid}")
-            existing = self.fetchone(
-                "SELECT id FROM job_photos WHERE job_number = ? AND drive_file_id = ?",
-                (jn, fid),
-            )
-            if existing:
-                self.execute(
-                    """UPDATE job_photos SET photo_type=?, drive_url=?, caption=?,
-                       telegram_file_id=?, filename=?, client_id=?, client_name=?,
-                       source=?, created_at=? WHERE id=?""",
-                    (row.get("photo_type", "before"), row.get("drive_url", ""),
-                     row.get("caption", ""), row.get("telegram_file_id", ""),
-                     row.get("filename", ""), row.get("client_id", ""),
-                     row.get("client_name", ""), row.get("source", "drive"),
-                     row.get("created_at", ""), existing["id"]),
-                )
-            else:
-                self.execute(
-                    """INSERT INTO job_photos
-                       (job_number, client_id, client_name, job_date, photo_type, filename,
-                        drive_url, drive_file_id, telegram_file_id, source, caption, created_at)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (jn, row.get("client_id", ""), row.get("client_name", ""),
-                     row.get("job_date", ""),
-                     row.get("photo_type", "before"), row.get("filename", ""),
-                     row.get("drive_url", ""), fid,
-                     row.get("telegram_file_id", ""), row.get("source", "drive"),
-                     row.get("caption", ""), row.get("created_at", "")),
-                )
-        # Remove stale job photos no longer in Sheets
-        if synced_keys:
-            all_local = self.fetchall(
-                "SELECT id, job_number, drive_file_id FROM job_photos WHERE drive_file_id != ''"
-            )
-            stale_ids = [
-                r["id"] for r in all_local
-                if f"{r['job_number']}|{r['drive_file_id']}" not in synced_keys
-            ]
-            if stale_ids:
-                placeholders = ", ".join("?" for _ in stale_ids)
-                self.execute(
-                    f"DELETE FROM job_photos WHERE id IN ({placeholders})",
-                    tuple(stale_ids),
-                )
-                log.info("Removed %d stale job photos not in Sheets", len(stale_ids))
-        self.commit()
+        cols = ("job_number", "client_id", "client_name", "photo_type",
+                "filename", "drive_url", "drive_file_id", "telegram_file_id",
+                "source", "caption", "created_at")
+        defaults = {"photo_type": "before", "source": "drive"}
+        keyed = [
+            {c: row.get(c, defaults.get(c, "")) for c in cols}
+            for row in rows
+            if row.get("job_number") and row.get("drive_file_id")
+        ]
+        if not keyed:
+            return
+        return self._bulk_upsert("job_photos", keyed, delete_stale_where="drive_file_id != ''")
 
-    def upsert_job_tracking(self, rows: list[dict]):
+    def upsert_job_tracking(self, rows: list[dict]) -> Optional[dict]:
         """Upsert job tracking records from Sheets sync. Keyed on job_ref + start_time."""
-        for row in rows:
-            ref = row.get("job_ref", "")
-            start = row.get("start_time", "")
-            if not ref or not start:
-                continue
-            existing = self.fetchone(
-                "SELECT id FROM job_tracking WHERE job_ref = ? AND start_time = ?",
-                (ref, start),
-            )
-            if existing:
-                self.execute(
-                    """UPDATE job_tracking SET end_time=?, duration_mins=?, notes=?,
-                       photo_count=?, is_active=? WHERE id=?""",
-                    (row.get("end_time", ""), row.get("duration_mins", 0),
-                     row.get("notes", ""), row.get("photo_count", 0),
-                     row.get("is_active", 0), existing["id"]),
-                )
-            else:
-                self.execute(
-                    """INSERT INTO job_tracking
-                       (job_ref, start_time, end_time, duration_mins, notes, photo_count, is_active)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (ref, start, row.get("end_time", ""),
-                     row.get("duration_mins", 0), row.get("notes", ""),
-                     row.get("photo_count", 0), row.get("is_active", 0)),
-                )
-        self.commit()
-
-    def upsert_email_tracking(self, rows: list[dict]):
-        """Upsert email tracking records from Sheets sync. Keyed on sent_at + client_email + email_type."""
+        cols = ("job_ref", "start_time", "end_time", "duration_mins",
+                "notes", "photo_count", "is_active")
+        defaults = {"duration_mins": 0, "photo_count": 0, "is_active": 0}
+        keyed = [
+            {c: row.get(c, defaults.get(c, "")) for c in cols}
+            for row in rows
+            if row.get("job_ref") and row.get("start_time")
+        ]
+        if keyed:
+            return self._bulk_upsert("job_tracking", keyed)
+
+    def upsert_email_tracking(self, rows: list[dict]) -> dict:
+        """Upsert email tracking records from Sheets sync. Keyed on sent_at +
+        email_norm + type_norm (case-insensitive email, underscore/hyphen
+        agnostic type), so both statements are index seeks."""
+        batch = []
         for row in rows:
             sent = row.get("sent_at", "")
             email = row.get("client_email", "")
-            etype = row.get("email_type", "")
             if not sent or not email:
                 continue
-            # Case-insensitive match + match both underscore/hyphenated variant
-            alt_etype = etype.replace("_", "-") if "_" in etype else etype.replace("-", "_")
-            existing = self.fetchone(
-                """SELECT id FROM email_tracking
-                   WHERE sent_at = ? AND LOWER(client_email) = ?
-                   AND email_type IN (?, ?)""",
-                (sent, email.lower(), etype, alt_etype),
-            )
-            if existing:
-                self.execute(
-                    """UPDATE email_tracking SET client_name=?, subject=?, status=?,
-                       notes=? WHERE id=?""",
-                    (row.get("client_name", ""), row.get("subject", ""),
-                     row.get("status", "sent"), row.get("notes", ""),
-                     existing["id"]),
-                )
-            else:
-                self.execute(
-                    """INSERT INTO email_tracking
-                       (client_name, client_email, email_type, subject, status, sent_at, notes)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (row.get("client_name", ""), email, etype,
-                     row.get("subject", ""), row.get("status", "sent"),
-                     sent, row.get("notes", "")),
-                )
-        self.commit()
+            batch.append((
+                row.get("client_name", ""), row.get("subject", ""),
+                row.get("status", "sent"), row.get("notes", ""),
+                email, row.get("email_type", ""), sent,
+                self.normalise_email(email),
+                self.normalise_email_type(row.get("email_type", "")),
+            ))
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        if not batch:
+            return counts
+        with self._lock:
+            updated = self.executemany(
+                """UPDATE email_tracking SET client_name=?1, subject=?2, status=?3, notes=?4
+                   WHERE sent_at = ?7 AND email_norm = ?8 AND type_norm = ?9
+                   AND (client_name IS NOT ?1 OR subject IS NOT ?2
+                        OR status IS NOT ?3 OR notes IS NOT ?4)""",
+                batch,
+            ).rowcount
+            inserted = self.executemany(
+                """INSERT INTO email_tracking
+                   (client_name, subject, status, notes, client_email, email_type, sent_at)
+                   SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7
+                   WHERE NOT EXISTS (
+                       SELECT 1 FROM email_tracking
+                       WHERE sent_at = ?7 AND email_norm = ?8 AND type_norm = ?9)""",
+                batch,
+            ).rowcount
+            self.commit()
+        counts.update(inserted=max(inserted, 0), updated=max(updated, 0))
+        counts["unchanged"] = max(len(batch) - counts["inserted"] - counts["updated"], 0)
+        return counts
+
+    @staticmethod
+    def normalise_email(value: str) -> str:
+        """Canonical form of an address (matches email_tracking.email_norm)."""
+        return (value or "").strip().lower()
+
+    @staticmethod
+    def normalise_email_type(value: str) -> str:
+        """Canonical email type — GAS writes hyphenated variants of the Hub's
+        underscore types (matches email_tracking.type_norm)."""
+        return (value or "").strip().lower().replace("-", "_")
 
     def get_job_tracking(self, date: str = None, limit: int = 50) -> list[dict]:
         """Get job tracking records from local SQLite. Optionally filter by date."""
@@ -3018,11 +3465,17 @@ class Database:
     # Sync Log
     # ------------------------------------------------------------------
     def log_sync(self, table_name: str, direction: str, records: int,
-                 status: str = "success", error: str = ""):
+                 status: str = "success", error: str = "", counts: dict = None):
+        """Record a sync run. ``counts`` is the inserted/updated/unchanged/
+        deleted breakdown returned by the upsert_* methods."""
+        counts = counts or {}
         self.execute(
             """INSERT INTO sync_log (table_name, direction, records_affected,
-               status, error_message, timestamp) VALUES (?, ?, ?, ?, ?, ?)""",
-            (table_name, direction, records, status, error, datetime.now().isoformat())
+               status, error_message, timestamp, inserted, updated, unchanged, deleted)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (table_name, direction, records, status, error, datetime.now().isoformat(),
+             counts.get("inserted", 0), counts.get("updated", 0),
+             counts.get("unchanged", 0), counts.get("deleted", 0))
         )
         self.commit()
 
@@ -3038,44 +3491,333 @@ class Database:
             )
         return row["timestamp"] if row else None
 
+    def get_sync_revision(self, table_name: str) -> str:
+        """Return the last GAS revision pulled for a table ('' if none)."""
+        return self.get_setting(f"sync_rev:{table_name}", "")
+
+    def set_sync_revision(self, table_name: str, revision: str):
+        """Store the GAS revision of the data just applied for a table."""
+        self.set_setting(f"sync_rev:{table_name}", revision or "")
+
+    def clear_sync_revisions(self):
+        """Forget all table revisions so the next sync does a full pull."""
+        self.execute("DELETE FROM app_settings WHERE key LIKE 'sync_rev:%'")
+        self.commit()
+
+    # ------------------------------------------------------------------
+    # Geocode cache (postcode -> lat/lng, see distance.py)
+    # ------------------------------------------------------------------
+    # Postcode columns pre-warmed after each sync
+    _POSTCODE_SOURCES = ("clients", "schedule", "enquiries", "quotes")
+
+    def get_geocodes(self, postcodes: list[str]) -> dict[str, dict]:
+        """Cached rows for normalised postcodes, keyed by postcode."""
+        found = {}
+        postcodes = list(dict.fromkeys(postcodes))
+        for i in range(0, len(postcodes), 500):
+            chunk = postcodes[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            for row in self.fetchall(
+                f"SELECT * FROM geocode_cache WHERE postcode IN ({marks})",
+                tuple(chunk)
+            ):
+                found[row["postcode"]] = row
+        return found
+
+    def save_geocodes(self, entries: list[dict]):
+        """Upsert lookup results. Entries without lat/lng are stored as
+        negative (found = 0) rows."""
+        now = datetime.now().isoformat()
+        rows = [
+            (e["postcode"], e.get("lat"), e.get("lng"), e.get("parish") or "",
+             e.get("district") or "", 1 if e.get("lat") is not None else 0, now)
+            for e in entries
+        ]
+        if not rows:
+            return
+        self.executemany(
+            """INSERT INTO geocode_cache
+                   (postcode, lat, lng, parish, district, found, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(postcode) DO UPDATE SET
+                   lat = excluded.lat, lng = excluded.lng,
+                   parish = excluded.parish, district = excluded.district,
+                   found = excluded.found, fetched_at = excluded.fetched_at""",
+            rows
+        )
+        self.commit()
+
+    def get_known_postcodes(self) -> list[str]:
+        """Every distinct normalised postcode on clients, schedule,
+        enquiries and quotes."""
+        union = " UNION ".join(
+            f"SELECT UPPER(REPLACE(TRIM(postcode), ' ', '')) AS pc FROM {t}"
+            for t in self._POSTCODE_SOURCES
+        )
+        rows = self.fetchall(f"SELECT pc FROM ({union}) WHERE pc != '' ORDER BY pc")
+        return [r["pc"] for r in rows]
+
+    # ------------------------------------------------------------------
+    # Supabase mirror state
+    # ------------------------------------------------------------------
+    def changed_mirror_rows(self, table: str, rows: dict[str, dict]) -> dict[str, str]:
+        """Keys of ``rows`` (natural key -> mirror payload) whose content
+        differs from the last successful mirror, mapped to their new hash."""
+        known = {r["row_key"]: r["hash"] for r in self.fetchall(
+            "SELECT row_key, hash FROM mirror_state WHERE table_name = ?", (table,))}
+        changed = {}
+        for key, row in rows.items():
+            h = self._row_hash(row)
+            if known.get(key) != h:
+                changed[key] = h
+        return changed
+
+    def save_mirror_hashes(self, table: str, hashes: dict[str, str]):
+        """Record rows as mirrored (after the upsert succeeded)."""
+        if not hashes:
+            return
+        now = datetime.now().isoformat()
+        self.executemany(
+            """INSERT INTO mirror_state (table_name, row_key, hash, mirrored_at)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT(table_name, row_key) DO UPDATE SET
+                   hash = excluded.hash, mirrored_at = excluded.mirrored_at""",
+            [(table, key, h, now) for key, h in hashes.items()]
+        )
+        self.commit()
+
+    def clear_mirror_state(self, table: str = None):
+        """Forget mirror hashes so the next mirror resends every row."""
+        if table:
+            self.execute("DELETE FROM mirror_state WHERE table_name = ?", (table,))
+        else:
+            self.execute("DELETE FROM mirror_state")
+        self.commit()
+
+    # ------------------------------------------------------------------
+    # Sync outbox
+    # ------------------------------------------------------------------
+    def enqueue_outbox(self, action: str, payload: dict, coalesce_key: str = "") -> int:
+        """Persist a Sheets write. A pending write with the same
+        ``coalesce_key`` is superseded: it is dropped and this one joins the
+        back of the queue, so only the latest state of a record is sent."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            if coalesce_key:
+                self.execute(
+                    "DELETE FROM outbox WHERE coalesce_key = ? AND status = 'pending'",
+                    (coalesce_key,))
+            cursor = self.execute(
+                """INSERT INTO outbox (action, payload, coalesce_key,
+                       created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (action, json.dumps(payload, default=str), coalesce_key, now, now))
+            self.commit()
+            return cursor.lastrowid
+
+    def get_due_outbox(self, limit: int = None) -> list[dict]:
+        """Pending writes whose backoff has elapsed, oldest first, with
+        the payload decoded."""
+        limit = limit or config.OUTBOX_BATCH_SIZE
+        rows = self.fetchall(
+            """SELECT * FROM outbox
+               WHERE status = 'pending' AND next_attempt <= ?
+               ORDER BY id LIMIT ?""",
+            (time.time(), limit))
+        for r in rows:
+            try:
+                r["payload"] = json.loads(r["payload"])
+            except (json.JSONDecodeError, TypeError):
+                r["payload"] = {}
+        return rows
+
+    def next_outbox_due(self) -> Optional[float]:
+        """Epoch time the next pending write becomes due, or None."""
+        row = self.fetchone(
+            "SELECT MIN(next_attempt) AS due FROM outbox WHERE status = 'pending'")
+        return row["due"] if row else None
+
+    def complete_outbox(self, entry_id: int):
+        """Remove a write once Sheets has accepted it."""
+        self.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+        self.commit()
+
+    def fail_outbox(self, entry_id: int, error: str, count: bool = True) -> bool:
+        """Record a failed attempt and back off exponentially. Returns True
+        when the write has used up OUTBOX_MAX_ATTEMPTS and is parked as
+        'failed' instead. ``count=False`` defers the write without using up
+        an attempt."""
+        row = self.fetchone("SELECT attempts FROM outbox WHERE id = ?", (entry_id,))
+        if not row:
+            return False
+        attempts = row["attempts"] + (1 if count else 0)
+        dead = attempts >= config.OUTBOX_MAX_ATTEMPTS
+        delay = min(config.OUTBOX_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0),
+                    config.OUTBOX_BACKOFF_MAX_SECONDS)
+        self.execute(
+            """UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ?,
+                   status = ?, updated_at = ?
+               WHERE id = ?""",
+            (attempts, time.time() + delay, str(error)[:500],
+             "failed" if dead else "pending", datetime.now().isoformat(), entry_id))
+        self.commit()
+        return dead
+
+    def defer_outbox(self, error: str, delay: float):
+        """Hold the whole queue back by ``delay`` seconds without using up
+        attempts (offline). Every pending write is pushed to at least the
+        same time, so they still go out oldest first when it is back."""
+        self.execute(
+            """UPDATE outbox SET next_attempt = MAX(next_attempt, ?), last_error = ?,
+                   updated_at = ?
+               WHERE status = 'pending'""",
+            (time.time() + delay, str(error)[:500], datetime.now().isoformat()))
+        self.commit()
+
+    def retry_failed_outbox(self) -> int:
+        """Put parked writes back in the queue for another round of attempts."""
+        cursor = self.execute(
+            """UPDATE outbox SET status = 'pending', attempts = 0, next_attempt = 0,
+                   updated_at = ?
+               WHERE status = 'failed'""",
+            (datetime.now().isoformat(),))
+        self.commit()
+        return cursor.rowcount
+
+    def get_outbox_counts(self) -> dict:
+        """{'pending': n, 'failed': n} for the status bar."""
+        counts = {"pending": 0, "failed": 0}
+        for r in self.fetchall("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status"):
+            counts[r["status"]] = r["n"]
+        return counts
+
     # ------------------------------------------------------------------
     # Search
     # ------------------------------------------------------------------
-    def rebuild_search_index(self):
-        """Rebuild the FTS5 search index from all tables."""
-        self.execute("DELETE FROM search_index")
+    # Entities covered by search_index. Each row's FTS rowid is
+    # ``id * 8 + code`` so the triggers can replace it with an O(log n)
+    # rowid delete. Entries: table -> (code, name, email, details, watched
+    # columns, extra WHEN condition).
+    SEARCH_SOURCES = {
+        "clients": (1, "name", "email",
+                    ["job_number", "service", "postcode", "address", "phone", "notes"],
+                    ""),
+        "invoices": (2, "client_name", "client_email",
+                     ["invoice_number", "job_number", "status", "notes"],
+                     ""),
+        "quotes": (3, "client_name", "client_email",
+                   ["quote_number", "job_number", "postcode", "address", "status", "notes"],
+                   ""),
+        "enquiries": (4, "name", "email",
+                      ["service", "postcode", "phone", "message"],
+                      ""),
+        "inbox": (5, "from_name", "from_email",
+                  ["client_name", "subject", "body_text"],
+                  "is_deleted = 0"),
+        "blog_posts": (6, "title", "author",
+                       ["category", "tags", "excerpt"],
+                       ""),
+    }
 
-        # Index clients
-        clients = self.fetchall("SELECT id, name, email, service, postcode, notes FROM clients")
-        for c in clients:
-            self.execute(
-                "INSERT INTO search_index (source_table, source_id, name, email, details) VALUES (?, ?, ?, ?, ?)",
-                ("clients", str(c["id"]), c["name"], c["email"],
-                 f"{c['service']} {c['postcode']} {c['notes']}")
-            )
+    def _search_select(self, table: str, alias: str = "") -> tuple[str, str]:
+        """(rowid, columns) SQL expressions for indexing one row of ``table``.
+        ``alias`` is NEW for triggers, empty for a plain SELECT."""
+        code, name_col, email_col, detail_cols, _ = self.SEARCH_SOURCES[table]
+        p = f"{alias}." if alias else ""
+        details = " || ' ' || ".join(f"COALESCE({p}{c}, '')" for c in detail_cols)
+        return (
+            f"{p}id * 8 + {code}",
+            f"'{table}', {p}id, COALESCE({p}{name_col}, ''), "
+            f"COALESCE({p}{email_col}, ''), {details}",
+        )
 
-        # Index invoices
-        invoices = self.fetchall("SELECT id, invoice_number, client_name, client_email FROM invoices")
-        for inv in invoices:
-            self.execute(
-                "INSERT INTO search_index (source_table, source_id, name, email, details) VALUES (?, ?, ?, ?, ?)",
-                ("invoices", str(inv["id"]), inv["client_name"], inv["client_email"], inv["invoice_number"])
+    def _install_search_index(self):
+        """(Re)create search_index, its triggers and contents.
+
+        Runs inside a migration; call again from a new migration whenever
+        SEARCH_SOURCES changes.
+        """
+        conn = self.conn
+        for table in self.SEARCH_SOURCES:
+            for event in ("ins", "upd", "del"):
+                conn.execute(f"DROP TRIGGER IF EXISTS trg_search_{table}_{event}")
+        conn.execute("DROP TABLE IF EXISTS search_index")
+        conn.execute("""CREATE VIRTUAL TABLE search_index USING fts5(
+            source_table UNINDEXED,
+            source_id UNINDEXED,
+            name,
+            email,
+            details,
+            tokenize = 'porter unicode61'
+        )""")
+        cols = "rowid, source_table, source_id, name, email, details"
+        for table, (code, name_col, email_col, detail_cols, cond) in self.SEARCH_SOURCES.items():
+            rowid, values = self._search_select(table, "NEW")
+            when = f"WHEN {cond.replace('is_deleted', 'NEW.is_deleted')}" if cond else ""
+            watched = ", ".join(dict.fromkeys(
+                [name_col, email_col, *detail_cols] + (["is_deleted"] if cond else [])))
+            conn.execute(f"""CREATE TRIGGER trg_search_{table}_ins AFTER INSERT ON {table}
+                {when}
+                BEGIN
+                    INSERT INTO search_index ({cols}) SELECT {rowid}, {values};
+                END""")
+            conn.execute(f"""CREATE TRIGGER trg_search_{table}_upd
+                AFTER UPDATE OF {watched} ON {table}
+                BEGIN
+                    DELETE FROM search_index WHERE rowid = OLD.id * 8 + {code};
+                    INSERT INTO search_index ({cols})
+                        SELECT {rowid}, {values} {when.replace('WHEN', 'WHERE')};
+                END""")
+            conn.execute(f"""CREATE TRIGGER trg_search_{table}_del AFTER DELETE ON {table}
+                BEGIN
+                    DELETE FROM search_index WHERE rowid = OLD.id * 8 + {code};
+                END""")
+        self._fill_search_index()
+
+    def _fill_search_index(self) -> int:
+        """Bulk-load search_index from every source table."""
+        total = 0
+        for table, (*_, cond) in self.SEARCH_SOURCES.items():
+            rowid, values = self._search_select(table)
+            cur = self.conn.execute(
+                f"INSERT INTO search_index (rowid, source_table, source_id, name, email, details) "
+                f"SELECT {rowid}, {values} FROM {table} {'WHERE ' + cond if cond else ''}"
             )
+            total += max(cur.rowcount, 0)
+        return total
 
-        self.commit()
-        log.info(f"Search index rebuilt: {len(clients)} clients, {len(invoices)} invoices")
+    def rebuild_search_index(self):
+        """Rebuild the FTS5 search index from all tables.
+
+        Triggers keep the index current on every write, so this is only a
+        repair tool (e.g. after restoring a backup made by another build).
+        """
+        with self._lock:
+            self.execute("DELETE FROM search_index")
+            total = self._fill_search_index()
+            self.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+            self.commit()
+        log.info(f"Search index rebuilt: {total} rows")
 
     def search(self, query: str, limit: int = 50) -> list[dict]:
-        """Full-text search across all indexed data."""
+        """Ranked full-text search across clients, invoices, quotes,
+        enquiries, inbox and blog posts.
+
+        Every word is prefix-matched; bm25 weights a name hit above an
+        email hit above a details hit.
+        """
         if not query or len(query) < 2:
             return []
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        fts_query = " ".join(f'"{w}"*' for w in words)
         try:
-            # Add wildcard for prefix matching
-            fts_query = f"{query}*"
             return self.fetchall(
                 """SELECT source_table, source_id, name, email,
                    highlight(search_index, 2, '**', '**') as name_hl,
-                   rank
+                   snippet(search_index, 4, '**', '**', '…', 10) as details_hl,
+                   bm25(search_index, 0, 0, 10.0, 5.0, 1.0) as rank
                    FROM search_index WHERE search_index MATCH ?
                    ORDER BY rank LIMIT ?""",
                 (fts_query, limit)
@@ -3087,12 +3829,110 @@ class Database:
     # ------------------------------------------------------------------
     # Statistics (computed from local data)
     # ------------------------------------------------------------------
+    # Aggregates maintained by triggers in kpi_buckets. Each metric is
+    # (name, table, bucket expr, total expr, row condition, watched
+    # columns); ``{r}`` stands for NEW/OLD in triggers and the table in
+    # the backfill. Conditions mirror the original GAS-matching queries.
+    _ACTIVE_STATUSES = "('active', 'confirmed', 'in progress', 'in-progress', 'scheduled')"
+    KPI_METRICS = [
+        ("revenue", "clients", "COALESCE({r}.date, '')", "{r}.price",
+         "LOWER({r}.status) != 'cancelled' AND {r}.price > 0",
+         ("status", "price", "date")),
+        ("service_revenue", "clients", "COALESCE({r}.service, '')", "{r}.price",
+         "LOWER({r}.status) != 'cancelled' AND {r}.price > 0",
+         ("status", "price", "service")),
+        ("client_status", "clients", "COALESCE({r}.status, '')", "0", "1",
+         ("status",)),
+        ("active_subs", "clients", "''", "0",
+         "LOWER({r}.type) LIKE '%subscription%' "
+         f"AND LOWER({{r}}.status) IN {_ACTIVE_STATUSES}",
+         ("type", "status")),
+        ("invoice_status", "invoices", "LOWER(COALESCE({r}.status, ''))",
+         "COALESCE({r}.amount, 0)", "1",
+         ("status", "amount")),
+        ("enquiry_status", "enquiries", "LOWER(COALESCE({r}.status, ''))", "0", "1",
+         ("status",)),
+    ]
+
+    def _install_kpi_buckets(self):
+        """(Re)create kpi_buckets triggers and backfill the aggregates.
+
+        Runs inside a migration; call again from a new migration whenever
+        KPI_METRICS changes.
+        """
+        conn = self.conn
+        conn.execute("""CREATE TABLE IF NOT EXISTS kpi_buckets (
+            metric      TEXT NOT NULL,
+            bucket      TEXT NOT NULL,
+            count       INTEGER DEFAULT 0,
+            total       REAL DEFAULT 0,
+            PRIMARY KEY (metric, bucket)
+        )""")
+        conn.execute("DELETE FROM kpi_buckets")
+
+        by_table: dict[str, list] = {}
+        for metric in self.KPI_METRICS:
+            by_table.setdefault(metric[1], []).append(metric)
+
+        for table, metrics in by_table.items():
+            add, sub, watched = [], [], []
+            for name, _, bucket, total, cond, cols in metrics:
+                new = {k: v.format(r="NEW") for k, v in
+                       (("bucket", bucket), ("total", total), ("cond", cond))}
+                old = {k: v.format(r="OLD") for k, v in
+                       (("bucket", bucket), ("total", total), ("cond", cond))}
+                add.append(
+                    f"INSERT INTO kpi_buckets (metric, bucket, count, total) "
+                    f"SELECT '{name}', {new['bucket']}, 1, {new['total']} WHERE {new['cond']} "
+                    f"ON CONFLICT(metric, bucket) DO UPDATE SET "
+                    f"count = count + 1, total = total + excluded.total;"
+                )
+                sub.append(
+                    f"UPDATE kpi_buckets SET count = count - 1, total = total - {old['total']} "
+                    f"WHERE metric = '{name}' AND bucket = {old['bucket']} AND {old['cond']};"
+                )
+                watched.extend(c for c in cols if c not in watched)
+
+                plain = {k: v.format(r=table) for k, v in
+                         (("bucket", bucket), ("total", total), ("cond", cond))}
+                conn.execute(
+                    f"INSERT INTO kpi_buckets (metric, bucket, count, total) "
+                    f"SELECT '{name}', {plain['bucket']}, COUNT(*), COALESCE(SUM({plain['total']}), 0) "
+                    f"FROM {table} WHERE {plain['cond']} GROUP BY 2"
+                )
+
+            for event in ("ins", "upd", "del"):
+                conn.execute(f"DROP TRIGGER IF EXISTS trg_kpi_{table}_{event}")
+            conn.execute(f"CREATE TRIGGER trg_kpi_{table}_ins AFTER INSERT ON {table} "
+                         f"BEGIN {' '.join(add)} END")
+            conn.execute(f"CREATE TRIGGER trg_kpi_{table}_upd "
+                         f"AFTER UPDATE OF {', '.join(watched)} ON {table} "
+                         f"BEGIN {' '.join(sub + add)} END")
+            conn.execute(f"CREATE TRIGGER trg_kpi_{table}_del AFTER DELETE ON {table} "
+                         f"BEGIN {' '.join(sub)} END")
+
+    def _kpi_rows(self, metric: str, where: str = "", params: tuple = ()) -> list[dict]:
+        return self.fetchall(
+            f"SELECT bucket, count, total FROM kpi_buckets "
+            f"WHERE metric = ? AND count > 0 {where} ORDER BY bucket ASC",
+            (metric, *params)
+        )
+
+    def _kpi_sum(self, metric: str, where: str = "", params: tuple = ()) -> dict:
+        row = self.fetchone(
+            f"SELECT COALESCE(SUM(count), 0) as count, COALESCE(SUM(total), 0) as total "
+            f"FROM kpi_buckets WHERE metric = ? {where}",
+            (metric, *params)
+        )
+        return {"count": row["count"], "total": round(row["total"], 2)}
+
     def get_revenue_stats(self) -> dict:
         """Calculate revenue statistics matching GAS logic.
 
         GAS counts ALL non-cancelled jobs with price > 0,
         regardless of payment status. YTD uses UK tax year
-        starting 6 April.
+        starting 6 April. Served from the trigger-maintained
+        kpi_buckets aggregates (a few primary-key range reads).
         """
         today_d = date.today()
         today = today_d.isoformat()
@@ -3107,73 +3947,42 @@ class Database:
         else:
             ytd_start = f"{today_d.year - 1}-04-06"
 
-        def sum_revenue(where: str, params: tuple = ()) -> float:
-            """Sum price for all non-cancelled jobs with price > 0."""
-            row = self.fetchone(
-                f"SELECT COALESCE(SUM(price), 0) as total FROM clients "
-                f"WHERE LOWER(status) != 'cancelled' AND price > 0 AND {where}",
-                params
-            )
-            return row["total"] if row else 0.0
-
-        # Active subscriptions: type contains 'subscription' (case-insensitive)
-        active_subs = self.fetchone(
-            "SELECT COUNT(*) as c FROM clients "
-            "WHERE LOWER(type) LIKE '%subscription%' "
-            "AND LOWER(status) IN ('active', 'confirmed', 'in progress', 'in-progress', 'scheduled')"
-        )["c"]
-
-        # Outstanding invoices: Unpaid, Sent, Overdue, Balance Due
-        outstanding_invoices = self.fetchone(
-            "SELECT COUNT(*) as c FROM invoices "
-            "WHERE LOWER(status) IN ('unpaid', 'sent', 'overdue', 'balance due')"
-        )["c"]
-        outstanding_amount = self.fetchone(
-            "SELECT COALESCE(SUM(amount), 0) as total FROM invoices "
-            "WHERE LOWER(status) IN ('unpaid', 'sent', 'overdue', 'balance due')"
-        )["total"]
-
-        pending_enquiries = self.fetchone(
-            "SELECT COUNT(*) as c FROM enquiries "
-            "WHERE LOWER(status) IN ('new', 'pending')"
-        )["c"]
+        outstanding = self._kpi_sum(
+            "invoice_status", "AND bucket IN ('unpaid', 'sent', 'overdue', 'balance due')")
 
         return {
-            "today": sum_revenue("date = ?", (today,)),
-            "week": sum_revenue("date >= ?", (week_start,)),
-            "month": sum_revenue("date >= ?", (month_start,)),
-            "ytd": sum_revenue("date >= ?", (ytd_start,)),
-            "total_clients": self.fetchone("SELECT COUNT(*) as c FROM clients")["c"],
-            "active_subs": active_subs,
-            "outstanding_invoices": outstanding_invoices,
-            "outstanding_amount": outstanding_amount,
-            "pending_enquiries": pending_enquiries,
+            "today": self._kpi_sum("revenue", "AND bucket = ?", (today,))["total"],
+            "week": self._kpi_sum("revenue", "AND bucket >= ?", (week_start,))["total"],
+            "month": self._kpi_sum("revenue", "AND bucket >= ?", (month_start,))["total"],
+            "ytd": self._kpi_sum("revenue", "AND bucket >= ?", (ytd_start,))["total"],
+            "total_clients": self._kpi_sum("client_status")["count"],
+            "active_subs": self._kpi_sum("active_subs")["count"],
+            "outstanding_invoices": outstanding["count"],
+            "outstanding_amount": outstanding["total"],
+            "pending_enquiries": self._kpi_sum(
+                "enquiry_status", "AND bucket IN ('new', 'pending')")["count"],
         }
 
     def get_revenue_by_service(self) -> list[dict]:
         """Revenue breakdown by service type."""
-        return self.fetchall(
-            """SELECT service, COUNT(*) as jobs, COALESCE(SUM(price), 0) as revenue
-               FROM clients WHERE LOWER(status) != 'cancelled' AND price > 0
-               GROUP BY service ORDER BY revenue DESC"""
+        rows = self._kpi_rows("service_revenue")
+        return sorted(
+            ({"service": r["bucket"], "jobs": r["count"], "revenue": round(r["total"], 2)}
+             for r in rows),
+            key=lambda r: r["revenue"], reverse=True,
         )
 
     def get_daily_revenue(self, days: int = 14) -> list[dict]:
         """Daily revenue for the last N days."""
         start = (date.today() - timedelta(days=days)).isoformat()
-        return self.fetchall(
-            """SELECT date, COUNT(*) as jobs, COALESCE(SUM(price), 0) as revenue
-               FROM clients WHERE LOWER(status) != 'cancelled' AND price > 0
-               AND date >= ? GROUP BY date ORDER BY date ASC""",
-            (start,)
-        )
+        return [
+            {"date": r["bucket"], "jobs": r["count"], "revenue": round(r["total"], 2)}
+            for r in self._kpi_rows("revenue", "AND bucket >= ?", (start,))
+        ]
 
     def get_status_counts(self) -> dict:
         """Count clients by status."""
-        rows = self.fetchall(
-            "SELECT status, COUNT(*) as count FROM clients GROUP BY status"
-        )
-        return {r["status"]: r["count"] for r in rows}
+        return {r["bucket"]: r["count"] for r in self._kpi_rows("client_status")}
 
     # ------------------------------------------------------------------
     # Agent Schedules
@@ -3288,6 +4097,32 @@ class Database:
         self.commit()
         return cursor.lastrowid
 
+    def log_emails(self, entries: list[dict]) -> int:
+        """
+        Bulk log_email — one executemany and commit for a batch of sends.
+        Each entry takes the log_email keyword arguments.
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (e.get("client_id", 0), e.get("client_name", ""),
+             e.get("client_email", ""), e.get("email_type", ""),
+             e.get("subject", ""), e.get("status", "sent"), now,
+             e.get("template_used", ""), e.get("provider", ""),
+             e.get("message_id", ""), e.get("notes", ""))
+            for e in entries
+        ]
+        if not rows:
+            return 0
+        self.executemany(
+            """INSERT INTO email_tracking (client_id, client_name, client_email,
+               email_type, subject, status, sent_at, template_used, provider,
+               message_id, notes)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows
+        )
+        self.commit()
+        return len(rows)
+
     def get_email_tracking(self, client_id: int = None, email_type: str = None,
                            limit: int = 100) -> list[dict]:
         sql = "SELECT * FROM email_tracking WHERE 1=1"
@@ -3296,8 +4131,8 @@ class Database:
             sql += " AND client_id = ?"
             params.append(client_id)
         if email_type:
-            sql += " AND email_type = ?"
-            params.append(email_type)
+            sql += " AND type_norm = ?"
+            params.append(self.normalise_email_type(email_type))
         sql += " ORDER BY sent_at DESC LIMIT ?"
         params.append(limit)
         return self.fetchall(sql, tuple(params))
@@ -3370,48 +4205,12 @@ class Database:
         self.execute("DELETE FROM blog_posts WHERE id = ?", (blog_id,))
         self.commit()
 
-    def upsert_blog_posts(self, rows: list[dict]):
+    def upsert_blog_posts(self, rows: list[dict]) -> Optional[dict]:
         """Bulk upsert blog posts from GAS sync. Removes stale posts not in Sheets."""
-        now = datetime.now().isoformat()
-        synced_post_ids = set()
         for row in rows:
-            pid = row.get("post_id", row.get("id", ""))
-            if pid:
-                synced_post_ids.add(str(pid))
-            existing = self.fetchone(
-                "SELECT id FROM blog_posts WHERE post_id = ?",
-                (pid,)
-            )
-            row["last_synced"] = now
-            row["dirty"] = 0
-            if existing:
-                cols = [k for k in row if k not in ("id",)]
-                sets = ", ".join(f"{c} = ?" for c in cols)
-                vals = [row[c] for c in cols] + [existing["id"]]
-                self.execute(f"UPDATE blog_posts SET {sets} WHERE id = ?", tuple(vals))
-            else:
-                if "post_id" not in row and "id" in row:
-                    row["post_id"] = str(row.pop("id"))
-                cols = [k for k in row if k != "id"]
-                placeholders = ", ".join("?" for _ in cols)
-                vals = [row[c] for c in cols]
-                self.execute(
-                    f"INSERT INTO blog_posts ({', '.join(cols)}) VALUES ({placeholders})",
-                    tuple(vals)
-                )
-
-        # Remove stale blog posts no longer in Sheets (skip locally-dirty rows)
-        if synced_post_ids:
-            placeholders = ", ".join("?" for _ in synced_post_ids)
-            deleted = self.execute(
-                f"DELETE FROM blog_posts WHERE dirty = 0"
-                f" AND post_id != ''"
-                f" AND post_id NOT IN ({placeholders})",
-                tuple(synced_post_ids),
-            )
-            if deleted.rowcount:
-                log.info("Removed %d stale blog posts not in Sheets", deleted.rowcount)
-        self.commit()
+            if "post_id" not in row and "id" in row:
+                row["post_id"] = str(row.pop("id"))
+        return self._bulk_upsert("blog_posts", rows, delete_stale_where="dirty = 0 AND post_id != ''")
 
     def get_blog_stats(self) -> dict:
         total = self.fetchone("SELECT COUNT(*) as c FROM blog_posts")["c"]
@@ -3497,45 +4296,347 @@ class Database:
 
     def get_completed_jobs_needing_email(self, target_date: str) -> list[dict]:
         """Get jobs completed today that haven't had a completion email sent."""
-        jobs = self.fetchall(
-            """SELECT * FROM clients
-               WHERE date = ? AND status IN ('Complete', 'Completed')
-               ORDER BY time ASC""",
-            (target_date,)
+        return self._automation_rows("job_complete", target_date)
+
+    # ------------------------------------------------------------------
+    # Email automation stages — candidate queries as anti-joins
+    # ------------------------------------------------------------------
+    # Each stage query selects its candidates and excludes anyone already
+    # emailed with a NOT EXISTS against email_tracking (served by the
+    # email_norm/type_norm indexes). Builders return
+    # (sql, params, order_by); the ORDER BY is kept separate so
+    # get_email_worklist() can wrap the query with the opt-out and
+    # duplicate guards before ordering and limiting.
+
+    @staticmethod
+    def _sent_clause(email_type: str, email_expr: str, extra: str = "",
+                     statuses: str = "('sent')") -> str:
+        """NOT EXISTS guard: no ``email_type`` email sent to ``email_expr``."""
+        return (
+            f"NOT EXISTS (SELECT 1 FROM email_tracking t "
+            f"WHERE t.email_norm = LOWER(TRIM({email_expr})) "
+            f"AND t.type_norm = '{email_type}' AND t.status IN {statuses} {extra})"
         )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_name FROM email_tracking
-               WHERE email_type = 'job_complete' AND sent_at >= ?""",
-            (target_date,)
+
+    def _automation_sql_job_complete(self, target_date: str):
+        return (
+            """SELECT * FROM clients c
+               WHERE c.date = ? AND c.status IN ('Complete', 'Completed')
+               AND NOT EXISTS (SELECT 1 FROM email_tracking t
+                   WHERE t.type_norm = 'job_complete' AND t.sent_at >= ?
+                   AND t.client_name = c.name)""",
+            (target_date, target_date), "time ASC",
+        )
+
+    def _automation_sql_invoice_sent(self):
+        return (
+            """SELECT * FROM invoices i
+               WHERE i.status = 'Unpaid' AND i.client_email != ''
+               AND i.issue_date != ''
+               AND """ + self._sent_clause(
+                "invoice_sent", "i.client_email", "AND t.notes = i.invoice_number"),
+            (), "issue_date DESC",
+        )
+
+    def _automation_sql_payment_reminder(self):
+        # GAS/Hub notes look like "INV-001 (5d overdue)"
+        return (
+            """SELECT * FROM invoices i
+               WHERE i.status IN ('Unpaid', 'Sent', 'Overdue', 'Balance Due')
+               AND i.amount > 0
+               AND i.client_email != ''
+               AND """ + self._sent_clause(
+                "payment_reminder", "i.client_email",
+                "AND t.sent_at >= date('now', '-7 days') "
+                "AND (t.notes = i.invoice_number OR substr(t.notes, 1, "
+                "length(i.invoice_number) + 2) = i.invoice_number || ' (')"),
+            (), "due_date ASC, issue_date ASC",
+        )
+
+    def _automation_sql_follow_up(self, days_ago: int = 3):
+        target = (date.today() - timedelta(days=days_ago)).isoformat()
+        return (
+            """SELECT * FROM clients c
+               WHERE c.date = ? AND c.status IN ('Complete', 'Completed') AND c.email != ''
+               AND """ + self._sent_clause("follow_up", "c.email", "AND t.sent_at >= ?"),
+            (target, target), "name ASC",
+        )
+
+    def _automation_sql_booking_confirmed(self):
+        today = date.today().isoformat()
+        return (
+            """SELECT * FROM clients c
+               WHERE c.status = 'Confirmed' AND c.email != ''
+               AND (c.updated_at >= ? OR c.created_at >= ?)
+               AND """ + self._sent_clause("booking_confirmed", "c.email", "AND t.sent_at >= ?"),
+            (today, today, today), "name ASC",
+        )
+
+    def _automation_sql_subscription_welcome(self):
+        today = date.today().isoformat()
+        return (
+            """SELECT * FROM clients c
+               WHERE c.frequency NOT IN ('One-Off', '')
+               AND c.email != ''
+               AND (c.created_at >= ? OR c.updated_at >= ?)
+               AND """ + self._sent_clause("subscription_welcome", "c.email"),
+            (today, today), "name ASC",
+        )
+
+    def _automation_sql_thank_you(self, milestones: list[int] = None):
+        if milestones is None:
+            milestones = [5, 10, 20, 50]
+        return (
+            """SELECT * FROM (
+                   SELECT name, email, COUNT(*) as job_count
+                   FROM clients
+                   WHERE status IN ('Complete', 'Completed') AND email != ''
+                   GROUP BY email
+                   HAVING job_count IN ({})
+               ) g
+               WHERE """.format(",".join("?" * len(milestones))) + self._sent_clause(
+                "thank_you", "g.email", "AND t.notes = 'milestone_' || g.job_count"),
+            tuple(milestones), "job_count DESC",
+        )
+
+    def _automation_sql_aftercare(self, target_date: str):
+        return (
+            """SELECT * FROM clients c
+               WHERE c.date = ? AND c.status IN ('Complete', 'Completed') AND c.email != ''
+               AND """ + self._sent_clause("aftercare", "c.email", "AND t.sent_at >= ?"),
+            (target_date, target_date), "time ASC",
+        )
+
+    def _automation_sql_re_engagement(self, min_days: int = 30, max_days: int = 90):
+        cutoff_start = (date.today() - timedelta(days=max_days)).isoformat()
+        cutoff_end = (date.today() - timedelta(days=min_days)).isoformat()
+        return (
+            """SELECT * FROM (
+                   SELECT name, email, service, MAX(date) as last_date,
+                          COUNT(*) as job_count
+                   FROM clients
+                   WHERE status IN ('Complete', 'Completed') AND email != ''
+                   AND frequency IN ('One-Off', '')
+                   GROUP BY email
+                   HAVING last_date >= ? AND last_date <= ?
+               ) g
+               WHERE """ + self._sent_clause(
+                "re_engagement", "g.email", "AND t.sent_at >= ?", "('sent', 'Sent')"),
+            (cutoff_start, cutoff_end, cutoff_start), "last_date ASC",
+        )
+
+    def _automation_sql_promotional(self, min_days: int = 7, max_days: int = 60):
+        cutoff_start = (date.today() - timedelta(days=max_days)).isoformat()
+        cutoff_end = (date.today() - timedelta(days=min_days)).isoformat()
+        return (
+            """SELECT * FROM (
+                   SELECT name, email, service, MIN(date) as first_date
+                   FROM clients
+                   WHERE status IN ('Complete', 'Completed') AND email != ''
+                   GROUP BY email
+                   HAVING first_date >= ? AND first_date <= ?
+               ) g
+               WHERE """ + self._sent_clause(
+                "promotional", "g.email", "AND t.sent_at >= ?", "('sent', 'Sent')"),
+            (cutoff_start, cutoff_end, cutoff_start), "first_date ASC",
+        )
+
+    def _automation_sql_referral(self, min_days: int = 14, max_days: int = 90):
+        cutoff_start = (date.today() - timedelta(days=max_days)).isoformat()
+        cutoff_end = (date.today() - timedelta(days=min_days)).isoformat()
+        return (
+            """SELECT * FROM (
+                   SELECT name, email, service, MAX(date) as last_date
+                   FROM clients
+                   WHERE status IN ('Complete', 'Completed') AND email != ''
+                   GROUP BY email
+                   HAVING last_date >= ? AND last_date <= ?
+               ) g
+               WHERE """ + self._sent_clause(
+                "referral", "g.email", "AND t.sent_at >= ?", "('sent', 'Sent')"),
+            (cutoff_start, cutoff_end, cutoff_start), "last_date ASC",
+        )
+
+    def _automation_sql_package_upgrade(self, min_days: int = 30):
+        cutoff = (date.today() - timedelta(days=min_days)).isoformat()
+        return (
+            """SELECT * FROM (
+                   SELECT name, email, service, frequency, MIN(date) as start_date
+                   FROM clients
+                   WHERE status NOT IN ('Cancelled', '')
+                   AND email != ''
+                   AND frequency NOT IN ('One-Off', '')
+                   GROUP BY email
+                   HAVING start_date <= ?
+               ) g
+               WHERE """ + self._sent_clause(
+                "package_upgrade", "g.email", "AND t.sent_at >= ?", "('sent', 'Sent')"),
+            (cutoff, (date.today() - timedelta(days=60)).isoformat()), "start_date ASC",
+        )
+
+    def _automation_sql_seasonal_tips(self):
+        cutoff = (date.today() - timedelta(days=60)).isoformat()
+        return (
+            """SELECT * FROM (
+                   SELECT DISTINCT name, email, service
+                   FROM clients
+                   WHERE status NOT IN ('Cancelled', '')
+                   AND email != ''
+                   AND email NOT LIKE '%test@test%'
+                   AND email NOT LIKE '%example.com%'
+                   AND name != ''
+               ) g
+               WHERE """ + self._sent_clause(
+                "seasonal_tips", "g.email", "AND t.sent_at >= ?", "('sent', 'Sent')"),
+            (cutoff,), "name ASC",
         )
-        emailed_names = {r["client_name"] for r in emailed}
-        return [j for j in jobs if j.get("name", "") not in emailed_names]
+
+    def _automation_sql_quote_accepted(self):
+        # Hub logs "quote:Q-001", GAS-synced rows carry the bare number
+        return (
+            """SELECT * FROM quotes q
+               WHERE q.status = 'Accepted' AND q.client_email != ''
+               AND """ + self._sent_clause(
+                "quote_accepted", "q.client_email",
+                "AND t.notes IN (q.quote_number, 'quote:' || q.quote_number)"),
+            (), "date_created DESC",
+        )
+
+    def _automation_sql_payment_received(self):
+        # Safety: only invoices paid within the last 48 hours, so a data
+        # wipe + re-sync from Sheets can't re-send old receipts.
+        cutoff = (datetime.now() - timedelta(hours=48)).strftime("%Y-%m-%d")
+        # Match both Hub format "invoice:X" and GAS-synced format "X"
+        return (
+            """SELECT * FROM invoices i
+               WHERE i.status = 'Paid' AND i.client_email != ''
+               AND i.paid_date != '' AND i.paid_date >= ?
+               AND """ + self._sent_clause(
+                "payment_received", "i.client_email",
+                "AND t.notes IN (i.invoice_number, 'invoice:' || i.invoice_number)",
+                "('sent', 'Sent')"),
+            (cutoff,), "paid_date DESC",
+        )
+
+    def _automation_sql_cancellation(self):
+        return (
+            """SELECT * FROM cancellation_log
+               WHERE notified = 0 AND client_email != ''""",
+            (), "created_at DESC",
+        )
+
+    def _automation_sql_reschedule(self):
+        return (
+            """SELECT * FROM reschedule_log
+               WHERE notified = 0 AND client_email != ''""",
+            (), "created_at DESC",
+        )
+
+    # email_type -> (recipient column, apply opt-out/duplicate guards).
+    # Cancellation/reschedule rows are marked notified by the engine even
+    # when skipped, so they must reach it unfiltered.
+    EMAIL_STAGES = {
+        "quote_accepted": ("client_email", True),
+        "booking_confirmed": ("email", True),
+        "day_before_reminder": ("email", True),
+        "job_complete": ("email", True),
+        "aftercare": ("email", True),
+        "invoice_sent": ("client_email", True),
+        "payment_received": ("client_email", True),
+        "cancellation": ("client_email", False),
+        "payment_reminder": ("client_email", True),
+        "reschedule": ("client_email", False),
+        "follow_up": ("email", True),
+        "subscription_welcome": ("email", True),
+        "thank_you": ("email", True),
+        "re_engagement": ("email", True),
+        "seasonal_tips": ("email", True),
+        "promotional": ("email", True),
+        "referral": ("email", True),
+        "package_upgrade": ("email", True),
+    }
+
+    def _automation_rows(self, email_type: str, *args, limit: int = None) -> list[dict]:
+        sql, params, order = getattr(self, f"_automation_sql_{email_type}")(*args)
+        sql = f"{sql} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (*params, limit)
+        return self.fetchall(sql, params)
+
+    def get_email_worklist(self, stages: dict, repeatable_types=frozenset(),
+                           check_sent: bool = True) -> dict:
+        """Evaluate several automation stages in one pass.
+
+        ``stages`` maps email_type -> (args tuple, limit). Each SQL stage
+        runs once with its candidates anti-joined against
+        email_preferences (opt-outs for the type's category) and, when
+        ``check_sent``, against email_tracking with EmailProvider's
+        duplicate rule (same-day for ``repeatable_types``, lifetime
+        otherwise). Recipients are unique per stage. Returns
+        email_type -> ready-to-send rows.
+        """
+        worklist = {}
+        for email_type, (args, limit) in stages.items():
+            col, guarded = self.EMAIL_STAGES[email_type]
+            if not guarded:
+                worklist[email_type] = self._automation_rows(email_type, *args, limit=limit)
+                continue
+
+            category = self._EMAIL_CATEGORIES.get(email_type, email_type)
+            pref_col = {"transactional": "transactional_opt_in",
+                        "newsletter": "newsletter_opt_in"}.get(category, "marketing_opt_in")
+            dup_since = date.today().isoformat() if email_type in repeatable_types else ""
+            guards = (
+                f"AND NOT EXISTS (SELECT 1 FROM email_preferences p "
+                f"WHERE p.client_email = cand.{col} AND COALESCE(p.{pref_col}, 0) = 0)"
+            )
+            if check_sent:
+                guards += " AND " + self._sent_clause(
+                    email_type, f"cand.{col}",
+                    "AND t.sent_at >= ?" if dup_since else "", "('sent', 'Sent')")
+
+            if hasattr(self, f"_automation_sql_{email_type}"):
+                sql, params, order = getattr(self, f"_automation_sql_{email_type}")(*args)
+                params = (*params, *((dup_since,) if check_sent and dup_since else ()))
+                sql = f"SELECT * FROM ({sql}) AS cand WHERE cand.{col} != '' {guards} ORDER BY {order}"
+                if limit is not None:
+                    # Over-fetch so de-duplicating recipients still fills the limit
+                    sql += " LIMIT ?"
+                    params = (*params, limit * 2)
+                rows = self.fetchall(sql, params)
+            else:
+                # Python-assembled stage (day view) — guard the emails in one query
+                rows = getattr(self, {
+                    "day_before_reminder": "get_jobs_needing_reminder",
+                }[email_type])(*args)
+                emails = sorted({r.get(col) for r in rows if r.get(col)})
+                keep = set()
+                if emails:
+                    values = ", ".join(["(?)"] * len(emails))
+                    keep = {r["client_email"] for r in self.fetchall(
+                        f"SELECT column1 AS client_email FROM (VALUES {values}) AS cand "
+                        f"WHERE 1 {guards.replace(f'cand.{col}', 'cand.column1')}",
+                        (*emails, *((dup_since,) if check_sent and dup_since else ())),
+                    )}
+                rows = [r for r in rows if not r.get(col) or r.get(col) in keep]
+
+            seen, unique = set(), []
+            for r in rows:
+                key = self.normalise_email(r.get(col))
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                unique.append(r)
+            worklist[email_type] = unique[:limit]
+        return worklist
 
     # ------------------------------------------------------------------
     # New Lifecycle Queries
     # ------------------------------------------------------------------
     def get_unsent_invoices(self) -> list[dict]:
         """Get invoices that haven't had an invoice email sent yet."""
-        invoices = self.fetchall(
-            """SELECT * FROM invoices
-               WHERE status = 'Unpaid' AND client_email != ''
-               AND issue_date != ''
-               ORDER BY issue_date DESC"""
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email, notes FROM email_tracking
-               WHERE email_type = 'invoice_sent' AND status = 'sent'"""
-        )
-        # Build set of "email|invoice_number" to detect duplicates
-        emailed_keys = set()
-        for e in emailed:
-            notes = e.get("notes", "")
-            email = e.get("client_email", "")
-            emailed_keys.add(f"{email}|{notes}")
-
-        return [inv for inv in invoices
-                if f"{inv.get('client_email','')}|{inv.get('invoice_number','')}"
-                not in emailed_keys]
+        return self._automation_rows("invoice_sent")
 
     def get_overdue_invoices(self) -> list[dict]:
         """Get invoices that are overdue / balance due and need a payment reminder.
@@ -3544,141 +4645,32 @@ class Database:
         - Status is Unpaid, Sent, Overdue, or Balance Due
         - Amount > 0
         - Has a valid client email
-        - Due date is in the past (or 7+ days since issue if no due date)
+        - No reminder for this invoice in the last 7 days
         """
-        invoices = self.fetchall(
-            """SELECT * FROM invoices
-               WHERE status IN ('Unpaid', 'Sent', 'Overdue', 'Balance Due')
-               AND amount > 0
-               AND client_email != ''
-               ORDER BY due_date ASC, issue_date ASC"""
-        )
-        # Filter out ones that already got a recent reminder (within 7 days)
-        recent_reminders = self.fetchall(
-            """SELECT DISTINCT client_email, notes FROM email_tracking
-               WHERE email_type = 'payment_reminder' AND status = 'sent'
-               AND sent_at >= date('now', '-7 days')"""
-        )
-        reminded_keys = set()
-        for r in recent_reminders:
-            notes = r.get("notes", "").split(" (")[0]  # Extract invoice number before parenthetical
-            email = r.get("client_email", "")
-            reminded_keys.add(f"{email}|{notes}")
-
-        return [inv for inv in invoices
-                if f"{inv.get('client_email','')}|{inv.get('invoice_number','')}"
-                not in reminded_keys]
+        return self._automation_rows("payment_reminder")
 
     def get_jobs_needing_follow_up(self, days_ago: int = 3) -> list[dict]:
         """Get completed jobs from X days ago that haven't had a follow-up."""
-        target = (date.today() - timedelta(days=days_ago)).isoformat()
-        jobs = self.fetchall(
-            """SELECT * FROM clients
-               WHERE date = ? AND status IN ('Complete', 'Completed') AND email != ''
-               ORDER BY name ASC""",
-            (target,)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email FROM email_tracking
-               WHERE email_type = 'follow_up' AND status = 'sent'
-               AND sent_at >= ?""",
-            (target,)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [j for j in jobs if j.get("email", "") not in emailed_emails]
+        return self._automation_rows("follow_up", days_ago)
 
     def get_new_bookings_needing_confirmation(self) -> list[dict]:
         """Get bookings confirmed today that haven't had a confirmation email."""
-        today = date.today().isoformat()
-        # Clients with status 'Confirmed' updated today
-        clients = self.fetchall(
-            """SELECT * FROM clients
-               WHERE status = 'Confirmed' AND email != ''
-               AND (updated_at >= ? OR created_at >= ?)
-               ORDER BY name ASC""",
-            (today, today)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email FROM email_tracking
-               WHERE email_type = 'booking_confirmed' AND status = 'sent'
-               AND sent_at >= ?""",
-            (today,)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [c for c in clients if c.get("email", "") not in emailed_emails]
+        return self._automation_rows("booking_confirmed")
 
     def get_new_subscription_clients(self) -> list[dict]:
         """Get clients with recurring frequency added today that haven't had a welcome."""
-        today = date.today().isoformat()
-        clients = self.fetchall(
-            """SELECT * FROM clients
-               WHERE frequency NOT IN ('One-Off', '')
-               AND email != ''
-               AND (created_at >= ? OR updated_at >= ?)
-               ORDER BY name ASC""",
-            (today, today)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email FROM email_tracking
-               WHERE email_type = 'subscription_welcome' AND status = 'sent'"""
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [c for c in clients if c.get("email", "") not in emailed_emails]
+        return self._automation_rows("subscription_welcome")
 
     def get_clients_at_loyalty_milestone(self, milestones: list[int] = None) -> list[dict]:
         """Get clients who have just reached a loyalty milestone (5, 10, 20, 50 jobs)."""
-        if milestones is None:
-            milestones = [5, 10, 20, 50]
-        clients = self.fetchall(
-            """SELECT name, email, COUNT(*) as job_count
-               FROM clients
-               WHERE status IN ('Complete', 'Completed') AND email != ''
-               GROUP BY email
-               HAVING job_count IN ({})
-               ORDER BY job_count DESC""".format(",".join("?" * len(milestones))),
-            tuple(milestones)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email, notes FROM email_tracking
-               WHERE email_type = 'thank_you' AND status = 'sent'"""
-        )
-        # Track which milestones have been thanked per email
-        thanked = {}
-        for e in emailed:
-            em = e.get("client_email", "")
-            n = e.get("notes", "")
-            if em not in thanked:
-                thanked[em] = set()
-            thanked[em].add(n)
-
-        results = []
-        for c in clients:
-            email = c.get("email", "")
-            count = c.get("job_count", 0)
-            milestone_key = f"milestone_{count}"
-            if email not in thanked or milestone_key not in thanked.get(email, set()):
-                results.append(c)
-        return results
+        return self._automation_rows("thank_you", milestones)
 
     # ------------------------------------------------------------------
     # Aftercare Queries (completed today, not yet sent aftercare)
     # ------------------------------------------------------------------
     def get_jobs_needing_aftercare(self, target_date: str) -> list[dict]:
         """Get jobs completed on target_date that haven't had an aftercare email."""
-        jobs = self.fetchall(
-            """SELECT * FROM clients
-               WHERE date = ? AND status IN ('Complete', 'Completed') AND email != ''
-               ORDER BY time ASC""",
-            (target_date,)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email FROM email_tracking
-               WHERE email_type = 'aftercare' AND status = 'sent'
-               AND sent_at >= ?""",
-            (target_date,)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [j for j in jobs if j.get("email", "") not in emailed_emails]
+        return self._automation_rows("aftercare", target_date)
 
     # ------------------------------------------------------------------
     # Re-engagement Queries (30-90 days idle, one-off clients)
@@ -3686,28 +4678,7 @@ class Database:
     def get_clients_needing_reengagement(self, min_days: int = 30,
                                           max_days: int = 90) -> list[dict]:
         """Get one-off clients whose last completed job was 30-90 days ago."""
-        cutoff_start = (date.today() - timedelta(days=max_days)).isoformat()
-        cutoff_end = (date.today() - timedelta(days=min_days)).isoformat()
-        clients = self.fetchall(
-            """SELECT name, email, service, MAX(date) as last_date,
-                      COUNT(*) as job_count
-               FROM clients
-               WHERE status IN ('Complete', 'Completed') AND email != ''
-               AND frequency IN ('One-Off', '')
-               GROUP BY email
-               HAVING last_date >= ? AND last_date <= ?
-               ORDER BY last_date ASC""",
-            (cutoff_start, cutoff_end)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT LOWER(client_email) as client_email FROM email_tracking
-               WHERE email_type IN ('re_engagement', 're-engagement')
-               AND status IN ('sent', 'Sent')
-               AND sent_at >= ?""",
-            (cutoff_start,)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [c for c in clients if c.get("email", "").lower() not in emailed_emails]
+        return self._automation_rows("re_engagement", min_days, max_days)
 
     # ------------------------------------------------------------------
     # Promotional Queries (7-60 days after first completed job)
@@ -3715,25 +4686,7 @@ class Database:
     def get_clients_needing_promo(self, min_days: int = 7,
                                    max_days: int = 60) -> list[dict]:
         """Get clients whose first completed job was 7-60 days ago."""
-        cutoff_start = (date.today() - timedelta(days=max_days)).isoformat()
-        cutoff_end = (date.today() - timedelta(days=min_days)).isoformat()
-        clients = self.fetchall(
-            """SELECT name, email, service, MIN(date) as first_date
-               FROM clients
-               WHERE status IN ('Complete', 'Completed') AND email != ''
-               GROUP BY email
-               HAVING first_date >= ? AND first_date <= ?
-               ORDER BY first_date ASC""",
-            (cutoff_start, cutoff_end)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT LOWER(client_email) as client_email FROM email_tracking
-               WHERE email_type = 'promotional' AND status IN ('sent', 'Sent')
-               AND sent_at >= ?""",
-            (cutoff_start,)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [c for c in clients if c.get("email", "").lower() not in emailed_emails]
+        return self._automation_rows("promotional", min_days, max_days)
 
     # ------------------------------------------------------------------
     # Referral Queries (14-90 days after completed job)
@@ -3741,111 +4694,35 @@ class Database:
     def get_clients_needing_referral(self, min_days: int = 14,
                                       max_days: int = 90) -> list[dict]:
         """Get clients whose completed job was 14-90 days ago, not yet sent referral."""
-        cutoff_start = (date.today() - timedelta(days=max_days)).isoformat()
-        cutoff_end = (date.today() - timedelta(days=min_days)).isoformat()
-        clients = self.fetchall(
-            """SELECT name, email, service, MAX(date) as last_date
-               FROM clients
-               WHERE status IN ('Complete', 'Completed') AND email != ''
-               GROUP BY email
-               HAVING last_date >= ? AND last_date <= ?
-               ORDER BY last_date ASC""",
-            (cutoff_start, cutoff_end)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT LOWER(client_email) as client_email FROM email_tracking
-               WHERE email_type = 'referral' AND status IN ('sent', 'Sent')
-               AND sent_at >= ?""",
-            (cutoff_start,)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [c for c in clients if c.get("email", "").lower() not in emailed_emails]
+        return self._automation_rows("referral", min_days, max_days)
 
     # ------------------------------------------------------------------
     # Package Upgrade Queries (subscribers 30+ days into plan)
     # ------------------------------------------------------------------
     def get_subscribers_needing_upgrade(self, min_days: int = 30) -> list[dict]:
         """Get subscription clients who've been active 30+ days, not yet sent upgrade."""
-        cutoff = (date.today() - timedelta(days=min_days)).isoformat()
-        clients = self.fetchall(
-            """SELECT name, email, service, frequency, MIN(date) as start_date
-               FROM clients
-               WHERE status NOT IN ('Cancelled', '')
-               AND email != ''
-               AND frequency NOT IN ('One-Off', '')
-               GROUP BY email
-               HAVING start_date <= ?
-               ORDER BY start_date ASC""",
-            (cutoff,)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT LOWER(client_email) as client_email FROM email_tracking
-               WHERE email_type IN ('package_upgrade', 'package-upgrade')
-               AND status IN ('sent', 'Sent')
-               AND sent_at >= ?""",
-            ((date.today() - timedelta(days=60)).isoformat(),)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        return [c for c in clients if c.get("email", "").lower() not in emailed_emails]
+        return self._automation_rows("package_upgrade", min_days)
 
     # ------------------------------------------------------------------
     # Seasonal Tips Queries (all active clients, max once per 60 days)
     # ------------------------------------------------------------------
     def get_clients_needing_seasonal_tips(self, max_results: int = 20) -> list[dict]:
         """Get active clients who haven't received seasonal tips in 60 days."""
-        cutoff = (date.today() - timedelta(days=60)).isoformat()
-        clients = self.fetchall(
-            """SELECT DISTINCT name, email, service
-               FROM clients
-               WHERE status NOT IN ('Cancelled', '')
-               AND email != ''
-               AND email NOT LIKE '%test@test%'
-               AND email NOT LIKE '%example.com%'
-               AND name != ''
-               ORDER BY name ASC"""
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT LOWER(client_email) as client_email FROM email_tracking
-               WHERE email_type IN ('seasonal_tips', 'seasonal-tips')
-               AND status IN ('sent', 'Sent')
-               AND sent_at >= ?""",
-            (cutoff,)
-        )
-        emailed_emails = {r["client_email"] for r in emailed}
-        result = [c for c in clients if c.get("email", "").lower() not in emailed_emails]
-        return result[:max_results]
+        return self._automation_rows("seasonal_tips", limit=max_results)
 
     # ------------------------------------------------------------------
     # Quote Accepted — quotes accepted but no confirmation email yet
     # ------------------------------------------------------------------
     def get_quotes_needing_acceptance_email(self) -> list[dict]:
         """Get accepted quotes that haven't had a quote_accepted email sent."""
-        quotes = self.fetchall(
-            """SELECT * FROM quotes
-               WHERE status = 'Accepted' AND client_email != ''
-               ORDER BY date_created DESC"""
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email, notes FROM email_tracking
-               WHERE email_type = 'quote_accepted' AND status = 'sent'"""
-        )
-        emailed_keys = set()
-        for e in emailed:
-            emailed_keys.add(f"{e.get('client_email', '')}|{e.get('notes', '')}")
-        return [q for q in quotes
-                if f"{q.get('client_email','')}|{q.get('quote_number','')}"
-                not in emailed_keys]
+        return self._automation_rows("quote_accepted")
 
     # ------------------------------------------------------------------
     # Cancellations — cancelled jobs needing notification email
     # ------------------------------------------------------------------
     def get_cancellations_needing_email(self) -> list[dict]:
         """Get cancellation log entries not yet emailed."""
-        return self.fetchall(
-            """SELECT * FROM cancellation_log
-               WHERE notified = 0 AND client_email != ''
-               ORDER BY created_at DESC"""
-        )
+        return self._automation_rows("cancellation")
 
     def save_cancellation_log(self, client_name: str, client_email: str,
                                service: str, job_date: str, reason: str = "") -> int:
@@ -3870,11 +4747,7 @@ class Database:
     # ------------------------------------------------------------------
     def get_reschedules_needing_email(self) -> list[dict]:
         """Get reschedule log entries not yet emailed."""
-        return self.fetchall(
-            """SELECT * FROM reschedule_log
-               WHERE notified = 0 AND client_email != ''
-               ORDER BY created_at DESC"""
-        )
+        return self._automation_rows("reschedule")
 
     def save_reschedule_log(self, client_name: str, client_email: str,
                              service: str, old_date: str, old_time: str,
@@ -3906,31 +4779,7 @@ class Database:
         Safety: only considers invoices paid within the last 48 hours to
         prevent re-sending receipts after a data wipe + re-sync from Sheets.
         """
-        from datetime import datetime, timedelta
-        cutoff = (datetime.now() - timedelta(hours=48)).strftime("%Y-%m-%d")
-
-        invoices = self.fetchall(
-            """SELECT * FROM invoices
-               WHERE status = 'Paid' AND client_email != ''
-               AND paid_date != '' AND paid_date >= ?
-               ORDER BY paid_date DESC""",
-            (cutoff,)
-        )
-        emailed = self.fetchall(
-            """SELECT DISTINCT client_email, notes FROM email_tracking
-               WHERE email_type IN ('payment_received', 'payment-received')
-               AND status IN ('sent', 'Sent')"""
-        )
-        emailed_keys = set()
-        for e in emailed:
-            raw_notes = e.get("notes", "")
-            email_addr = e.get("client_email", "")
-            # Match both Hub format "invoice:X" and GAS-synced format "X"
-            emailed_keys.add(f"{email_addr}|{raw_notes}")
-            emailed_keys.add(f"{email_addr}|invoice:{raw_notes}")
-        return [inv for inv in invoices
-                if f"{inv.get('client_email','')}|invoice:{inv.get('invoice_number','')}"
-                not in emailed_keys]
+        return self._automation_rows("payment_received")
 
     # ------------------------------------------------------------------
     # Auto-invoice — completed jobs needing invoice creation
@@ -4000,6 +4849,33 @@ class Database:
              int(newsletter), datetime.now().isoformat())
         )
 
+    # Email type -> preference category (email_preferences opt-in column)
+    _EMAIL_CATEGORIES = {
+        # Transactional — always send unless explicitly opted out
+        "enquiry_received": "transactional",
+        "quote_sent": "transactional",
+        "quote_accepted": "transactional",
+        "booking_confirmed": "transactional",
+        "day_before_reminder": "transactional",
+        "job_complete": "transactional",
+        "aftercare": "transactional",
+        "invoice_sent": "transactional",
+        "payment_received": "transactional",
+        "cancellation": "transactional",
+        "reschedule": "transactional",
+        "subscription_welcome": "transactional",
+        # Marketing — respect opt-out
+        "follow_up": "marketing",
+        "thank_you": "marketing",
+        "re_engagement": "marketing",
+        "seasonal_tips": "marketing",
+        "promotional": "marketing",
+        "referral": "marketing",
+        "package_upgrade": "marketing",
+        # Newsletter
+        "newsletter": "newsletter",
+    }
+
     def is_email_opted_out(self, email: str, email_type: str = "marketing") -> bool:
         """Check if a client has opted out of a specific email category.
         
@@ -4011,33 +4887,7 @@ class Database:
         if not pref:
             return False  # No record = opt-in by default
         
-        # Map email types to preference columns
-        category_map = {
-            # Transactional — always send unless explicitly opted out
-            "enquiry_received": "transactional",
-            "quote_sent": "transactional",
-            "quote_accepted": "transactional",
-            "booking_confirmed": "transactional",
-            "day_before_reminder": "transactional",
-            "job_complete": "transactional",
-            "aftercare": "transactional",
-            "invoice_sent": "transactional",
-            "payment_received": "transactional",
-            "cancellation": "transactional",
-            "reschedule": "transactional",
-            "subscription_welcome": "transactional",
-            # Marketing — respect opt-out
-            "follow_up": "marketing",
-            "thank_you": "marketing",
-            "re_engagement": "marketing",
-            "seasonal_tips": "marketing",
-            "promotional": "marketing",
-            "referral": "marketing",
-            "package_upgrade": "marketing",
-            # Newsletter
-            "newsletter": "newsletter",
-        }
-        category = category_map.get(email_type, email_type)
+        category = self._EMAIL_CATEGORIES.get(email_type, email_type)
         
         if category == "transactional":
             return not bool(pref.get("transactional_opt_in", 1))
@@ -6,11 +6,12 @@ Provides geocoding, travel time estimation, and day route planning.
 
 import math
 import logging
-import requests
+from datetime import datetime, timedelta
 from typing import Optional
 from functools import lru_cache
 
 from . import config
+from . import http_client
 
 log = logging.getLogger("ggm.distance")
 
@@ -59,10 +60,23 @@ def estimate_drive(straight_miles: float) -> dict:
 
 
 # ──────────────────────────────────────────────────────────────────
-# Postcodes.io API (free, no key needed)
+# Postcodes.io API (free, no key needed) with a persistent cache
 # ──────────────────────────────────────────────────────────────────
+# Lookups go memory -> geocode_cache table -> postcodes.io. Known
+# postcodes resolve offline; only new or expired ones cost a request,
+# and a stale row is still used when the API can't be reached.
+
+POSTCODES_BULK_URL = "https://api.postcodes.io/postcodes"
+POSTCODES_BULK_LIMIT = 100  # postcodes.io maximum per bulk request
 
 _postcode_cache: dict[str, Optional[dict]] = {}
+_store = None  # Database holding geocode_cache, set by attach_store()
+
+
+def attach_store(db):
+    """Persist lookups in db's geocode_cache table (called at start-up)."""
+    global _store
+    _store = db
 
 
 def _clean_postcode(pc: str) -> str:
@@ -70,85 +84,146 @@ def _clean_postcode(pc: str) -> str:
     return pc.strip().upper().replace(" ", "")
 
 
-def lookup_postcode(postcode: str) -> Optional[dict]:
-    """Geocode a single UK postcode. Returns {lat, lng, postcode, parish, district}."""
-    clean = _clean_postcode(postcode)
-    if not clean:
-        return None
+def _geo_from_api(r: dict) -> dict:
+    return {
+        "lat": r["latitude"],
+        "lng": r["longitude"],
+        "postcode": r["postcode"],
+        "parish": r.get("parish", "") or "",
+        "district": r.get("admin_district", "") or "",
+    }
 
-    if clean in _postcode_cache:
-        return _postcode_cache[clean]
 
+def _from_store(cleaned: list[str]) -> tuple[dict, dict]:
+    """Split geocode_cache hits into (fresh, stale) by TTL.
+    Negative rows map to None."""
+    fresh, stale = {}, {}
+    if _store is None or not cleaned:
+        return fresh, stale
     try:
-        resp = requests.get(
-            f"https://api.postcodes.io/postcodes/{clean}",
-            timeout=5,
-        )
-        data = resp.json()
-        if data.get("status") == 200 and data.get("result"):
-            r = data["result"]
-            result = {
-                "lat": r["latitude"],
-                "lng": r["longitude"],
-                "postcode": r["postcode"],
-                "parish": r.get("parish", ""),
-                "district": r.get("admin_district", ""),
-            }
-            _postcode_cache[clean] = result
-            return result
+        rows = _store.get_geocodes(cleaned)
     except Exception as e:
-        log.warning(f"Postcode lookup failed for {postcode}: {e}")
-
-    _postcode_cache[clean] = None
-    return None
+        log.warning(f"Geocode cache read failed: {e}")
+        return fresh, stale
+
+    now = datetime.now()
+    for pc, row in rows.items():
+        found = bool(row["found"])
+        ttl = config.GEOCODE_TTL_DAYS if found else config.GEOCODE_NEGATIVE_TTL_DAYS
+        geo = {
+            "lat": row["lat"],
+            "lng": row["lng"],
+            "postcode": _format_postcode(pc),
+            "parish": row["parish"] or "",
+            "district": row["district"] or "",
+        } if found else None
+        try:
+            expired = now - datetime.fromisoformat(row["fetched_at"]) > timedelta(days=ttl)
+        except (TypeError, ValueError):
+            expired = True
+        (stale if expired else fresh)[pc] = geo
+    return fresh, stale
 
 
-def bulk_lookup(postcodes: list[str]) -> list[Optional[dict]]:
-    """Bulk geocode up to 100 postcodes in one call."""
-    cleaned = [_clean_postcode(pc) for pc in postcodes if pc.strip()]
-    if not cleaned:
-        return []
+def _format_postcode(clean: str) -> str:
+    """PL268HN -> PL26 8HN (the inward code is always 3 characters)."""
+    return f"{clean[:-3]} {clean[-3:]}" if len(clean) > 3 else clean
 
-    # Split into un-cached and cached
-    results = [None] * len(cleaned)
-    to_lookup = []
-    to_lookup_idx = []
 
-    for i, pc in enumerate(cleaned):
-        if pc in _postcode_cache:
-            results[i] = _postcode_cache[pc]
-        else:
-            to_lookup.append(pc)
-            to_lookup_idx.append(i)
-
-    if to_lookup:
+def _fetch(cleaned: list[str]) -> dict[str, Optional[dict]]:
+    """
+    Bulk-geocode postcodes from postcodes.io, 100 per request.
+    Returns answers only — a postcode the API doesn't know maps to None;
+    ones in a failed request are left out so they aren't negatively cached.
+    """
+    answers = {}
+    for i in range(0, len(cleaned), POSTCODES_BULK_LIMIT):
+        chunk = cleaned[i:i + POSTCODES_BULK_LIMIT]
         try:
-            resp = requests.post(
-                "https://api.postcodes.io/postcodes",
-                json={"postcodes": to_lookup},
+            resp = http_client.post(
+                POSTCODES_BULK_URL,
+                json={"postcodes": chunk},
                 timeout=10,
             )
             data = resp.json()
-            if data.get("status") == 200 and data.get("result"):
-                for j, entry in enumerate(data["result"]):
-                    idx = to_lookup_idx[j]
-                    if entry.get("result"):
-                        r = entry["result"]
-                        result = {
-                            "lat": r["latitude"],
-                            "lng": r["longitude"],
-                            "postcode": r["postcode"],
-                            "parish": r.get("parish", ""),
-                            "district": r.get("admin_district", ""),
-                        }
-                        results[idx] = result
-                        _postcode_cache[to_lookup[j]] = result
-                    else:
-                        _postcode_cache[to_lookup[j]] = None
         except Exception as e:
             log.warning(f"Bulk postcode lookup failed: {e}")
+            continue
+        if data.get("status") != 200:
+            log.warning(f"Bulk postcode lookup failed: HTTP {data.get('status')}")
+            continue
+        for j, entry in enumerate(data.get("result") or []):
+            if j < len(chunk):
+                r = entry.get("result")
+                answers[chunk[j]] = _geo_from_api(r) if r else None
+    return answers
+
+
+def _resolve(cleaned: list[str]) -> dict[str, Optional[dict]]:
+    """Geocode normalised postcodes through the cache layers."""
+    resolved = {pc: _postcode_cache[pc] for pc in cleaned if pc in _postcode_cache}
+    missing = [pc for pc in dict.fromkeys(cleaned) if pc not in resolved]
+    if not missing:
+        return resolved
+
+    fresh, stale = _from_store(missing)
+    resolved.update(fresh)
+    _postcode_cache.update(fresh)
+    missing = [pc for pc in missing if pc not in fresh]
+    if not missing:
+        return resolved
+
+    answers = _fetch(missing)
+    if answers and _store is not None:
+        try:
+            _store.save_geocodes([
+                dict(geo or {}, postcode=pc) for pc, geo in answers.items()
+            ])
+        except Exception as e:
+            log.warning(f"Geocode cache write failed: {e}")
+    _postcode_cache.update(answers)
+    resolved.update(answers)
+
+    # Offline or API error — fall back to expired entries for this session
+    for pc in missing:
+        if pc not in answers and pc in stale:
+            resolved[pc] = _postcode_cache[pc] = stale[pc]
+    return resolved
+
+
+def lookup_postcode(postcode: str) -> Optional[dict]:
+    """Geocode a single UK postcode. Returns {lat, lng, postcode, parish, district}."""
+    clean = _clean_postcode(postcode or "")
+    if not clean:
+        return None
+    return _resolve([clean]).get(clean)
 
-    return results
+
+def bulk_lookup(postcodes: list[str]) -> list[Optional[dict]]:
+    """Geocode many postcodes; results align with the non-blank inputs."""
+    cleaned = [_clean_postcode(pc) for pc in postcodes if pc and pc.strip()]
+    if not cleaned:
+        return []
+    resolved = _resolve(cleaned)
+    return [resolved.get(pc) for pc in cleaned]
+
+
+def prewarm(postcodes: list[str]) -> int:
+    """
+    Make sure every postcode is in the cache, fetching only those not yet
+    cached (or expired). Returns how many needed a network lookup.
+    """
+    cleaned = list(dict.fromkeys(
+        _clean_postcode(pc) for pc in postcodes if pc and pc.strip()
+    ))
+    fresh, _ = _from_store(cleaned)
+    _postcode_cache.update(fresh)
+    todo = [pc for pc in cleaned if pc not in fresh]
+    if todo:
+        _resolve(todo)
+        log.info(f"Geocode cache pre-warmed: {len(todo)} postcode(s) looked up, "
+                 f"{len(cleaned) - len(todo)} already cached")
+    return len(todo)
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -214,6 +289,10 @@ def plan_day_route(jobs: list[dict]) -> dict:
     Each job dict needs at minimum: name, postcode, service (for duration lookup).
     Optional: time (fixed appointment), id.
 
+    The order comes from route_optimiser.DayRouteOptimiser: appointments
+    are kept as time windows (waiting if early) and the rest of the day
+    is arranged to minimise driving within the working hours.
+
     Returns:
         {
             "route": [ordered list of job dicts with added travel info],
@@ -233,15 +312,16 @@ def plan_day_route(jobs: list[dict]) -> dict:
     warnings = []
 
     # ── Geocode all postcodes in one batch ──
-    postcodes = [j.get("postcode", "") for j in jobs]
-    geo_results = bulk_lookup(postcodes)
+    postcodes = [(j.get("postcode") or "").strip() for j in jobs]
+    known = [pc for pc in postcodes if pc]
+    geo_by_pc = dict(zip(known, bulk_lookup(known)))
 
     # Attach geo data to each job and calculate duration
     enriched = []
     ungeocodable = []
     for i, job in enumerate(jobs):
         j = dict(job)  # copy
-        geo = geo_results[i] if i < len(geo_results) else None
+        geo = geo_by_pc.get(postcodes[i])
         j["_geo"] = geo
         service = j.get("service", "")
         j["_duration_hrs"] = config.SERVICE_DURATIONS.get(service, 2.0)
@@ -254,72 +334,40 @@ def plan_day_route(jobs: list[dict]) -> dict:
     if ungeocodable:
         warnings.append(f"Could not geocode: {', '.join(ungeocodable)}")
 
-    # ── Separate fixed-time vs flexible jobs ──
-    fixed = []
-    flexible = []
+    # ── One distance matrix over base + every geocoded stop ──
+    from .distance_matrix import matrix_for_geos
+    matrix = matrix_for_geos([j["_geo"] for j in enriched])
     for j in enriched:
-        t = j.get("time", "").strip()
-        if t and ":" in t:
-            try:
-                h, m = t.split(":")[:2]
-                j["_fixed_minutes"] = int(h) * 60 + int(m)
-                fixed.append(j)
-            except ValueError:
-                flexible.append(j)
-        else:
-            flexible.append(j)
-
-    fixed.sort(key=lambda j: j["_fixed_minutes"])
-
-    # ── Nearest-neighbour route optimisation for flexible jobs ──
-    # Start from base, greedily pick the nearest unvisited geocoded job
-    flexible_geo = [j for j in flexible if j["_geo"]]
-    flexible_nogeo = [j for j in flexible if not j["_geo"]]
-
-    ordered_flexible = []
-    if flexible_geo:
-        remaining = list(flexible_geo)
-        cur_lat, cur_lng = config.BASE_LAT, config.BASE_LNG
-
-        while remaining:
-            best_idx = 0
-            best_dist = float("inf")
-            for idx, j in enumerate(remaining):
-                d = haversine(cur_lat, cur_lng, j["_geo"]["lat"], j["_geo"]["lng"])
-                if d < best_dist:
-                    best_dist = d
-                    best_idx = idx
+        j["_idx"] = matrix.index(j["_geo"]["postcode"]) if j["_geo"] else None
 
-            chosen = remaining.pop(best_idx)
-            cur_lat = chosen["_geo"]["lat"]
-            cur_lng = chosen["_geo"]["lng"]
-            ordered_flexible.append(chosen)
-
-    # Add non-geocodable at the end
-    ordered_flexible.extend(flexible_nogeo)
-
-    # ── Merge fixed and flexible into a timeline ──
-    route = _merge_fixed_and_flexible(fixed, ordered_flexible, warnings)
-
-    # ── Calculate travel segments ──
+    # ── Appointment times become time windows ──
+    from .route_optimiser import DayRouteOptimiser, Stop, appointment_minutes
+    for j in enriched:
+        j["_fixed_minutes"] = appointment_minutes(j.get("time", ""))
+
+    # ── Optimise the visiting order (2-opt / Or-opt with time windows) ──
+    stops = [
+        Stop(j["_idx"], int(j["_duration_hrs"] * 60), j["_fixed_minutes"])
+        for j in enriched
+    ]
+    optimiser = DayRouteOptimiser(matrix.legs(), stops)
+    visits, home_minutes = optimiser.schedule(optimiser.solve())
+
+    # ── Travel segments and times ──
+    route = []
     total_drive_min = 0
     total_drive_miles = 0.0
     total_work_hrs = 0.0
     route_postcodes = []
 
-    prev_lat, prev_lng = config.BASE_LAT, config.BASE_LNG
-
-    for j in route:
-        # Travel to this job
+    for v in visits:
+        j = enriched[v.stop]
         if j.get("_geo"):
-            straight = haversine(prev_lat, prev_lng, j["_geo"]["lat"], j["_geo"]["lng"])
-            drive = estimate_drive(straight)
+            drive = matrix.drive(v.from_idx, j["_idx"])
             j["travel_minutes"] = drive["drive_minutes"]
             j["travel_miles"] = drive["driving_miles"]
             total_drive_min += drive["drive_minutes"]
             total_drive_miles += drive["driving_miles"]
-            prev_lat = j["_geo"]["lat"]
-            prev_lng = j["_geo"]["lng"]
             route_postcodes.append(j.get("postcode", ""))
         else:
             j["travel_minutes"] = 0
@@ -327,37 +375,29 @@ def plan_day_route(jobs: list[dict]) -> dict:
 
         j["duration_hours"] = j["_duration_hrs"]
         total_work_hrs += j["_duration_hrs"]
-
-    # Travel home from last job
-    if route and route[-1].get("_geo"):
-        home = haversine(
-            route[-1]["_geo"]["lat"], route[-1]["_geo"]["lng"],
-            config.BASE_LAT, config.BASE_LNG,
-        )
-        home_drive = estimate_drive(home)
+        j["planned_start"] = _min_to_hhmm(v.start)
+        j["planned_end"] = _min_to_hhmm(v.end)
+        j["wait_minutes"] = v.start - v.arrive
+        if v.late_minutes:
+            warnings.append(
+                f"{j.get('name', 'Job')} misses its {_min_to_hhmm(j['_fixed_minutes'])} "
+                f"appointment by {format_drive_time(v.late_minutes)}"
+            )
+        route.append(j)
+
+    # Travel home from the last geocoded stop
+    last_idx = 0
+    for v in reversed(visits):
+        if enriched[v.stop].get("_geo"):
+            last_idx = enriched[v.stop]["_idx"]
+            break
+    if last_idx:
+        home_drive = matrix.drive(last_idx, 0)
         total_drive_min += home_drive["drive_minutes"]
         total_drive_miles += home_drive["driving_miles"]
 
-    # ── Assign times ──
-    cursor_min = config.WORK_START_HOUR * 60  # e.g. 480 = 08:00
-    for j in route:
-        cursor_min += j["travel_minutes"]
-        j["planned_start"] = _min_to_hhmm(cursor_min)
-        end_min = cursor_min + int(j["_duration_hrs"] * 60)
-        j["planned_end"] = _min_to_hhmm(end_min)
-        cursor_min = end_min
-
-    end_time_min = cursor_min + (total_drive_min - sum(j["travel_minutes"] for j in route))  # add return home
-    if route:
-        last_end = cursor_min
-        # add home travel
-        if route[-1].get("_geo"):
-            last_end += home_drive["drive_minutes"]
-        end_time_str = _min_to_hhmm(last_end)
-    else:
-        end_time_str = _min_to_hhmm(config.WORK_START_HOUR * 60)
-        last_end = config.WORK_START_HOUR * 60
-
+    last_end = (visits[-1].end + home_minutes) if visits else config.WORK_START_HOUR * 60
+    end_time_str = _min_to_hhmm(last_end)
     total_day_hrs = (last_end - config.WORK_START_HOUR * 60) / 60.0
 
     if last_end > config.WORK_END_HOUR * 60:
@@ -382,6 +422,7 @@ def plan_day_route(jobs: list[dict]) -> dict:
             "duration_hours": j.get("duration_hours", 0),
             "travel_minutes": j.get("travel_minutes", 0),
             "travel_miles": j.get("travel_miles", 0),
+            "wait_minutes": j.get("wait_minutes", 0),
             "parish": j.get("_geo", {}).get("parish", "") if j.get("_geo") else "",
             "price": j.get("price", 0),
             "status": j.get("status", ""),
@@ -401,42 +442,6 @@ def plan_day_route(jobs: list[dict]) -> dict:
     }
 
 
-def _merge_fixed_and_flexible(fixed: list, flexible: list, warnings: list) -> list:
-    """Merge fixed-time appointments with flexible jobs, respecting time constraints."""
-    if not fixed:
-        return flexible
-
-    result = []
-    flex_iter = iter(flexible)
-    cursor_min = config.WORK_START_HOUR * 60
-
-    for fj in fixed:
-        # Fill flexible jobs before this fixed appointment
-        while True:
-            try:
-                nxt = next(flex_iter)
-            except StopIteration:
-                break
-
-            est_end = cursor_min + int(nxt.get("_duration_hrs", 2) * 60) + 30  # 30 min travel buffer
-            if est_end <= fj["_fixed_minutes"]:
-                result.append(nxt)
-                cursor_min = est_end
-            else:
-                # Push back — can't fit before fixed appointment
-                flexible.insert(0, nxt)  # crude pushback
-                break
-
-        result.append(fj)
-        cursor_min = fj["_fixed_minutes"] + int(fj.get("_duration_hrs", 2) * 60)
-
-    # Remaining flexible
-    for fj in flex_iter:
-        result.append(fj)
-
-    return result
-
-
 def _min_to_hhmm(minutes: int) -> str:
     """Convert minutes since midnight to HH:MM string."""
     h = minutes // 60
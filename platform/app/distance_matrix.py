@@ -0,0 +1,197 @@
+"""
+Distance matrix engine for GGM Hub.
+Pairwise straight-line miles and estimated drive minutes between a set of
+geocoded stops plus the home base, computed in one pass and cached by
+stop set. Shared by the day route planner, round planning and the
+workflow optimiser instead of each running scalar haversine loops.
+
+Uses NumPy when it is installed; otherwise falls back to pure Python
+with identical results.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+from . import config
+from .distance import EARTH_RADIUS_MILES, estimate_drive
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+BASE_KEY = "__base__"
+_CACHE_SIZE = 32
+
+_cache: "OrderedDict[tuple, DistanceMatrix]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class DistanceMatrix:
+    """
+    Square matrices over `keys`, where index 0 is always the home base.
+
+        straight[i][j]  straight-line miles
+        miles[i][j]     estimated driving miles (winding factor applied)
+        minutes[i][j]   estimated drive minutes (speed profile applied)
+
+    Values are unrounded floats; drive(i, j) returns the same rounded
+    dict as distance.estimate_drive().
+    """
+
+    def __init__(self, stops: list[tuple[str, float, float]]):
+        self.keys = [BASE_KEY] + [key for key, _, _ in stops]
+        lats = [config.BASE_LAT] + [lat for _, lat, _ in stops]
+        lngs = [config.BASE_LNG] + [lng for _, _, lng in stops]
+        self._index = {key: i for i, key in enumerate(self.keys)}
+        self._legs = None
+
+        if HAS_NUMPY:
+            self.straight, self.miles, self.minutes = _build_numpy(lats, lngs)
+        else:
+            self.straight, self.miles, self.minutes = _build_python(lats, lngs)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def index(self, key: str) -> int:
+        """Row/column of a stop key (BASE_KEY is 0). Raises KeyError."""
+        return self._index[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def drive(self, i: int, j: int) -> dict:
+        """estimate_drive() result for the leg i -> j."""
+        return estimate_drive(float(self.straight[i][j]))
+
+    def legs(self) -> list[list[int]]:
+        """Whole drive minutes for every leg, rounded as estimate_drive()
+        rounds them — the table route_optimiser works on. Built once."""
+        if self._legs is None:
+            n = len(self.keys)
+            self._legs = [[self.drive(a, b)["drive_minutes"] for b in range(n)]
+                          for a in range(n)]
+        return self._legs
+
+    def route_minutes(self, order: list[int], round_trip: bool = True) -> float:
+        """Total drive minutes visiting `order` from the base (and back)."""
+        total, prev = 0.0, 0
+        for i in order:
+            total += self.minutes[prev][i]
+            prev = i
+        if round_trip and order:
+            total += self.minutes[prev][0]
+        return float(total)
+
+    def nearest_neighbour(self, indices: list[int], start: int = 0) -> list[int]:
+        """Greedy visiting order over `indices`, starting from `start`,
+        by straight-line distance (the planner's original heuristic)."""
+        remaining = list(indices)
+        order, cur = [], start
+        while remaining:
+            row = self.straight[cur]
+            best = min(range(len(remaining)), key=lambda k: row[remaining[k]])
+            cur = remaining.pop(best)
+            order.append(cur)
+        return order
+
+
+# ──────────────────────────────────────────────────────────────────
+# Builders
+# ──────────────────────────────────────────────────────────────────
+
+def _speeds(driving_miles):
+    """Speed profile from distance.estimate_drive, vectorised."""
+    return np.where(
+        driving_miles < 5, config.SPEED_RURAL,
+        np.where(driving_miles < 15, config.SPEED_MODERATE, config.SPEED_A_ROAD),
+    )
+
+
+def _build_numpy(lats: list[float], lngs: list[float]):
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lng = np.radians(np.asarray(lngs, dtype=float))
+    d_lat = lat[:, None] - lat[None, :]
+    d_lng = lng[:, None] - lng[None, :]
+    a = (np.sin(d_lat / 2) ** 2 +
+         np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(d_lng / 2) ** 2)
+    straight = EARTH_RADIUS_MILES * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    miles = straight * config.WINDING_FACTOR
+    speeds = _speeds(miles)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        minutes = np.where(speeds > 0, miles / speeds * 60, 0.0)
+    return straight, miles, minutes
+
+
+def _build_python(lats: list[float], lngs: list[float]):
+    n = len(lats)
+    lat = [math.radians(v) for v in lats]
+    lng = [math.radians(v) for v in lngs]
+    cos_lat = [math.cos(v) for v in lat]
+
+    straight = [[0.0] * n for _ in range(n)]
+    miles = [[0.0] * n for _ in range(n)]
+    minutes = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            a = (math.sin((lat[i] - lat[j]) / 2) ** 2 +
+                 cos_lat[i] * cos_lat[j] * math.sin((lng[i] - lng[j]) / 2) ** 2)
+            s = EARTH_RADIUS_MILES * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+            m = s * config.WINDING_FACTOR
+            if m < 5:
+                speed = config.SPEED_RURAL
+            elif m < 15:
+                speed = config.SPEED_MODERATE
+            else:
+                speed = config.SPEED_A_ROAD
+            t = (m / speed) * 60 if speed > 0 else 0.0
+            straight[i][j] = straight[j][i] = s
+            miles[i][j] = miles[j][i] = m
+            minutes[i][j] = minutes[j][i] = t
+    return straight, miles, minutes
+
+
+# ──────────────────────────────────────────────────────────────────
+# Cached access
+# ──────────────────────────────────────────────────────────────────
+
+def get_matrix(stops: list[tuple[str, float, float]]) -> DistanceMatrix:
+    """
+    Matrix for (key, lat, lng) stops plus the base. Duplicate keys are
+    collapsed and keys are sorted, so the same stop set in any order
+    hits the same cached matrix — look rows up with matrix.index(key).
+    """
+    unique = {}
+    for key, lat, lng in stops:
+        unique.setdefault(key, (key, float(lat), float(lng)))
+    canonical = tuple(sorted(unique.values()))
+    cache_key = (config.BASE_LAT, config.BASE_LNG, canonical)
+
+    with _cache_lock:
+        matrix = _cache.get(cache_key)
+        if matrix is not None:
+            _cache.move_to_end(cache_key)
+            return matrix
+
+    matrix = DistanceMatrix(list(canonical))
+    with _cache_lock:
+        _cache[cache_key] = matrix
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matrix
+
+
+def matrix_for_geos(geos: list[dict]) -> DistanceMatrix:
+    """Matrix over geocode dicts ({postcode, lat, lng}) keyed by postcode."""
+    return get_matrix([
+        (g["postcode"], g["lat"], g["lng"]) for g in geos if g
+    ])
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
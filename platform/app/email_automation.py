@@ -123,6 +123,8 @@ class EmailAutomationEngine:
         self._check_interval = config.EMAIL_AUTO_CHECK_INTERVAL
         self._daily_cap = config.EMAIL_DAILY_CAP
         self._listeners = []  # callbacks for UI update
+        self._worklist = {}     # email_type -> rows, for the current cycle
+        self._prechecked = set()  # (email_norm, email_type) cleared by the worklist
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -169,6 +171,8 @@ class EmailAutomationEngine:
             if email_type in self._MARKETING_TYPES:
                 log.info(f"Blocked {email_type} to owner email {email}")
                 return True
+        if self._is_prechecked(email, email_type):
+            return False
         try:
             return self.db.is_email_opted_out(email, email_type)
         except Exception:
@@ -196,111 +200,87 @@ class EmailAutomationEngine:
                     break
                 time.sleep(1)
 
+    # Stage schedule, in priority order:
+    # (email_type, sender method, first hour, last hour, max per cycle)
+    _STAGES = [
+        # --- Core journey (high priority, run anytime 8-20) ---
+        ("quote_accepted", "_send_quote_accepted_emails", 8, 20, 10),
+        ("booking_confirmed", "_send_booking_confirmations", 8, 20, 10),
+        ("day_before_reminder", "_send_day_before_reminders", 17, 19, 15),  # 5pm-7pm
+        ("job_complete", "_send_completion_emails", 8, 20, 10),
+        ("aftercare", "_send_aftercare_emails", 8, 20, 10),
+        ("invoice_sent", "_send_invoice_emails", 8, 20, 10),
+        ("payment_received", "_send_payment_received_emails", 8, 20, 10),
+        ("cancellation", "_send_cancellation_emails", 8, 20, 10),
+        ("payment_reminder", "_send_payment_reminders", 9, 11, 5),  # morning only
+        ("reschedule", "_send_reschedule_emails", 8, 20, 10),
+        # --- Engagement & retention ---
+        ("follow_up", "_send_follow_ups", 9, 11, 10),
+        ("subscription_welcome", "_send_subscription_welcomes", 8, 18, 5),
+        ("thank_you", "_send_loyalty_thank_yous", 9, 12, 5),
+        ("re_engagement", "_send_reengagement_emails", 9, 11, 5),
+        ("seasonal_tips", "_send_seasonal_tips", 10, 12, 5),
+        ("promotional", "_send_promotional_emails", 13, 16, 5),
+        ("referral", "_send_referral_emails", 14, 17, 5),
+        ("package_upgrade", "_send_package_upgrade_emails", 10, 12, 3),
+    ]
+
+    def _stage_args(self, email_type: str) -> tuple:
+        """Arguments for a stage's candidate query (see Database.EMAIL_STAGES)."""
+        today = date.today()
+        return {
+            "day_before_reminder": ((today + timedelta(days=1)).isoformat(),),
+            "job_complete": (today.isoformat(),),
+            "aftercare": ((today - timedelta(
+                days=getattr(config, "AFTERCARE_DELAY_DAYS", 1))).isoformat(),),
+            "follow_up": (getattr(config, "EMAIL_FOLLOW_UP_DELAY_DAYS", 3),),
+            "thank_you": (getattr(config, "EMAIL_LOYALTY_MILESTONES", [5, 10, 20, 50]),),
+        }.get(email_type, ())
+
     def _check_automation_triggers(self):
-        """Check all automation triggers and send emails as needed."""
+        """Check all automation triggers and send emails as needed.
+
+        All stages due this hour are evaluated together by
+        Database.get_email_worklist — one anti-join query per stage that
+        already excludes opted-out and already-emailed recipients — so the
+        senders skip their per-recipient opt-out and duplicate lookups.
+        """
         today_count = self.db.get_todays_auto_email_count()
         if today_count >= self._daily_cap:
             log.info(f"Daily email cap reached ({today_count}/{self._daily_cap})")
             return
 
         remaining = self._daily_cap - today_count
+        hour = datetime.now().hour
 
-        now = datetime.now()
-        hour = now.hour
-
-        # --- Core journey (high priority, run anytime 8-20) ---
-
-        # Quote accepted confirmations: immediate
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_quote_accepted_emails(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Booking confirmations: working hours
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_booking_confirmations(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Day-before reminders: 5pm-7pm
-        if 17 <= hour <= 19:
-            sent = self._send_day_before_reminders(max_send=min(remaining, 15))
-            remaining -= sent
-
-        # Completion emails: working hours
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_completion_emails(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Aftercare emails: day after completion (service-specific tips)
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_aftercare_emails(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Invoice emails: working hours
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_invoice_emails(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Payment received confirmations: working hours
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_payment_received_emails(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Cancellation confirmations: immediate
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_cancellation_emails(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Payment reminders for overdue/balance-due invoices: morning only
-        if 9 <= hour <= 11 and remaining > 0:
-            sent = self._send_payment_reminders(max_send=min(remaining, 5))
-            remaining -= sent
-
-        # Reschedule confirmations: immediate
-        if 8 <= hour <= 20 and remaining > 0:
-            sent = self._send_reschedule_emails(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # --- Engagement & retention ---
+        due = [s for s in self._STAGES if s[2] <= hour <= s[3]]
+        repeatable = getattr(self.provider, "_REPEATABLE_TYPES", frozenset())
+        try:
+            self._worklist = self.db.get_email_worklist(
+                {etype: (self._stage_args(etype), min(remaining, cap))
+                 for etype, _, _, _, cap in due},
+                repeatable_types=repeatable,
+                check_sent=self.provider is not None,
+            )
+        except Exception as e:
+            log.warning(f"Worklist evaluation failed, falling back per stage: {e}")
+            self._worklist = {}
+        self._prechecked = {
+            (self.db.normalise_email(row.get(self.db.EMAIL_STAGES[etype][0])), etype)
+            for etype, rows in self._worklist.items()
+            if self.db.EMAIL_STAGES[etype][1]
+            for row in rows
+        }
 
-        # Follow-up requests: morning (so they see it during the day)
-        if 9 <= hour <= 11 and remaining > 0:
-            sent = self._send_follow_ups(max_send=min(remaining, 10))
-            remaining -= sent
-
-        # Subscription welcome emails: working hours
-        if 8 <= hour <= 18 and remaining > 0:
-            sent = self._send_subscription_welcomes(max_send=min(remaining, 5))
-            remaining -= sent
-
-        # Loyalty thank-you emails: morning
-        if 9 <= hour <= 12 and remaining > 0:
-            sent = self._send_loyalty_thank_yous(max_send=min(remaining, 5))
-            remaining -= sent
-
-        # Re-engagement: morning — win back inactive one-off clients
-        if 9 <= hour <= 11 and remaining > 0:
-            sent = self._send_reengagement_emails(max_send=min(remaining, 5))
-            remaining -= sent
-
-        # Seasonal tips: late morning
-        if 10 <= hour <= 12 and remaining > 0:
-            sent = self._send_seasonal_tips(max_send=min(remaining, 5))
-            remaining -= sent
-
-        # Promotional upsells: afternoon
-        if 13 <= hour <= 16 and remaining > 0:
-            sent = self._send_promotional_emails(max_send=min(remaining, 5))
-            remaining -= sent
-
-        # Referral asks: afternoon
-        if 14 <= hour <= 17 and remaining > 0:
-            sent = self._send_referral_emails(max_send=min(remaining, 5))
-            remaining -= sent
-
-        # Package upgrade: morning
-        if 10 <= hour <= 12 and remaining > 0:
-            sent = self._send_package_upgrade_emails(max_send=min(remaining, 3))
-            remaining -= sent
+        try:
+            for etype, method, _, _, cap in due:
+                if remaining <= 0:
+                    break
+                sent = getattr(self, method)(max_send=min(remaining, cap))
+                remaining -= sent
+        finally:
+            self._worklist = {}
+            self._prechecked = set()
 
         # Process any queued emails (from cap overflow or failed retries)
         if remaining > 0 and self.provider:
@@ -311,13 +291,22 @@ class EmailAutomationEngine:
 
         log.debug(f"Email automation check complete. Remaining capacity: {remaining}")
 
+    def _stage_candidates(self, email_type: str, query, *args) -> list[dict]:
+        """This cycle's worklist rows for a stage, else a fresh query."""
+        rows = self._worklist.pop(email_type, None)
+        return rows if rows is not None else query(*args)
+
+    def _is_prechecked(self, email: str, email_type: str) -> bool:
+        """True when the worklist already cleared this recipient for this type."""
+        return (self.db.normalise_email(email), email_type) in self._prechecked
+
     # ------------------------------------------------------------------
     # Day-Before Reminders
     # ------------------------------------------------------------------
     def _send_day_before_reminders(self, max_send: int = 15) -> int:
         """Send reminders for tomorrow's jobs."""
         tomorrow = (date.today() + timedelta(days=1)).isoformat()
-        jobs = self.db.get_jobs_needing_reminder(tomorrow)
+        jobs = self._stage_candidates("day_before_reminder", self.db.get_jobs_needing_reminder, tomorrow)
 
         sent = 0
         for job in jobs[:max_send]:
@@ -350,6 +339,7 @@ class EmailAutomationEngine:
                         email_type="day_before_reminder",
                         client_id=client_id,
                         client_name=name,
+                        skip_duplicate_check=self._is_prechecked(email, "day_before_reminder"),
                     )
                     success = result["success"]
                 else:
@@ -398,7 +388,7 @@ class EmailAutomationEngine:
     def _send_completion_emails(self, max_send: int = 10) -> int:
         """Send completion/thank-you emails for jobs completed today."""
         today = date.today().isoformat()
-        jobs = self.db.get_completed_jobs_needing_email(today)
+        jobs = self._stage_candidates("job_complete", self.db.get_completed_jobs_needing_email, today)
 
         sent = 0
         for job in jobs[:max_send]:
@@ -424,6 +414,7 @@ class EmailAutomationEngine:
                         email_type="job_complete",
                         client_id=client_id,
                         client_name=name,
+                        skip_duplicate_check=self._is_prechecked(email, "job_complete"),
                     )
                     success = result["success"]
                 else:
@@ -467,7 +458,7 @@ class EmailAutomationEngine:
         - Remaining balance due
         - ALWAYS a Stripe payment link for balance > 0
         """
-        invoices = self.db.get_unsent_invoices()
+        invoices = self._stage_candidates("invoice_sent", self.db.get_unsent_invoices)
 
         sent = 0
         for inv in invoices[:max_send]:
@@ -553,7 +544,7 @@ class EmailAutomationEngine:
         ALWAYS includes the Stripe payment link and deposit breakdown.
         """
         try:
-            invoices = self.db.get_overdue_invoices()
+            invoices = self._stage_candidates("payment_reminder", self.db.get_overdue_invoices)
         except Exception:
             # Fallback if dedicated method doesn't exist yet
             try:
@@ -674,7 +665,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_booking_confirmations(self, max_send: int = 10) -> int:
         """Send confirmation emails for newly confirmed bookings."""
-        bookings = self.db.get_new_bookings_needing_confirmation()
+        bookings = self._stage_candidates("booking_confirmed", self.db.get_new_bookings_needing_confirmation)
 
         sent = 0
         for b in bookings[:max_send]:
@@ -735,7 +726,7 @@ class EmailAutomationEngine:
     def _send_follow_ups(self, max_send: int = 10) -> int:
         """Send feedback requests for jobs completed 3 days ago."""
         delay = getattr(config, "EMAIL_FOLLOW_UP_DELAY_DAYS", 3)
-        jobs = self.db.get_jobs_needing_follow_up(days_ago=delay)
+        jobs = self._stage_candidates("follow_up", self.db.get_jobs_needing_follow_up, delay)
 
         sent = 0
         for job in jobs[:max_send]:
@@ -769,7 +760,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_subscription_welcomes(self, max_send: int = 5) -> int:
         """Send welcome emails to new recurring-service clients."""
-        clients = self.db.get_new_subscription_clients()
+        clients = self._stage_candidates("subscription_welcome", self.db.get_new_subscription_clients)
 
         sent = 0
         for c in clients[:max_send]:
@@ -804,7 +795,7 @@ class EmailAutomationEngine:
     def _send_loyalty_thank_yous(self, max_send: int = 5) -> int:
         """Send thank-you emails to clients hitting loyalty milestones."""
         milestones = getattr(config, "EMAIL_LOYALTY_MILESTONES", [5, 10, 20, 50])
-        clients = self.db.get_clients_at_loyalty_milestone(milestones)
+        clients = self._stage_candidates("thank_you", self.db.get_clients_at_loyalty_milestone, milestones)
 
         sent = 0
         for c in clients[:max_send]:
@@ -839,7 +830,7 @@ class EmailAutomationEngine:
     def _send_aftercare_emails(self, max_send: int = 10) -> int:
         """Send aftercare tips for jobs completed yesterday (1-day delay)."""
         yesterday = (date.today() - timedelta(days=getattr(config, "AFTERCARE_DELAY_DAYS", 1))).isoformat()
-        jobs = self.db.get_jobs_needing_aftercare(yesterday)
+        jobs = self._stage_candidates("aftercare", self.db.get_jobs_needing_aftercare, yesterday)
 
         sent = 0
         for job in jobs[:max_send]:
@@ -873,7 +864,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_reengagement_emails(self, max_send: int = 5) -> int:
         """Send win-back emails to inactive one-off clients."""
-        clients = self.db.get_clients_needing_reengagement()
+        clients = self._stage_candidates("re_engagement", self.db.get_clients_needing_reengagement)
 
         sent = 0
         for c in clients[:max_send]:
@@ -907,7 +898,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_seasonal_tips(self, max_send: int = 5) -> int:
         """Send seasonal garden tips to active clients."""
-        clients = self.db.get_clients_needing_seasonal_tips(max_results=max_send)
+        clients = self._stage_candidates("seasonal_tips", self.db.get_clients_needing_seasonal_tips, max_send)
 
         season = _get_current_season()
         tips_data = SEASONAL_TIPS.get(season, {})
@@ -944,7 +935,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_promotional_emails(self, max_send: int = 5) -> int:
         """Send service upsell emails to recent clients."""
-        clients = self.db.get_clients_needing_promo()
+        clients = self._stage_candidates("promotional", self.db.get_clients_needing_promo)
 
         sent = 0
         for c in clients[:max_send]:
@@ -975,7 +966,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_referral_emails(self, max_send: int = 5) -> int:
         """Send referral programme emails to recent clients."""
-        clients = self.db.get_clients_needing_referral()
+        clients = self._stage_candidates("referral", self.db.get_clients_needing_referral)
 
         sent = 0
         for c in clients[:max_send]:
@@ -1005,7 +996,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_package_upgrade_emails(self, max_send: int = 3) -> int:
         """Send subscription upgrade suggestions to long-term subscribers."""
-        clients = self.db.get_subscribers_needing_upgrade()
+        clients = self._stage_candidates("package_upgrade", self.db.get_subscribers_needing_upgrade)
 
         sent = 0
         for c in clients[:max_send]:
@@ -1039,7 +1030,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_quote_accepted_emails(self, max_send: int = 10) -> int:
         """Send confirmation emails for newly accepted quotes."""
-        quotes = self.db.get_quotes_needing_acceptance_email()
+        quotes = self._stage_candidates("quote_accepted", self.db.get_quotes_needing_acceptance_email)
 
         sent = 0
         for q in quotes[:max_send]:
@@ -1079,7 +1070,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_cancellation_emails(self, max_send: int = 10) -> int:
         """Send cancellation confirmation emails."""
-        cancellations = self.db.get_cancellations_needing_email()
+        cancellations = self._stage_candidates("cancellation", self.db.get_cancellations_needing_email)
 
         sent = 0
         for c in cancellations[:max_send]:
@@ -1119,7 +1110,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_reschedule_emails(self, max_send: int = 10) -> int:
         """Send reschedule confirmation emails."""
-        reschedules = self.db.get_reschedules_needing_email()
+        reschedules = self._stage_candidates("reschedule", self.db.get_reschedules_needing_email)
 
         sent = 0
         for r in reschedules[:max_send]:
@@ -1162,7 +1153,7 @@ class EmailAutomationEngine:
     # ------------------------------------------------------------------
     def _send_payment_received_emails(self, max_send: int = 10) -> int:
         """Send payment receipt emails for newly paid invoices."""
-        invoices = self.db.get_paid_invoices_needing_receipt()
+        invoices = self._stage_candidates("payment_received", self.db.get_paid_invoices_needing_receipt)
 
         sent = 0
         for inv in invoices[:max_send]:
@@ -1225,6 +1216,7 @@ class EmailAutomationEngine:
                 email_type=email_type,
                 client_id=client_id, client_name=client_name,
                 notes=notes,
+                skip_duplicate_check=self._is_prechecked(email, email_type),
             )
             success = result["success"]
         else:
@@ -6,12 +6,15 @@ Includes retry logic, duplicate prevention, delivery tracking, and daily caps.
 
 import json
 import logging
+import threading
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
 from typing import Optional
 
 from . import config
+from . import http_client
 
 log = logging.getLogger("ggm.email_provider")
 
@@ -27,7 +30,8 @@ REPLY_TO = "enquiries@gardnersgm.co.uk"
 MAX_RETRIES = 3
 RETRY_BACKOFF = [2, 4, 8]  # seconds between retries
 DAILY_CAP = 150  # aligned with config.EMAIL_DAILY_CAP (Brevo 5000/month)
-NEWSLETTER_SPACING = 0.5  # seconds between newsletter sends
+BREVO_BATCH_SIZE = 1000  # messageVersions per Brevo request (API maximum)
+RATE_LIMIT_PAUSE = 10  # seconds to hold off after a 429 with no reset header
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -92,6 +96,54 @@ def _wrap_branded_html(body_html: str, subject: str = "") -> str:
 # Email Provider
 # ──────────────────────────────────────────────────────────────────
 
+# ──────────────────────────────────────────────────────────────────
+# Rate Limiting
+# ──────────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens refill continuously at `rate` per
+    second up to `capacity`; acquire() blocks until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(float(rate), 0.1)
+        self.capacity = max(int(capacity), 1)
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until the bucket has refilled enough."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Empty the bucket and hold every caller back for `seconds`."""
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._stamp = time.monotonic()
+
+
+def _retry_after(resp) -> float:
+    """Seconds to wait after a Brevo 429, from its rate-limit headers."""
+    for header in ("x-sib-ratelimit-reset", "retry-after"):
+        try:
+            return max(float(resp.headers.get(header, "")), 1.0)
+        except (TypeError, ValueError):
+            continue
+    return RATE_LIMIT_PAUSE
+
+
 class EmailProvider:
     """
     Manages email delivery exclusively via Brevo.
@@ -114,6 +166,13 @@ class EmailProvider:
         self.api = api  # GAS API client (data sync only, NOT email)
         self._brevo_key = getattr(config, "BREVO_API_KEY", "") or ""
         self._has_brevo = bool(self._brevo_key)
+        # Shared by every thread that talks to Brevo — automation, queue
+        # drain and newsletter workers all draw from the same allowance
+        self._limiter = TokenBucket(
+            getattr(config, "BREVO_RATE_PER_SECOND", 10),
+            getattr(config, "BREVO_RATE_BURST", 20),
+        )
+        self._workers = max(1, getattr(config, "BREVO_SEND_WORKERS", 4))
 
         if self._has_brevo:
             log.info("Email provider: Brevo (sole provider)")
@@ -232,18 +291,34 @@ class EmailProvider:
         body_html: str,
         subscribers: list[dict],
         preview_to: str = FROM_EMAIL,
+        wrap_branded: bool = True,
+        progress=None,
     ) -> dict:
         """
         Send a newsletter to all active subscribers.
 
-        1. Sends preview to Chris first
-        2. Then sends to all subscribers with spacing
+        1. Renders the branded wrapper once for the whole campaign
+        2. Sends preview to Chris first
+        3. Then sends to all subscribers — batched through Brevo
+           messageVersions (BREVO_BATCH_SIZE recipients per request), or
+           one send per recipient through the delivery pool without Brevo
+
+        progress(counts) is called from the sending thread after each
+        recipient with {total, done, sent, failed, skipped}.
+
+        Callers must pass subscribers already filtered for newsletter
+        opt-outs and add their own unsubscribe links; the hub's newsletter
+        sends go through GAS sendNewsletter, which does both.
 
         Returns: {sent: int, failed: int, skipped: int, preview_sent: bool}
         """
         results = {"sent": 0, "failed": 0, "skipped": 0, "preview_sent": False}
 
-        # Step 1: Send preview to Chris
+        # Step 1: Wrap once — every recipient gets the same body
+        if wrap_branded:
+            body_html = _wrap_branded_html(body_html, subject)
+
+        # Step 2: Send preview to Chris
         if preview_to:
             preview = self.send(
                 to_email=preview_to,
@@ -251,6 +326,7 @@ class EmailProvider:
                 subject=f"[PREVIEW] {subject}",
                 body_html=body_html,
                 email_type="newsletter_preview",
+                wrap_branded=False,
                 skip_duplicate_check=True,
             )
             results["preview_sent"] = preview["success"]
@@ -259,39 +335,174 @@ class EmailProvider:
             else:
                 log.warning(f"Preview failed: {preview['error']}")
 
-        # Step 2: Send to subscribers
+        # Step 3: Send to subscribers
+        jobs = []
+        skipped = 0
         for sub in subscribers:
             email = sub.get("email", "")
-            name = sub.get("name", "Subscriber")
-            status = sub.get("status", "active")
+            name = sub.get("name", "") or "Subscriber"
+            status = (sub.get("status") or "active").lower()
 
             if status != "active" or not email:
-                results["skipped"] += 1
+                skipped += 1
                 continue
 
-            result = self.send(
-                to_email=email,
-                to_name=name,
-                subject=subject,
-                body_html=body_html,
-                email_type="newsletter",
-                client_name=name,
-                skip_duplicate_check=True,  # newsletters are OK to resend
-            )
+            jobs.append({
+                "to_email": email,
+                "to_name": name,
+                "subject": subject,
+                "body_html": body_html,
+                "email_type": "newsletter",
+                "client_name": name,
+                "wrap_branded": False,
+                "skip_duplicate_check": True,  # newsletters are OK to resend
+            })
 
-            if result["success"]:
-                results["sent"] += 1
-            else:
-                results["failed"] += 1
-
-            # Spacing to avoid rate limits
-            time.sleep(NEWSLETTER_SPACING)
+        if self._has_brevo:
+            counts = self._deliver_batched(jobs, progress=progress, skipped=skipped)
+        else:
+            counts = self._deliver(jobs, progress=progress, skipped=skipped)
+        for key in ("sent", "failed", "skipped"):
+            results[key] = counts[key]
 
         log.info(f"Newsletter complete: {results['sent']} sent, "
                  f"{results['failed']} failed, {results['skipped']} skipped")
 
         return results
 
+    # ------------------------------------------------------------------
+    # Bulk Delivery
+    # ------------------------------------------------------------------
+    def _deliver(self, jobs: list[dict], progress=None, skipped: int = 0,
+                 outcomes: list = None) -> dict:
+        """
+        Run send(**job) for each job across the worker pool.
+
+        Pacing comes from the token bucket in _send_brevo, so the workers
+        only overlap request latency — throughput tracks the Brevo limit
+        rather than a fixed sleep. When `outcomes` is given, each job's
+        result is stored at the job's index.
+
+        Returns: {total, done, sent, failed, skipped}
+        """
+        counts = {"total": len(jobs) + skipped, "done": skipped,
+                  "sent": 0, "failed": 0, "skipped": skipped}
+        if outcomes is not None:
+            outcomes[:] = [None] * len(jobs)
+
+        def report():
+            if progress:
+                try:
+                    progress(dict(counts))
+                except Exception as e:
+                    log.debug(f"Delivery progress callback failed: {e}")
+
+        if not jobs:
+            report()
+            return counts
+
+        workers = min(self._workers, len(jobs))
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix="EmailSend") as pool:
+            futures = {pool.submit(self.send, **job): i
+                       for i, job in enumerate(jobs)}
+            for fut in as_completed(futures):
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    log.warning(f"Delivery worker error: {e}")
+                    result = {"success": False, "provider": "",
+                              "message_id": "", "error": str(e)}
+
+                if outcomes is not None:
+                    outcomes[futures[fut]] = result
+                if result.get("provider") == "skipped":
+                    counts["skipped"] += 1
+                elif result["success"]:
+                    counts["sent"] += 1
+                else:
+                    counts["failed"] += 1
+                counts["done"] += 1
+                report()
+
+        log.info(f"Delivered {len(jobs)} emails in {time.time() - started:.1f}s "
+                 f"({workers} workers)")
+        return counts
+
+    def _deliver_batched(self, jobs: list[dict], progress=None,
+                         skipped: int = 0) -> dict:
+        """
+        Deliver jobs sharing one subject and body as Brevo batch sends.
+
+        Each request carries up to BREVO_BATCH_SIZE recipients as
+        messageVersions, so a newsletter costs a handful of HTTP calls.
+        Results are logged to email_tracking in bulk; recipients of a
+        failed batch are queued for retry like a failed send().
+
+        As in send(), malformed addresses are dropped as failures (one
+        would make Brevo reject the whole request) and anything past
+        DAILY_CAP is queued instead of sent.
+        """
+        counts = {"total": len(jobs) + skipped, "done": skipped,
+                  "sent": 0, "failed": 0, "skipped": skipped}
+        started = time.time()
+
+        valid = [job for job in jobs if self._is_valid_email(job["to_email"] or "")]
+        if len(valid) < len(jobs):
+            log.warning(f"Dropped {len(jobs) - len(valid)} invalid email addresses")
+            counts["failed"] += len(jobs) - len(valid)
+            counts["done"] += len(jobs) - len(valid)
+        allowed = self._daily_cap_remaining()
+        jobs, overflow = valid[:allowed], valid[allowed:]
+        if overflow:
+            log.warning(f"Daily email cap reached — {len(overflow)} emails queued")
+            self._queue_emails(overflow)
+            counts["failed"] += len(overflow)
+            counts["done"] += len(overflow)
+
+        for i in range(0, len(jobs), BREVO_BATCH_SIZE):
+            chunk = jobs[i:i + BREVO_BATCH_SIZE]
+            first = chunk[0]
+            result = self._send_brevo_batch(
+                [(job["to_email"], job["to_name"]) for job in chunk],
+                first["subject"], first["body_html"],
+            )
+
+            ids = result.get("message_ids", [])
+            status = "sent" if result["success"] else "failed"
+            self.db.log_emails([{
+                "client_id": job.get("client_id", 0),
+                "client_name": job.get("client_name") or job["to_name"],
+                "client_email": job["to_email"],
+                "email_type": job["email_type"],
+                "subject": job["subject"],
+                "status": status,
+                "template_used": result["provider"],
+                "provider": result["provider"],
+                "message_id": ids[n] if n < len(ids) else "",
+                "notes": result["error"],
+            } for n, job in enumerate(chunk)])
+
+            if result["success"]:
+                counts["sent"] += len(chunk)
+            else:
+                counts["failed"] += len(chunk)
+                log.warning(f"Brevo batch of {len(chunk)} failed — queued for retry: "
+                            f"{result['error']}")
+                self._queue_emails(chunk)
+            counts["done"] += len(chunk)
+
+            if progress:
+                try:
+                    progress(dict(counts))
+                except Exception as e:
+                    log.debug(f"Delivery progress callback failed: {e}")
+
+        log.info(f"Batch-delivered {len(jobs)} emails in "
+                 f"{time.time() - started:.1f}s")
+        return counts
+
     # ------------------------------------------------------------------
     # Send Preview Only
     # ------------------------------------------------------------------
@@ -313,47 +524,110 @@ class EmailProvider:
     def _send_brevo(self, to_email: str, to_name: str,
                     subject: str, body_html: str) -> dict:
         """Send via Brevo SMTP API with retries."""
-        import requests
-
-        # Validate required fields — Brevo returns 400 missing_parameter if empty
-        if not subject or not subject.strip():
+        error = self._check_brevo_content(subject, body_html)
+        if error:
             return {"success": False, "provider": "brevo", "message_id": "",
-                    "error": "Empty subject — cannot send via Brevo"}
-        if not body_html or not body_html.strip():
-            return {"success": False, "provider": "brevo", "message_id": "",
-                    "error": "Empty body — cannot send via Brevo"}
+                    "error": error}
 
-        # Brevo requires a non-empty name in the "to" field
-        if not to_name or not to_name.strip():
-            to_name = to_email.split("@")[0].replace(".", " ").title()
+        payload = {
+            "sender": {"name": FROM_NAME, "email": FROM_EMAIL},
+            "to": [{"email": to_email, "name": self._brevo_name(to_email, to_name)}],
+            "replyTo": {"email": REPLY_TO, "name": FROM_NAME},
+            "subject": subject,
+            "htmlContent": body_html,
+        }
+
+        data, error = self._post_brevo(payload)
+        if data is None:
+            return {"success": False, "provider": "brevo", "message_id": "", "error": error}
+        return {"success": True, "provider": "brevo",
+                "message_id": data.get("messageId", ""), "error": ""}
+
+    def _send_brevo_batch(self, recipients: list[tuple[str, str]],
+                          subject: str, body_html: str) -> dict:
+        """
+        Send one body to many recipients in a single Brevo request.
+        Each (email, name) becomes its own messageVersion, so recipients
+        never see each other and can be personalised with {{params.name}}.
+
+        Returns: {success, provider, message_ids: list, error}
+        """
+        error = self._check_brevo_content(subject, body_html)
+        if error:
+            return {"success": False, "provider": "brevo", "message_ids": [],
+                    "error": error}
+
+        versions = []
+        for email, name in recipients:
+            name = self._brevo_name(email, name)
+            versions.append({
+                "to": [{"email": email, "name": name}],
+                "params": {"name": name, "email": email},
+            })
 
         payload = {
             "sender": {"name": FROM_NAME, "email": FROM_EMAIL},
-            "to": [{"email": to_email, "name": to_name}],
             "replyTo": {"email": REPLY_TO, "name": FROM_NAME},
             "subject": subject,
             "htmlContent": body_html,
+            "messageVersions": versions,
         }
 
+        data, error = self._post_brevo(payload)
+        if data is None:
+            return {"success": False, "provider": "brevo", "message_ids": [],
+                    "error": error}
+        return {"success": True, "provider": "brevo",
+                "message_ids": data.get("messageIds", []), "error": ""}
+
+    @staticmethod
+    def _check_brevo_content(subject: str, body_html: str) -> str:
+        """Brevo returns 400 missing_parameter for an empty subject or body."""
+        if not subject or not subject.strip():
+            return "Empty subject — cannot send via Brevo"
+        if not body_html or not body_html.strip():
+            return "Empty body — cannot send via Brevo"
+        return ""
+
+    @staticmethod
+    def _brevo_name(to_email: str, to_name: str) -> str:
+        """Brevo requires a non-empty name in the "to" field."""
+        if not to_name or not to_name.strip():
+            return to_email.split("@")[0].replace(".", " ").title()
+        return to_name
+
+    def _post_brevo(self, payload: dict) -> tuple[Optional[dict], str]:
+        """
+        POST a payload to the Brevo SMTP API, paced by the token bucket,
+        with retries. Returns (response JSON, "") or (None, error).
+        """
         headers = {
             "accept": "application/json",
             "content-type": "application/json",
             "api-key": self._brevo_key,
         }
 
+        error = ""
         for attempt in range(MAX_RETRIES):
+            self._limiter.acquire()
             try:
-                resp = requests.post(
-                    BREVO_API_URL, json=payload, headers=headers, timeout=30
+                # retries=0 — this loop owns retries and 429 pacing
+                resp = http_client.post(
+                    BREVO_API_URL, json=payload, headers=headers, timeout=30,
+                    retries=0,
                 )
 
                 if resp.status_code in (200, 201):
-                    data = resp.json()
-                    message_id = data.get("messageId", "")
-                    return {"success": True, "provider": "brevo",
-                            "message_id": message_id, "error": ""}
+                    return resp.json(), ""
 
                 error = f"Brevo HTTP {resp.status_code}: {resp.text[:200]}"
+                if resp.status_code == 429:
+                    # Rate limited — hold every sender back, then retry
+                    # once the bucket refills instead of a fixed backoff
+                    wait = _retry_after(resp)
+                    self._limiter.pause(wait)
+                    log.warning(f"Brevo rate limit hit — pausing sends for {wait:.0f}s")
+                    continue
                 log.warning(f"Brevo attempt {attempt + 1} failed: {error}")
 
             except Exception as e:
@@ -364,7 +638,7 @@ class EmailProvider:
             if attempt < MAX_RETRIES - 1:
                 time.sleep(RETRY_BACKOFF[attempt])
 
-        return {"success": False, "provider": "brevo", "message_id": "", "error": error}
+        return None, error
 
     # ------------------------------------------------------------------
     # GAS Fallback
@@ -426,38 +700,44 @@ class EmailProvider:
         seasonal-tips, referral, follow-up, etc. from re-firing after their
         DB query time-window rolls forward.
         """
-        # Also match the GAS hyphenated variant (e.g. payment_received / payment-received)
-        alt_type = email_type.replace("_", "-")
-        email_lower = to_email.lower() if to_email else ""
+        # Normalised keys also match the GAS hyphenated variant
+        # (e.g. payment_received / payment-received) — idx_email_tracking_dedup
+        email_norm = self.db.normalise_email(to_email)
+        type_norm = self.db.normalise_email_type(email_type)
         try:
             if email_type in self._REPEATABLE_TYPES:
                 # Same-day guard only
                 today = date.today().isoformat()
                 row = self.db.fetchone(
-                    """SELECT COUNT(*) as c FROM email_tracking
-                       WHERE LOWER(client_email) = ? AND email_type IN (?, ?)
-                       AND sent_at >= ? AND status IN ('sent', 'Sent')""",
-                    (email_lower, email_type, alt_type, today)
+                    """SELECT 1 FROM email_tracking
+                       WHERE email_norm = ? AND type_norm = ?
+                       AND status IN ('sent', 'Sent') AND sent_at >= ?
+                       LIMIT 1""",
+                    (email_norm, type_norm, today)
                 )
             else:
                 # Lifetime guard — never send the same type twice to one person
                 row = self.db.fetchone(
-                    """SELECT COUNT(*) as c FROM email_tracking
-                       WHERE LOWER(client_email) = ? AND email_type IN (?, ?)
-                       AND status IN ('sent', 'Sent')""",
-                    (email_lower, email_type, alt_type)
+                    """SELECT 1 FROM email_tracking
+                       WHERE email_norm = ? AND type_norm = ?
+                       AND status IN ('sent', 'Sent')
+                       LIMIT 1""",
+                    (email_norm, type_norm)
                 )
-            return row["c"] > 0 if row else False
+            return row is not None
         except Exception:
             return False
 
     def _over_daily_cap(self) -> bool:
         """Check if we've hit the daily email cap."""
+        return self._daily_cap_remaining() <= 0
+
+    def _daily_cap_remaining(self) -> int:
+        """Emails still allowed today under DAILY_CAP."""
         try:
-            count = self.db.get_todays_auto_email_count()
-            return count >= DAILY_CAP
+            return max(DAILY_CAP - self.db.get_todays_auto_email_count(), 0)
         except Exception:
-            return False
+            return DAILY_CAP
 
     def _queue_email(self, to_email: str, to_name: str, subject: str,
                      body_html: str, email_type: str, client_id: int,
@@ -476,6 +756,23 @@ class EmailProvider:
         except Exception as e:
             log.warning(f"Failed to queue email: {e}")
 
+    def _queue_emails(self, jobs: list[dict]):
+        """Queue a batch of send() jobs in one statement (failed bulk sends)."""
+        now = datetime.now().isoformat()
+        try:
+            self.db.executemany(
+                """INSERT INTO email_queue (to_email, to_name, subject, body_html,
+                   email_type, client_id, client_name, status, created_at, priority)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?, 5)""",
+                [(job["to_email"], job["to_name"], job["subject"], job["body_html"],
+                  job["email_type"], job.get("client_id", 0),
+                  job.get("client_name", ""), now) for job in jobs]
+            )
+            self.db.commit()
+            log.info(f"Queued {len(jobs)} emails for retry")
+        except Exception as e:
+            log.warning(f"Failed to queue emails: {e}")
+
     def process_queue(self, max_send: int = 20):
         """Process pending queued emails. Called from the automation loop."""
         if self._over_daily_cap():
@@ -492,6 +789,7 @@ class EmailProvider:
         except Exception:
             return
 
+        items = []
         for item in pending:
             retries = item.get("retry_count", 0)
 
@@ -509,28 +807,36 @@ class EmailProvider:
                 except Exception:
                     pass
                 continue
-
-            result = self.send(
-                to_email=item["to_email"],
-                to_name=item["to_name"],
-                subject=item["subject"],
-                body_html=item["body_html"],
-                email_type=item["email_type"],
-                client_id=item.get("client_id", 0),
-                client_name=item.get("client_name", ""),
-                wrap_branded=False,  # already wrapped when queued
-                skip_duplicate_check=True,
-                _from_queue=True,
-            )
-
-            status = "sent" if result["success"] else "pending"
-            retries += 1
-
+            items.append(item)
+
+        jobs = [{
+            "to_email": item["to_email"],
+            "to_name": item["to_name"],
+            "subject": item["subject"],
+            "body_html": item["body_html"],
+            "email_type": item["email_type"],
+            "client_id": item.get("client_id", 0),
+            "client_name": item.get("client_name", ""),
+            "wrap_branded": False,  # already wrapped when queued
+            "skip_duplicate_check": True,
+            "_from_queue": True,
+        } for item in items]
+
+        outcomes = []
+        self._deliver(jobs, outcomes=outcomes)
+
+        now = datetime.now().isoformat()
+        updates = [
+            ("sent" if result["success"] else "pending",
+             item.get("retry_count", 0) + 1, now, item["id"])
+            for item, result in zip(items, outcomes)
+        ]
+        if updates:
             try:
-                self.db.execute(
+                self.db.executemany(
                     """UPDATE email_queue SET status = ?, retry_count = ?,
                        last_attempt = ? WHERE id = ?""",
-                    (status, retries, datetime.now().isoformat(), item["id"])
+                    updates
                 )
                 self.db.commit()
             except Exception:
@@ -596,8 +902,7 @@ class EmailProvider:
         """Check email provider health. Returns {ok: bool, provider: str, error: str}."""
         if self._has_brevo:
             try:
-                import requests
-                resp = requests.get(
+                resp = http_client.get(
                     "https://api.brevo.com/v3/account",
                     headers={"api-key": self._brevo_key},
                     timeout=10,
@@ -0,0 +1,216 @@
+"""
+Shared HTTP client for every outbound integration (Brevo, Pexels,
+postcodes.io, Google Drive, LLM providers, Open-Meteo, Facebook).
+
+One pooled requests.Session per process keeps TLS connections alive per
+host, so repeat calls skip the handshake. Calls get consistent timeouts,
+retry with backoff on transient failures, and per-host metrics (requests,
+errors, retries, bytes, latency) for the logs.
+
+The GAS webhook keeps its own session in api.APIClient.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import config
+
+log = logging.getLogger("ggm.http")
+
+# Statuses worth retrying on requests that are safe to repeat
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+_session: requests.Session = None
+_session_lock = threading.Lock()
+
+_metrics: dict[str, dict] = {}
+_metrics_lock = threading.Lock()
+
+
+# ──────────────────────────────────────────────────────────────────
+# Session
+# ──────────────────────────────────────────────────────────────────
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool = max(1, config.HTTP_POOL_SIZE)
+                session = requests.Session()
+                # Retries are handled in request() so each call can opt out
+                adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool,
+                                      max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "User-Agent": f"GGM-Hub/{config.APP_VERSION}",
+                })
+                _session = session
+    return _session
+
+
+def close():
+    """Close pooled connections (called on shutdown)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# ──────────────────────────────────────────────────────────────────
+# Requests
+# ──────────────────────────────────────────────────────────────────
+
+def _timeout(timeout):
+    """Expand a single read timeout into (connect, read)."""
+    if timeout is None:
+        timeout = config.HTTP_TIMEOUT_SECONDS
+    if isinstance(timeout, (tuple, list)):
+        return tuple(timeout)
+    return (min(config.HTTP_CONNECT_TIMEOUT, timeout), timeout)
+
+
+def request(method: str, url: str, timeout=None, retries: int = None,
+            **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session.
+
+    Connection errors and timeouts are retried with exponential backoff
+    (read timeouts only for idempotent methods), as are 429/5xx responses
+    to idempotent methods, honouring Retry-After. Pass retries=0 for
+    probes that should fail fast or callers with their own retry loop.
+    Anything else — including 4xx/5xx after the last retry — is returned
+    or raised exactly as requests would, so callers keep their handling.
+    """
+    method = method.upper()
+    host = urlsplit(url).netloc or url
+    retries = config.HTTP_MAX_RETRIES if retries is None else max(0, retries)
+    timeout = _timeout(timeout)
+    session = get_session()
+
+    for attempt in range(retries + 1):
+        started = time.monotonic()
+        try:
+            resp = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout) as e:
+            _record(host, started, error=True, retried=attempt > 0)
+            # A read timeout on a POST may mean the server acted on it
+            read_timeout = isinstance(e, requests.exceptions.ReadTimeout)
+            if attempt >= retries or (read_timeout and method not in IDEMPOTENT_METHODS):
+                raise
+            wait = config.HTTP_BACKOFF_SECONDS * (2 ** attempt)
+            log.debug(f"{method} {host} failed ({e}) — retrying in {wait:.1f}s")
+            time.sleep(wait)
+            continue
+
+        size = 0 if kwargs.get("stream") else len(resp.content or b"")
+        _record(host, started, size=size, error=resp.status_code >= 400,
+                retried=attempt > 0)
+
+        if (resp.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+                and attempt < retries):
+            wait = _retry_after(resp, config.HTTP_BACKOFF_SECONDS * (2 ** attempt))
+            log.debug(f"{method} {host} HTTP {resp.status_code} — retrying in {wait:.1f}s")
+            resp.close()
+            time.sleep(wait)
+            continue
+        return resp
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def download(url: str, dest, timeout=None, headers: dict = None,
+             chunk_size: int = 64 * 1024) -> int:
+    """
+    Stream a URL to `dest`, writing to a .part file first so a failed
+    download never leaves a truncated file behind. Returns bytes written.
+    Raises requests.HTTPError on a non-2xx response.
+    """
+    dest = Path(dest)
+    part = dest.with_name(dest.name + ".part")
+    host = urlsplit(url).netloc or url
+    written = 0
+
+    with get(url, timeout=timeout, headers=headers, stream=True) as resp:
+        resp.raise_for_status()
+        try:
+            with open(part, "wb") as f:
+                for chunk in resp.iter_content(chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+            part.replace(dest)
+        finally:
+            if part.exists():
+                part.unlink()
+
+    _add_bytes(host, written)
+    return written
+
+
+def _retry_after(resp, default: float) -> float:
+    try:
+        return min(max(float(resp.headers.get("Retry-After", "")), 0.0), 60.0)
+    except (TypeError, ValueError):
+        return default
+
+
+# ──────────────────────────────────────────────────────────────────
+# Metrics
+# ──────────────────────────────────────────────────────────────────
+
+def _record(host: str, started: float, size: int = 0,
+            error: bool = False, retried: bool = False):
+    elapsed_ms = (time.monotonic() - started) * 1000
+    with _metrics_lock:
+        m = _metrics.setdefault(host, {
+            "requests": 0, "errors": 0, "retries": 0, "bytes": 0,
+            "total_ms": 0.0, "max_ms": 0.0,
+        })
+        m["requests"] += 1
+        m["errors"] += int(error)
+        m["retries"] += int(retried)
+        m["bytes"] += size
+        m["total_ms"] += elapsed_ms
+        m["max_ms"] = max(m["max_ms"], elapsed_ms)
+
+
+def _add_bytes(host: str, size: int):
+    with _metrics_lock:
+        if host in _metrics:
+            _metrics[host]["bytes"] += size
+
+
+def get_metrics() -> dict[str, dict]:
+    """Per-host counters since start-up, with avg_ms added."""
+    with _metrics_lock:
+        snapshot = {host: dict(m) for host, m in _metrics.items()}
+    for m in snapshot.values():
+        m["avg_ms"] = round(m["total_ms"] / m["requests"], 1) if m["requests"] else 0.0
+        m["total_ms"] = round(m["total_ms"], 1)
+        m["max_ms"] = round(m["max_ms"], 1)
+    return snapshot
+
+
+def log_metrics():
+    """Write a one-line summary per host to the log."""
+    for host, m in sorted(get_metrics().items()):
+        log.info(f"HTTP {host}: {m['requests']} requests, {m['errors']} errors, "
+                 f"{m['retries']} retries, {m['bytes'] / 1024:.0f} KB, "
+                 f"avg {m['avg_ms']:.0f} ms, max {m['max_ms']:.0f} ms")
@@ -21,6 +21,7 @@ except ImportError:
     log.warning("fpdf2 not installed — PDF invoice generation unavailable")
 
 from . import config
+from . import http_client
 
 # ── Brand colours (RGB) ──────────────────────────────────────────
 GGM_GREEN       = (45, 106, 79)    # #2d6a4f
@@ -391,7 +392,6 @@ def upload_pdf_to_drive(filepath: str, invoice_data: dict) -> str:
     """
     import base64
     import json as _json
-    import urllib.request
 
     try:
         with open(filepath, "rb") as f:
@@ -406,13 +406,13 @@ def upload_pdf_to_drive(filepath: str, invoice_data: dict) -> str:
             "adminToken": config.ADMIN_API_KEY,
         })
 
-        req = urllib.request.Request(
+        resp = http_client.post(
             config.SHEETS_WEBHOOK,
             data=payload.encode("utf-8"),
             headers={"Content-Type": "text/plain"},
+            timeout=30,
         )
-        resp = urllib.request.urlopen(req, timeout=30)
-        result = _json.loads(resp.read().decode("utf-8"))
+        result = _json.loads(resp.content.decode("utf-8"))
 
         if result.get("status") == "ok":
             drive_url = result.get("driveUrl", "")
@@ -18,11 +18,11 @@ import logging
 import os
 import subprocess
 import time
-import requests
 from dataclasses import dataclass
 from typing import Optional
 
 from . import config
+from . import http_client
 
 log = logging.getLogger("ggm.llm")
 
@@ -38,7 +38,7 @@ def _ensure_ollama_running():
     """
     url = os.getenv("OLLAMA_URL", "http://localhost:11434")
     try:
-        resp = requests.get(f"{url}/", timeout=3)
+        resp = http_client.get(f"{url}/", timeout=3, retries=0)
         if resp.status_code == 200:
             return  # already running
     except Exception:
@@ -59,7 +59,7 @@ def _ensure_ollama_running():
         for _ in range(15):
             time.sleep(1)
             try:
-                r = requests.get(f"{url}/", timeout=2)
+                r = http_client.get(f"{url}/", timeout=2, retries=0)
                 if r.status_code == 200:
                     log.info("Ollama started successfully")
                     return
@@ -109,7 +109,7 @@ def _restart_ollama_with_models_dir():
         for _ in range(15):
             time.sleep(1)
             try:
-                r = requests.get(f"{url}/", timeout=2)
+                r = http_client.get(f"{url}/", timeout=2, retries=0)
                 if r.status_code == 200:
                     log.info("Ollama restarted successfully with correct model path")
                     return True
@@ -156,7 +156,7 @@ def _probe_ollama() -> Optional[LLMProvider]:
     _ensure_ollama_running()
 
     try:
-        resp = requests.get(f"{url}/api/tags", timeout=5)
+        resp = http_client.get(f"{url}/api/tags", timeout=5, retries=0)
         if resp.status_code != 200:
             return None
         models = resp.json().get("models", [])
@@ -164,7 +164,7 @@ def _probe_ollama() -> Optional[LLMProvider]:
             # Ollama is running but sees no models — wrong OLLAMA_MODELS dir
             log.warning("Ollama running but no models found — restarting with E: drive path")
             if _restart_ollama_with_models_dir():
-                resp = requests.get(f"{url}/api/tags", timeout=5)
+                resp = http_client.get(f"{url}/api/tags", timeout=5, retries=0)
                 models = resp.json().get("models", []) if resp.status_code == 200 else []
             if not models:
                 return None
@@ -234,7 +234,7 @@ def _probe_openai() -> Optional[LLMProvider]:
 
     for local_url in local_urls:
         try:
-            resp = requests.get(f"{local_url}/models", timeout=3)
+            resp = http_client.get(f"{local_url}/models", timeout=3, retries=0)
             if resp.status_code == 200:
                 data = resp.json()
                 models = data.get("data", [])
@@ -252,10 +252,11 @@ def _probe_openai() -> Optional[LLMProvider]:
     # Cloud OpenAI
     if api_key:
         try:
-            resp = requests.get(
+            resp = http_client.get(
                 f"{base_url}/models",
                 headers={"Authorization": f"Bearer {api_key}"},
                 timeout=10,
+                retries=0,
             )
             if resp.status_code == 200:
                 return LLMProvider(
@@ -281,7 +282,7 @@ def _probe_gemini() -> Optional[LLMProvider]:
 
     try:
         url = f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}"
-        resp = requests.get(url, timeout=10)
+        resp = http_client.get(url, timeout=10, retries=0)
         if resp.status_code == 200:
             return LLMProvider(
                 name="Google Gemini",
@@ -390,7 +391,7 @@ def _generate_ollama(
     if system:
         payload["system"] = system
 
-    resp = requests.post(
+    resp = http_client.post(
         f"{provider.endpoint}/api/generate",
         json=payload,
         timeout=600,  # allow up to 10 min for longer content generation
@@ -401,7 +402,7 @@ def _generate_ollama(
         log.warning("Ollama 404 for model %s — restarting with correct model path", provider.model)
         if _restart_ollama_with_models_dir():
             # Retry once after restart
-            resp = requests.post(
+            resp = http_client.post(
                 f"{provider.endpoint}/api/generate",
                 json=payload,
                 timeout=600,
@@ -434,7 +435,7 @@ def _generate_openai(
     if provider.api_key:
         headers["Authorization"] = f"Bearer {provider.api_key}"
 
-    resp = requests.post(
+    resp = http_client.post(
         f"{provider.endpoint}/chat/completions",
         json=payload,
         headers=headers,
@@ -469,7 +470,7 @@ def _generate_gemini(
         },
     }
 
-    resp = requests.post(url, json=payload, timeout=120)
+    resp = http_client.post(url, json=payload, timeout=120)
     resp.raise_for_status()
     data = resp.json()
     candidates = data.get("candidates", [])
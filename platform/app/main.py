@@ -92,6 +92,10 @@ def main():
     db.initialize()
     logger.info(f"Database ready: {config.DB_PATH}")
 
+    # Geocodes persist in the database so route planning works offline
+    from app import distance
+    distance.attach_store(db)
+
     # Run startup backup
     try:
         backup_path = db.backup()
@@ -321,19 +325,21 @@ def _initial_load(window, sync, logger, health_results=None):
 
 
 def _ensure_default_agents(db, logger):
-    """Seed default blog + newsletter agents if the schedule table is empty.
+    """Seed any default agent whose agent_type has no schedule yet.
     
     Schedules:
       - Blog: Every Wednesday at 09:00 (weekly)
       - Newsletter: 1st Monday of each month at 10:00 (monthly)
+      - Workflow optimiser: Every Friday at 18:00 (weekly)
+      - Round planner: Every Saturday at 08:00 (weekly)
     
-    Both are ENABLED by default so the system runs fully automated.
+    All are ENABLED by default so the system runs fully automated.
     Content is saved as Draft and requires Telegram approval to publish.
+    Checked per agent_type, so agents added in later releases are seeded
+    on existing installs too.
     """
     try:
-        existing = db.get_agent_schedules()
-        if existing:
-            return  # Already configured
+        existing = {a.get("agent_type") for a in db.get_agent_schedules()}
         from app.agents import calculate_next_run
         from datetime import datetime
         defaults = [
@@ -367,8 +373,20 @@ def _ensure_default_agents(db, logger):
                 "next_run": calculate_next_run("Weekly", "Friday", "18:00"),
                 "config_json": "{}",
             },
+            {
+                "agent_type": "round_planner",
+                "name": "Weekly Round Planner",
+                "schedule_type": "Weekly",
+                "schedule_day": "Saturday",
+                "schedule_time": "08:00",
+                "enabled": 1,  # Proposals only — day changes need accepting
+                "next_run": calculate_next_run("Weekly", "Saturday", "08:00"),
+                "config_json": "{}",
+            },
         ]
         for d in defaults:
+            if d["agent_type"] in existing:
+                continue  # Already configured — keep the user's settings
             db.save_agent_schedule(d)
             logger.info("Seeded default agent: %s (enabled=%s)", d["name"], d["enabled"])
     except Exception as e:
@@ -501,6 +519,13 @@ def _shutdown(window, sync, agent_scheduler, email_engine, command_queue, auto_p
             except Exception:
                 pass
 
+    try:
+        from app import http_client
+        http_client.log_metrics()
+        http_client.close()
+    except Exception:
+        pass
+
     try:
         db.close()
         logger.info("Database closed")
@@ -0,0 +1,395 @@
+"""
+Round Planner Agent for GGM Hub.
+Checks whether recurring subscription clients are on the right weekdays.
+
+Every active subscription's visits over ROUND_PLAN_WEEKS (long enough to
+cover weekly, fortnightly and 4-weekly cycles) are laid out alongside the
+one-off and scheduled jobs already booked. Each day's route is optimised
+with route_optimiser, then clients are moved between ROUND_PLAN_DAYS one
+at a time — best saving first — while a move cuts weekly driving by at
+least ROUND_PLAN_MIN_SAVING_MINUTES without making any day late, overrun
+or go over MAX_JOBS_PER_DAY.
+
+Nothing changes on its own: the result is stored as a proposal (a diff of
+preferred days) for Chris to accept in Operations → Subscriptions.
+
+Clients stay put when their notes say "fixed day", when their current day
+is outside ROUND_PLAN_DAYS, or when their postcode can't be geocoded.
+"""
+
+import json
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+from . import config
+from .distance import bulk_lookup, format_drive_time
+from .distance_matrix import matrix_for_geos
+from .route_optimiser import (
+    DayRouteOptimiser, Stop, appointment_minutes, service_minutes,
+)
+
+log = logging.getLogger("ggm.round_planner")
+
+PROPOSAL_SETTING = "round_plan_proposal"
+PIN_MARKER = "fixed day"
+_DAY_SOLVE_SECONDS = 0.05
+_WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+             "Saturday", "Sunday"]
+
+
+def _name_key(name: str) -> str:
+    return (name or "").strip().lower()
+
+
+class RoundPlanner:
+    """
+    Proposes preferred-day changes for subscription clients.
+
+        planner = RoundPlanner(db, api)
+        result = planner.run()      # plan, store the proposal, notify
+        apply_moves(db, sync, result["moves"])
+    """
+
+    def __init__(self, db, api=None):
+        self.db = db
+        self.api = api
+
+    def run(self, config_json: str = "{}") -> dict:
+        """
+        Agent entry point. Plans the rounds, stores the proposal and sends
+        a Telegram summary when there are moves to review.
+        Returns the plan() result plus {title, report}.
+        """
+        options = json.loads(config_json) if config_json else {}
+        start = options.get("start")
+        result = self.plan(date.fromisoformat(start) if start else None)
+        result["title"] = f"Round Plan — {result['week_display']}"
+        result["report"] = format_diff(result)
+
+        self.db.set_setting(PROPOSAL_SETTING, json.dumps(result))
+        if self.api and result["moves"]:
+            self._send_telegram_summary(result)
+        log.info(f"Round planner: {len(result['moves'])} moves, saving "
+                 f"{result['saved_minutes_per_week']} min/week")
+        return result
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+    def plan(self, start: date = None) -> dict:
+        """
+        Search for day reassignments over the weeks from `start` (next
+        Monday by default). Returns:
+            {
+                "start": ISO date, "weeks": int, "week_display": str,
+                "generated_at": ISO datetime,
+                "before_minutes_per_week": int,
+                "after_minutes_per_week": int,
+                "saved_minutes_per_week": int,
+                "days": {weekday: {"before": int, "after": int}},
+                "moves": [{client_id, name, postcode, service, frequency,
+                           from_day, to_day, saved_minutes_per_week}],
+            }
+        """
+        started = time.monotonic()
+        deadline = started + config.ROUND_PLAN_SECONDS
+        weeks = max(1, config.ROUND_PLAN_WEEKS)
+        if start is None:
+            today = date.today()
+            start = today + timedelta(days=7 - today.weekday())
+        end = start + timedelta(weeks=weeks, days=-1)
+        start_s, end_s = start.isoformat(), end.isoformat()
+
+        subs = self.db.get_active_subscriptions()
+        jobs_by_date = self.db.get_jobs_in_range(start_s, end_s)
+        dates = [(start + timedelta(days=i)).isoformat() for i in range(weeks * 7)]
+
+        # ── Geocode every stop once, one matrix for the whole horizon ──
+        postcodes = sorted(({(j.get("postcode") or "").strip()
+                             for jobs in jobs_by_date.values() for j in jobs}
+                            | {(s.get("postcode") or "").strip() for s in subs}) - {""})
+        geo_by_pc = dict(zip(postcodes, bulk_lookup(postcodes)))
+        matrix = matrix_for_geos(list(geo_by_pc.values()))
+        self._legs = matrix.legs()
+
+        def stop_for(job: dict) -> Stop:
+            geo = geo_by_pc.get((job.get("postcode") or "").strip())
+            return Stop(matrix.index(geo["postcode"]) if geo else None,
+                        service_minutes(job.get("service", "")),
+                        appointment_minutes(job.get("time", "")))
+
+        # ── Which subscriptions may move, and their visits on each day ──
+        allowed_days = [d.lower() for d in config.ROUND_PLAN_DAYS]
+        self._subs, self._visits, self._stops, self._allowed = {}, {}, {}, {}
+        self._assign = {}
+        for sub in subs:
+            day = str(sub.get("preferred_day", "")).strip().lower()
+            current = self.db.get_subscription_visit_dates(sub, start_s, end_s)
+            if not current or not self._movable(sub, day, geo_by_pc, allowed_days):
+                continue
+            sid = sub["id"]
+            self._subs[sid] = sub
+            self._stops[sid] = stop_for(sub)
+            self._assign[sid] = day
+            self._visits[sid] = {day: current}
+            self._allowed[sid] = [day]
+            for other in allowed_days:
+                if other == day:
+                    continue
+                moved = self.db.get_subscription_visit_dates(sub, start_s, end_s, other)
+                # Only compare like for like — same number of visits
+                if len(moved) == len(current):
+                    self._visits[sid][other] = moved
+                    self._allowed[sid].append(other)
+
+        # ── Everything else on each date is fixed ──
+        movable_names = {_name_key(s.get("name")) for s in self._subs.values()}
+        self._fixed = {
+            d: [stop_for(j) for j in jobs_by_date.get(d, [])
+                if _name_key(j.get("client_name") or j.get("name")) not in movable_names]
+            for d in dates
+        }
+        self._members = {d: set() for d in dates}
+        for sid, day in self._assign.items():
+            for d in self._visits[sid][day]:
+                self._members[d].add(sid)
+
+        self._cost_cache = {}
+        before_by_day = self._drive_by_weekday(dates)
+        original = dict(self._assign)
+
+        # ── Best-improvement local search over single-client moves ──
+        min_saving = config.ROUND_PLAN_MIN_SAVING_MINUTES * weeks
+        savings = {}
+        while time.monotonic() < deadline:
+            best = None
+            for sid in self._subs:
+                for day in self._allowed[sid]:
+                    if day == self._assign[sid]:
+                        continue
+                    gain = self._move_gain(sid, day)
+                    if gain is not None and gain >= min_saving and (
+                            best is None or gain > best[0]):
+                        best = (gain, sid, day)
+                if time.monotonic() >= deadline:
+                    break
+            if best is None:
+                break
+            gain, sid, day = best
+            self._move(sid, day)
+            savings[sid] = savings.get(sid, 0) + gain
+
+        after_by_day = self._drive_by_weekday(dates)
+        moves = []
+        for sid, day in self._assign.items():
+            if day == original[sid]:
+                continue
+            sub = self._subs[sid]
+            moves.append({
+                "client_id": sid,
+                "name": sub.get("name", ""),
+                "postcode": sub.get("postcode", ""),
+                "service": sub.get("service", ""),
+                "frequency": sub.get("frequency", ""),
+                "from_day": original[sid].title(),
+                "to_day": day.title(),
+                "saved_minutes_per_week": round(savings.get(sid, 0) / weeks),
+            })
+        moves.sort(key=lambda m: -m["saved_minutes_per_week"])
+
+        before = sum(before_by_day.values())
+        after = sum(after_by_day.values())
+        log.debug(f"Round plan searched {len(self._subs)} clients in "
+                  f"{time.monotonic() - started:.1f}s ({len(self._cost_cache)} routes)")
+        return {
+            "start": start_s,
+            "weeks": weeks,
+            "week_display": f"{weeks} weeks from {start.strftime('%a %d %b %Y')}",
+            "generated_at": datetime.now().isoformat(),
+            "before_minutes_per_week": round(before / weeks),
+            "after_minutes_per_week": round(after / weeks),
+            "saved_minutes_per_week": round((before - after) / weeks),
+            "days": {
+                wd: {"before": round(before_by_day.get(wd, 0) / weeks),
+                     "after": round(after_by_day.get(wd, 0) / weeks)}
+                for wd in sorted(set(before_by_day) | set(after_by_day),
+                                 key=lambda w: _WEEKDAYS.index(w))
+            },
+            "moves": moves,
+        }
+
+    @staticmethod
+    def _movable(sub: dict, day: str, geo_by_pc: dict, allowed_days: list) -> bool:
+        if day not in allowed_days:
+            return False
+        if PIN_MARKER in (sub.get("notes") or "").lower():
+            return False
+        return bool(geo_by_pc.get((sub.get("postcode") or "").strip()))
+
+    # ------------------------------------------------------------------
+    # Route costs
+    # ------------------------------------------------------------------
+    def _day_cost(self, d: str, members: frozenset) -> tuple:
+        """(late, overrun, drive, finish) of the optimised route for date d."""
+        key = (d, members)
+        cost = self._cost_cache.get(key)
+        if cost is None:
+            stops = self._fixed[d] + [self._stops[sid] for sid in sorted(members)]
+            if stops:
+                optimiser = DayRouteOptimiser(self._legs, stops,
+                                              budget_seconds=_DAY_SOLVE_SECONDS)
+                cost = optimiser.cost(optimiser.solve())
+            else:
+                cost = (0, 0, 0, 0)
+            self._cost_cache[key] = cost
+        return cost
+
+    def _move_gain(self, sid: int, day: str):
+        """Drive minutes saved over the horizon by moving `sid` to `day`,
+        or None if the move breaks an appointment, the working day or
+        MAX_JOBS_PER_DAY."""
+        old_dates = self._visits[sid][self._assign[sid]]
+        new_dates = self._visits[sid][day]
+        affected = set(old_dates) | set(new_dates)
+
+        late_before = over_before = drive_before = 0
+        late_after = over_after = drive_after = 0
+        for d in affected:
+            members = self._members[d]
+            after_members = set(members)
+            if d in old_dates:
+                after_members.discard(sid)
+            if d in new_dates:
+                after_members.add(sid)
+                if len(self._fixed[d]) + len(after_members) > config.MAX_JOBS_PER_DAY:
+                    return None
+            b = self._day_cost(d, frozenset(members))
+            a = self._day_cost(d, frozenset(after_members))
+            late_before += b[0]
+            over_before += b[1]
+            drive_before += b[2]
+            late_after += a[0]
+            over_after += a[1]
+            drive_after += a[2]
+
+        if late_after > late_before or over_after > over_before:
+            return None
+        return drive_before - drive_after
+
+    def _move(self, sid: int, day: str):
+        for d in self._visits[sid][self._assign[sid]]:
+            self._members[d].discard(sid)
+        for d in self._visits[sid][day]:
+            self._members[d].add(sid)
+        self._assign[sid] = day
+
+    def _drive_by_weekday(self, dates: list[str]) -> dict:
+        totals = {}
+        for d in dates:
+            cost = self._day_cost(d, frozenset(self._members[d]))
+            if cost[2]:
+                wd = date.fromisoformat(d).strftime("%A")
+                totals[wd] = totals.get(wd, 0) + cost[2]
+        return totals
+
+    # ------------------------------------------------------------------
+    # Notification
+    # ------------------------------------------------------------------
+    def _send_telegram_summary(self, result: dict):
+        try:
+            msg = (f"🗺️ *Round Plan*\n\n"
+                   f"{len(result['moves'])} subscription day changes could save "
+                   f"{format_drive_time(result['saved_minutes_per_week'])} of driving a week.\n\n")
+            for m in result["moves"][:5]:
+                msg += f"• {m['name']}: {m['from_day']} → {m['to_day']}\n"
+            msg += "\n📋 Review in GGM Hub → Operations → Subscriptions"
+            self.api.send_telegram(msg)
+        except Exception as e:
+            log.warning(f"Failed to send round plan summary: {e}")
+
+
+# ──────────────────────────────────────────────────────────────────
+# Proposal
+# ──────────────────────────────────────────────────────────────────
+
+def format_diff(result: dict) -> str:
+    """The proposal as a readable diff of preferred days."""
+    lines = [f"Round plan — {result['week_display']}"]
+    before = result["before_minutes_per_week"]
+    after = result["after_minutes_per_week"]
+    if not result["moves"]:
+        lines.append(f"Weekly driving: {format_drive_time(before)} — "
+                     f"no day changes save at least "
+                     f"{config.ROUND_PLAN_MIN_SAVING_MINUTES} min a week.")
+        return "\n".join(lines)
+
+    lines.append(f"Weekly driving: {format_drive_time(before)} → "
+                 f"{format_drive_time(after)} "
+                 f"(save {format_drive_time(result['saved_minutes_per_week'])} a week)")
+    lines.append("")
+    for m in result["moves"]:
+        lines.append(f"  {m['name']} · {m['postcode']} · {m['service']} ({m['frequency']})")
+        lines.append(f"  - {m['from_day']}")
+        lines.append(f"  + {m['to_day']}    saves {m['saved_minutes_per_week']} min/week")
+        lines.append("")
+
+    lines.append("Drive minutes per week by day:")
+    for wd, v in result["days"].items():
+        change = v["after"] - v["before"]
+        sign = "+" if change > 0 else ""
+        lines.append(f"  {wd:<10} {v['before']:>4} → {v['after']:>4}"
+                     + (f"  ({sign}{change})" if change else ""))
+    return "\n".join(lines)
+
+
+def load_proposal(db) -> dict:
+    """The last stored proposal, or {} if there isn't one."""
+    try:
+        return json.loads(db.get_setting(PROPOSAL_SETTING, "") or "{}")
+    except ValueError:
+        return {}
+
+
+def apply_moves(db, sync, moves: list[dict]) -> int:
+    """
+    Set each client's preferred_day as proposed and queue the change to
+    the sheet. Clients whose day has changed since the plan was made are
+    skipped and stay in the stored proposal. Returns the number applied.
+    """
+    done = set()
+    for m in moves:
+        client = db.get_client(m["client_id"])
+        if not client or str(client.get("preferred_day", "")).strip().lower() != \
+                m["from_day"].lower():
+            log.info(f"Round plan: skipped {m.get('name', '')} — changed since planning")
+            continue
+        client["preferred_day"] = m["to_day"]
+        db.save_client(client)
+        sync.queue_write("update_client", {
+            "row": client.get("sheets_row", ""),
+            "name": client.get("name", ""),
+            "email": client.get("email", ""),
+            "phone": client.get("phone", ""),
+            "postcode": client.get("postcode", ""),
+            "address": client.get("address", ""),
+            "service": client.get("service", ""),
+            "price": client.get("price", 0),
+            "date": client.get("date", ""),
+            "time": client.get("time", ""),
+            "preferredDay": client["preferred_day"],
+            "frequency": client.get("frequency", ""),
+            "type": client.get("type", ""),
+            "status": client.get("status", ""),
+            "paid": client.get("paid", ""),
+            "notes": client.get("notes", ""),
+            "wasteCollection": client.get("waste_collection", "Not Set"),
+        })
+        done.add(m["client_id"])
+
+    if done:
+        proposal = load_proposal(db)
+        if proposal.get("moves"):
+            proposal["moves"] = [m for m in proposal["moves"] if m["client_id"] not in done]
+            db.set_setting(PROPOSAL_SETTING, json.dumps(proposal))
+    return len(done)
@@ -0,0 +1,185 @@
+"""
+Day Route Optimiser for GGM Hub.
+Orders a day's jobs to keep fixed-time appointments, finish inside the
+working day and drive as little as possible.
+
+Fixed-time jobs are time windows: arriving early means waiting, arriving
+late is penalised. Service times come from SERVICE_DURATIONS and the day
+runs from WORK_START_HOUR to WORK_END_HOUR out of the home base. A
+cheapest-insertion start is improved by 2-opt and Or-opt local search
+until no move helps or the time budget runs out.
+
+Routes are compared lexicographically on
+    (minutes late for appointments, minutes past WORK_END_HOUR,
+     drive minutes, finish time)
+so driving is only traded away to make an appointment or the day's end.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from . import config
+
+
+def service_minutes(service: str) -> int:
+    """Time on site for a service, from SERVICE_DURATIONS (2h default)."""
+    return int(config.SERVICE_DURATIONS.get(service, 2.0) * 60)
+
+
+def appointment_minutes(time_str: str) -> Optional[int]:
+    """Minutes since midnight for an "HH:MM" booking time, else None."""
+    t = (time_str or "").strip()
+    if ":" not in t:
+        return None
+    try:
+        h, m = t.split(":")[:2]
+        return int(h) * 60 + int(m)
+    except ValueError:
+        return None
+
+
+@dataclass
+class Stop:
+    """A job to visit. idx is its distance-matrix row (None when the
+    postcode couldn't be geocoded — the van stays where it was)."""
+    idx: Optional[int]
+    service_minutes: int
+    fixed_minutes: Optional[int] = None  # appointment start, minutes since midnight
+
+
+@dataclass
+class Visit:
+    stop: int            # index into the stops list
+    travel_minutes: int  # drive from the previous position
+    from_idx: int        # matrix row driven from
+    arrive: int
+    start: int
+    end: int
+    late_minutes: int
+
+
+class DayRouteOptimiser:
+    """
+    Plan one day's visiting order.
+
+        opt = DayRouteOptimiser(legs, stops)
+        order = opt.solve()
+        visits, home_minutes = opt.schedule(order)
+
+    `legs[i][j]` is whole drive minutes between matrix rows (row 0 is
+    the base), matching distance.estimate_drive()'s rounding.
+    """
+
+    def __init__(self, legs, stops: list[Stop], day_start: int = None,
+                 day_end: int = None, budget_seconds: float = None):
+        self.legs = legs
+        self.stops = stops
+        self.day_start = config.WORK_START_HOUR * 60 if day_start is None else day_start
+        self.day_end = config.WORK_END_HOUR * 60 if day_end is None else day_end
+        self.budget = (config.ROUTE_OPTIMISE_SECONDS
+                       if budget_seconds is None else budget_seconds)
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+    def cost(self, order: list[int]) -> tuple:
+        """(late, overrun, drive, finish) for visiting `order`."""
+        t, pos, drive, late = self.day_start, 0, 0, 0
+        for s in order:
+            stop = self.stops[s]
+            if stop.idx is not None:
+                leg = self.legs[pos][stop.idx]
+                drive += leg
+                t += leg
+                pos = stop.idx
+            if stop.fixed_minutes is not None:
+                if t < stop.fixed_minutes:
+                    t = stop.fixed_minutes
+                else:
+                    late += t - stop.fixed_minutes
+            t += stop.service_minutes
+        home = self.legs[pos][0]
+        finish = t + home
+        return (late, max(0, finish - self.day_end), drive + home, finish)
+
+    def schedule(self, order: list[int]) -> tuple[list[Visit], int]:
+        """Timed visits for `order`, plus the drive home in minutes."""
+        visits = []
+        t, pos = self.day_start, 0
+        for s in order:
+            stop = self.stops[s]
+            travel, from_idx = 0, pos
+            if stop.idx is not None:
+                travel = self.legs[pos][stop.idx]
+                pos = stop.idx
+            arrive = t + travel
+            start, late = arrive, 0
+            if stop.fixed_minutes is not None:
+                if arrive < stop.fixed_minutes:
+                    start = stop.fixed_minutes
+                else:
+                    late = arrive - stop.fixed_minutes
+            t = start + stop.service_minutes
+            visits.append(Visit(s, travel, from_idx, arrive, start, t, late))
+        return visits, self.legs[pos][0]
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def solve(self) -> list[int]:
+        """Best order found within the time budget."""
+        deadline = time.monotonic() + self.budget
+        order = self._initial_order()
+        best = self.cost(order)
+
+        improved = True
+        while improved and time.monotonic() < deadline:
+            improved = False
+            for candidate in self._neighbours(order):
+                c = self.cost(candidate)
+                if c < best:
+                    order, best = candidate, c
+                    improved = True
+                    break
+                if time.monotonic() >= deadline:
+                    break
+        return order
+
+    def _initial_order(self) -> list[int]:
+        """Appointments in time order, then each flexible job inserted
+        where it costs least — nearest to the base first."""
+        fixed = sorted((s for s, stop in enumerate(self.stops)
+                        if stop.fixed_minutes is not None),
+                       key=lambda s: self.stops[s].fixed_minutes)
+        flexible = [s for s, stop in enumerate(self.stops) if stop.fixed_minutes is None]
+        flexible.sort(key=lambda s: (self.stops[s].idx is None,
+                                     self.legs[0][self.stops[s].idx]
+                                     if self.stops[s].idx is not None else 0))
+
+        order = list(fixed)
+        for s in flexible:
+            best_order, best_cost = None, None
+            # Latest position wins ties, so distance-neutral stops go last
+            for pos in range(len(order), -1, -1):
+                candidate = order[:pos] + [s] + order[pos:]
+                c = self.cost(candidate)
+                if best_cost is None or c < best_cost:
+                    best_order, best_cost = candidate, c
+            order = best_order
+        return order
+
+    @staticmethod
+    def _neighbours(order: list[int]):
+        """2-opt segment reversals, then Or-opt moves of 1-3 stops."""
+        n = len(order)
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                yield order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+        for length in (1, 2, 3):
+            for i in range(n - length + 1):
+                segment = order[i:i + length]
+                rest = order[:i] + order[i + length:]
+                for k in range(len(rest) + 1):
+                    if k != i:
+                        yield rest[:k] + segment + rest[k:]
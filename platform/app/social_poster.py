@@ -12,9 +12,9 @@ See: https://developers.facebook.com/docs/pages/publishing
 """
 
 import logging
-import requests
 
 from . import config
+from . import http_client
 
 log = logging.getLogger("ggm.social_poster")
 
@@ -73,7 +73,7 @@ def post_to_facebook(message: str, link: str = "", image_url: str = "") -> dict:
             if link:
                 payload["link"] = link
 
-        resp = requests.post(endpoint, data=payload, timeout=30)
+        resp = http_client.post(endpoint, data=payload, timeout=30)
         data = resp.json()
 
         if resp.status_code == 200 and ("id" in data or "post_id" in data):
@@ -15,6 +15,7 @@ Usage:
     # Write
     supa.upsert_client({...})
     supa.upsert_quote({...})
+    supa.upsert_rows("quotes", [...], on_conflict="quote_number")
 
     # Realtime (Phase 3)
     supa.subscribe("clients", on_change_callback)
@@ -68,6 +69,17 @@ def is_available() -> bool:
         return False
 
 
+def _decode_json(row: dict, fields) -> dict:
+    """Parse JSON-string columns so they are stored as JSONB."""
+    for f in fields:
+        if f in row and isinstance(row[f], str):
+            try:
+                row[f] = json.loads(row[f])
+            except (json.JSONDecodeError, TypeError):
+                pass
+    return row
+
+
 # ══════════════════════════════════════════════════════════════
 # CLIENTS
 # ══════════════════════════════════════════════════════════════
@@ -139,11 +151,7 @@ def upsert_quote(data: dict) -> Optional[dict]:
     try:
         clean = {k: v for k, v in data.items() if v is not None}
         # Ensure items is JSONB-compatible
-        if "items" in clean and isinstance(clean["items"], str):
-            try:
-                clean["items"] = json.loads(clean["items"])
-            except (json.JSONDecodeError, TypeError):
-                pass
+        _decode_json(clean, ("items",))
         clean["updated_at"] = datetime.utcnow().isoformat()
         resp = client.table("quotes").upsert(clean, on_conflict="quote_number").execute()
         return resp.data[0] if resp.data else None
@@ -176,11 +184,7 @@ def upsert_invoice(data: dict) -> Optional[dict]:
         return None
     try:
         clean = {k: v for k, v in data.items() if v is not None}
-        if "items" in clean and isinstance(clean["items"], str):
-            try:
-                clean["items"] = json.loads(clean["items"])
-            except (json.JSONDecodeError, TypeError):
-                pass
+        _decode_json(clean, ("items",))
         clean["updated_at"] = datetime.utcnow().isoformat()
         resp = client.table("invoices").upsert(clean, on_conflict="invoice_number").execute()
         return resp.data[0] if resp.data else None
@@ -213,11 +217,7 @@ def upsert_enquiry(data: dict) -> Optional[dict]:
         return None
     try:
         clean = {k: v for k, v in data.items() if v is not None}
-        if "garden_details" in clean and isinstance(clean["garden_details"], str):
-            try:
-                clean["garden_details"] = json.loads(clean["garden_details"])
-            except (json.JSONDecodeError, TypeError):
-                pass
+        _decode_json(clean, ("garden_details",))
         clean["updated_at"] = datetime.utcnow().isoformat()
         resp = client.table("enquiries").upsert(clean).execute()
         return resp.data[0] if resp.data else None
@@ -552,6 +552,30 @@ def upsert_row(table_name: str, data: dict, on_conflict: str = "") -> Optional[d
         return None
 
 
+def upsert_rows(table_name: str, rows: list[dict], on_conflict: str = "",
+                json_fields: tuple = ()) -> bool:
+    """
+    Bulk upsert in a single request. Rows should share the same keys;
+    None is sent as NULL. Nothing is returned from the server
+    (return=minimal). Returns True if the request succeeded.
+    """
+    client = _get_client()
+    if not client:
+        return False
+    if not rows:
+        return True
+    try:
+        payload = [_decode_json(dict(r), json_fields) for r in rows]
+        kwargs = {"returning": "minimal"}
+        if on_conflict:
+            kwargs["on_conflict"] = on_conflict
+        client.table(table_name).upsert(payload, **kwargs).execute()
+        return True
+    except Exception as e:
+        log.error("upsert_rows(%s, %d rows): %s", table_name, len(rows), e)
+        return False
+
+
 def insert_row(table_name: str, data: dict) -> Optional[dict]:
     """Insert a single row into any table."""
     client = _get_client()
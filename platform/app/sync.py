@@ -8,12 +8,14 @@ import queue
 import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Callable, Optional
 
-from .api import APIClient, APIError
+from .api import APIClient, APIConnectionError, APIError
 from .database import Database
 from . import config
+from . import http_client
 
 log = logging.getLogger("ggm.sync")
 
@@ -44,13 +46,55 @@ class SyncEvent:
     STATUS_CHANGED = "status_changed"      # (table_name, changed_items_list)
 
 
+# Fields identifying the record a queued write targets. A newer write of
+# the same action and shape to the same record supersedes a pending one;
+# actions not listed (deletes, cancellations, refunds) are never merged.
+OUTBOX_COALESCE_FIELDS = {
+    "update_client": ("row", "name"),
+    "update_quote": ("quoteId", "row"),
+    "update_invoice": ("invoiceNumber", "row"),
+    "update_enquiry": ("row",),
+    "update_business_cost": ("row", "month"),
+    "update_savings_pot": ("name",),
+    "update_status": ("rowIndex",),
+}
+
+
+# (local table, GAS action, params) for every table pulled in a sync cycle.
+# The fetch phase runs these concurrently; the _sync_* methods then apply
+# the responses one at a time so SQLite writes stay on the sync thread.
+PULL_ACTIONS = [
+    ("clients", "get_clients", None),
+    ("invoices", "get_invoices", None),
+    ("quotes", "get_quotes", None),
+    ("schedule", "get_subscription_schedule", {"days": "365"}),
+    ("enquiries", "get_enquiries", None),
+    ("savings_pots", "get_savings_pots", None),
+    ("business_costs", "get_business_costs", None),
+    ("blog_posts", "get_all_blog_posts", None),
+    ("job_photos", "get_all_job_photos", None),
+    ("email_tracking", "get_email_tracking", {"limit": "500"}),
+    ("job_tracking", "get_job_tracking", {"limit": "200"}),
+    ("site_analytics", "get_site_analytics", {"days": "30"}),
+    ("business_recommendations", "get_business_recommendations", {"limit": "50"}),
+    ("subscribers", "get_subscribers", None),
+    ("complaints", "get_complaints", None),
+    ("vacancies", "get_all_vacancies", None),
+    ("applications", "get_applications", None),
+    ("products", "get_products", None),
+    ("orders", "get_orders", None),
+]
+
+
 class SyncEngine:
     """
     Background sync engine.
 
     - On startup: full pull from Google Sheets → SQLite
     - On local change: queues a push to Sheets
-    - Every N minutes: incremental sync
+    - Every N minutes: incremental sync (tables unchanged since their
+      last pulled revision are skipped; full pull every
+      SYNC_FULL_REFRESH_SECONDS or on force_sync)
     - Emits events to a queue that the UI polls
     """
 
@@ -58,18 +102,34 @@ class SyncEngine:
         self.db = db
         self.api = api
         self.event_queue: queue.Queue = queue.Queue()
-        self.write_queue: queue.Queue = queue.Queue()
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._online = False
         self._last_full_sync: Optional[str] = None
         self._sync_lock = threading.Lock()
+        # Delta sync state — revisions are only committed after a table's
+        # upsert succeeds, so a failed cycle simply re-pulls next time.
+        self._full_refresh = False
+        self._last_full_refresh = 0.0
+        self._pending_revisions: dict[str, str] = {}
+        self._changed_tables: set[str] = set()
+        self._prefetched: dict[str, object] = {}
+        # Push wake-up — set by local saves and queue_write so the loop
+        # sleeps until there is work instead of polling the dirty tables
+        self._wake = threading.Event()
+        self._push_lock = threading.Lock()
+        self._push_tables: set[str] = set(Database.DIRTY_PUSH_TABLES)
+        # Consecutive offline outbox passes — doubles the queue-wide deferral
+        self._offline_passes = 0
+        self.db.add_dirty_listener(self._request_push)
 
     # ------------------------------------------------------------------
     # Public interface
     # ------------------------------------------------------------------
     def start(self):
         """Start the background sync thread."""
+        # Give writes parked in an earlier session another round of attempts
+        self.retry_failed_writes()
         self._running = True
         self._thread = threading.Thread(target=self._run_loop, daemon=True, name="SyncEngine")
         self._thread.start()
@@ -78,18 +138,49 @@ class SyncEngine:
     def stop(self):
         """Stop the sync thread."""
         self._running = False
+        self._wake.set()
         if self._thread:
             self._thread.join(timeout=5)
         log.info("Sync engine stopped")
 
     def queue_write(self, action: str, data: dict):
-        """Queue a write operation to be pushed to Sheets."""
-        self.write_queue.put((action, data))
+        """Queue a write operation to be pushed to Sheets.
+        Writes go to the SQLite outbox, so they survive a restart or a
+        spell offline and are sent in the order they were made."""
+        self.db.enqueue_outbox(action, data, self._coalesce_key(action, data))
+        self._wake.set()
         log.debug(f"Queued write: {action}")
 
+    def retry_failed_writes(self) -> int:
+        """Re-queue outbox writes parked as failed. Returns how many."""
+        retried = self.db.retry_failed_outbox()
+        if retried:
+            log.info(f"Retrying {retried} failed write(s)")
+            self._wake.set()
+        return retried
+
+    def _request_push(self, *tables: str):
+        """Schedule a push of the given tables' dirty rows and wake the loop."""
+        with self._push_lock:
+            self._push_tables.update(tables)
+        self._wake.set()
+
+    @staticmethod
+    def _coalesce_key(action: str, data: dict) -> str:
+        """Identity of the record a write targets, or "" if it mustn't
+        be merged. Field names are included so a status-only update never
+        replaces a pending full update of the same record."""
+        for field in OUTBOX_COALESCE_FIELDS.get(action, ()):
+            value = data.get(field)
+            if value not in (None, ""):
+                return f"{action}:{field}={value}:{','.join(sorted(data))}"
+        return ""
+
     def force_sync(self):
-        """Trigger an immediate full sync (called from UI)."""
-        threading.Thread(target=self._full_sync, daemon=True, name="ForceSync").start()
+        """Trigger an immediate full sync (called from UI).
+        Ignores stored revisions so every table is re-pulled."""
+        threading.Thread(target=self._full_sync, kwargs={"full": True},
+                         daemon=True, name="ForceSync").start()
 
     @property
     def is_online(self) -> bool:
@@ -117,34 +208,65 @@ class SyncEngine:
         # Initial full sync
         self._full_sync()
 
-        # Then loop: process writes + periodic sync
-        sync_counter = 0
+        # Then push whenever a save or queued write wakes us, and pull
+        # every SYNC_INTERVAL_SECONDS
+        next_sync = time.monotonic() + config.SYNC_INTERVAL_SECONDS
         while self._running:
+            self._wake.clear()
             # Process pending writes (wrapped to prevent thread death)
             try:
                 self._process_writes()
             except Exception as e:
                 log.error(f"Write processing error (non-fatal): {e}")
 
-            # Every N seconds, do an incremental sync
-            sync_counter += 1
-            if sync_counter >= config.SYNC_INTERVAL_SECONDS:
+            # Re-expand subscriptions queued by client writes (reads don't)
+            try:
+                self.db.refresh_occurrences()
+            except Exception as e:
+                log.warning(f"Occurrence refresh failed: {e}")
+
+            if time.monotonic() >= next_sync:
                 self._full_sync()
-                sync_counter = 0
+                # Retry any rows a failed push left dirty
+                self._request_push(*Database.DIRTY_PUSH_TABLES)
+                next_sync = time.monotonic() + config.SYNC_INTERVAL_SECONDS
+                continue
 
-            time.sleep(1)
+            self._wake.wait(self._idle_timeout(next_sync))
+
+    def _idle_timeout(self, next_sync: float) -> float:
+        """Seconds to sleep: until the next pull, or sooner if a backed-off
+        outbox write falls due first."""
+        timeout = next_sync - time.monotonic()
+        try:
+            due = self.db.next_outbox_due()
+        except Exception:
+            due = None
+        if due is not None:
+            timeout = min(timeout, due - time.time())
+        return max(timeout, 0.0)
 
     # ------------------------------------------------------------------
     # Full sync (pull all data from Sheets)
     # ------------------------------------------------------------------
-    def _full_sync(self):
-        """Pull all data from Google Sheets into SQLite."""
+    def _full_sync(self, full: bool = False):
+        """Pull all data from Google Sheets into SQLite.
+
+        By default only tables whose GAS revision changed since the last
+        pull are downloaded and rewritten. ``full=True`` (or the periodic
+        SYNC_FULL_REFRESH_SECONDS timer) re-pulls everything.
+        """
         if not self._sync_lock.acquire(blocking=False):
             return  # Already syncing
 
         try:
             self._emit(SyncEvent.SYNC_STARTED, None)
-            log.info("Starting full sync...")
+            self._full_refresh = full or (
+                time.time() - self._last_full_refresh >= config.SYNC_FULL_REFRESH_SECONDS
+            )
+            self._pending_revisions = {}
+            self._changed_tables = set()
+            log.info("Starting %s sync...", "full" if self._full_refresh else "delta")
 
             # Check connectivity
             try:
@@ -158,6 +280,9 @@ class SyncEngine:
                 log.warning("Offline — skipping sync")
                 return
 
+            # Fetch every table concurrently, then apply them one by one
+            self._prefetch_tables()
+
             # Sync each data source
             self._sync_clients()
             self._sync_invoices()
@@ -179,9 +304,6 @@ class SyncEngine:
             self._sync_products()
             self._sync_orders()
 
-            # Rebuild search index
-            self.db.rebuild_search_index()
-
             # Purge stale pending deletes older than 48 hours
             self.db.purge_old_pending_deletes(48)
 
@@ -192,17 +314,103 @@ class SyncEngine:
             now = datetime.now().isoformat()
             self._last_full_sync = now
             self.db.set_setting("last_full_sync", now)
+            if self._full_refresh:
+                self._last_full_refresh = time.time()
 
             self._emit(SyncEvent.SYNC_COMPLETE, None)
-            log.info("Full sync complete")
+            log.info(f"Sync complete — {len(self._changed_tables)} table(s) changed")
+
+            # Geocode any new customer postcodes while we're online
+            self._prewarm_geocodes()
 
         except Exception as e:
             self._emit(SyncEvent.SYNC_ERROR, str(e))
             log.error(f"Sync error: {e}")
 
         finally:
+            self._prefetched = {}
             self._sync_lock.release()
 
+    def _prewarm_geocodes(self):
+        """Cache lat/lng for every postcode in clients, schedule, enquiries
+        and quotes so route planning and pricing don't wait on postcodes.io."""
+        try:
+            from . import distance
+            distance.prewarm(self.db.get_known_postcodes())
+        except Exception as e:
+            log.warning(f"Geocode pre-warm failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Delta sync helpers
+    # ------------------------------------------------------------------
+    def _since(self, table: str) -> str:
+        """Revision to send as `since` for a table.
+        Always non-empty so GAS attaches a _revision; "0" never matches."""
+        if self._full_refresh:
+            return "0"
+        return self.db.get_sync_revision(table) or "0"
+
+    def _prefetch_tables(self):
+        """
+        Run the network half of every table sync in a bounded thread pool.
+        Responses (or the exception raised) are held in _prefetched for
+        _pull() to hand to the _sync_* methods. Wall-clock time becomes
+        roughly that of the slowest GAS call rather than the sum.
+        """
+        self._prefetched = {}
+        workers = max(1, config.SYNC_MAX_WORKERS)
+        # Read revisions up-front so worker threads never touch SQLite
+        jobs = [(table, action, params, self._since(table))
+                for table, action, params in PULL_ACTIONS]
+
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix="SyncFetch") as pool:
+            futures = {
+                pool.submit(self.api.get, action, params, since): table
+                for table, action, params, since in jobs
+            }
+            for fut in as_completed(futures):
+                table = futures[fut]
+                try:
+                    self._prefetched[table] = fut.result()
+                except Exception as e:
+                    self._prefetched[table] = e
+        log.info(f"Fetched {len(jobs)} tables in {time.time() - started:.1f}s "
+                 f"({workers} workers)")
+
+    def _pull(self, table: str, action: str, params: dict = None):
+        """
+        GET a table from GAS, passing the last applied revision.
+        Uses the prefetched response when the fetch phase already ran.
+        Returns None when GAS reports the table is unchanged, otherwise
+        the response (its revision is held until _mark_pulled).
+        """
+        if table in self._prefetched:
+            data = self._prefetched.pop(table)
+            if isinstance(data, Exception):
+                raise data
+        else:
+            data = self.api.get(action, params, since=self._since(table))
+        if isinstance(data, dict):
+            if data.get("unchanged"):
+                log.debug(f"{table}: unchanged since last sync")
+                return None
+            revision = data.get("_revision", "")
+            if revision:
+                self._pending_revisions[table] = revision
+        return data
+
+    def _mark_pulled(self, table: str, counts: dict = None):
+        """Commit a table's revision once its rows have been upserted.
+        ``counts`` (from the upsert) lets a no-op write leave the table
+        out of _changed_tables."""
+        if counts is None or any(counts.get(k) for k in ("inserted", "updated", "deleted")):
+            self._changed_tables.add(table)
+        revision = self._pending_revisions.pop(table, "")
+        if revision:
+            self.db.set_sync_revision(table, revision)
+
     # ------------------------------------------------------------------
     # Individual table sync methods
     # ------------------------------------------------------------------
@@ -223,7 +431,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_clients")
+            data = self._pull("clients", "get_clients")
+            if data is None:
+                return  # unchanged since last pull
 
             # The response format depends on Code.gs implementation
             # Usually: { clients: [...] } or just [...]
@@ -241,8 +451,9 @@ class SyncEngine:
                     continue
                 rows.append(mapped)
 
-            self.db.upsert_clients(rows)
-            self.db.log_sync("clients", "pull", len(rows))
+            counts = self.db.upsert_clients(rows)
+            self.db.log_sync("clients", "pull", len(rows), counts=counts)
+            self._mark_pulled("clients", counts)
             self._emit(SyncEvent.SYNC_PROGRESS, ("clients", len(rows)))
             self._emit(SyncEvent.TABLE_UPDATED, "clients")
 
@@ -280,7 +491,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_invoices")
+            data = self._pull("invoices", "get_invoices")
+            if data is None:
+                return  # unchanged since last pull
             invoices_raw = data if isinstance(data, list) else data.get("invoices", data.get("data", []))
 
             if not isinstance(invoices_raw, list):
@@ -290,8 +503,9 @@ class SyncEngine:
             for i, inv in enumerate(invoices_raw):
                 rows.append(self._map_invoice_from_sheets(inv, i + 2))
 
-            self.db.upsert_invoices(rows)
-            self.db.log_sync("invoices", "pull", len(rows))
+            counts = self.db.upsert_invoices(rows)
+            self.db.log_sync("invoices", "pull", len(rows), counts=counts)
+            self._mark_pulled("invoices", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "invoices")
 
             # Detect new invoices
@@ -344,7 +558,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_quotes")
+            data = self._pull("quotes", "get_quotes")
+            if data is None:
+                return  # unchanged since last pull
             quotes_raw = data if isinstance(data, list) else data.get("quotes", data.get("data", []))
 
             if not isinstance(quotes_raw, list):
@@ -354,8 +570,9 @@ class SyncEngine:
             for i, q in enumerate(quotes_raw):
                 rows.append(self._map_quote_from_sheets(q, i + 2))
 
-            self.db.upsert_quotes(rows)
-            self.db.log_sync("quotes", "pull", len(rows))
+            counts = self.db.upsert_quotes(rows)
+            self.db.log_sync("quotes", "pull", len(rows), counts=counts)
+            self._mark_pulled("quotes", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "quotes")
 
             # Detect new quotes
@@ -397,7 +614,9 @@ class SyncEngine:
 
             # Use get_subscription_schedule which reads from the Schedule sheet
             # (get_schedule requires a date param and only returns Jobs for that date)
-            data = self.api.get("get_subscription_schedule", {"days": "365"})
+            data = self._pull("schedule", "get_subscription_schedule", {"days": "365"})
+            if data is None:
+                return  # unchanged since last pull
             schedule_raw = data if isinstance(data, list) else data.get(
                 "visits", data.get("schedule", data.get("data", []))
             )
@@ -428,8 +647,9 @@ class SyncEngine:
                     "created_by": str(s.get("createdBy", "")),
                 })
 
-            self.db.upsert_schedule(rows)
-            self.db.log_sync("schedule", "pull", len(rows))
+            counts = self.db.upsert_schedule(rows)
+            self.db.log_sync("schedule", "pull", len(rows), counts=counts)
+            self._mark_pulled("schedule", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "schedule")
 
             # Detect new schedule entries
@@ -458,7 +678,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_enquiries")
+            data = self._pull("enquiries", "get_enquiries")
+            if data is None:
+                return  # unchanged since last pull
             enquiries_raw = data if isinstance(data, list) else data.get("enquiries", data.get("data", []))
 
             if not isinstance(enquiries_raw, list):
@@ -492,8 +714,9 @@ class SyncEngine:
                     "preferred_time": str(e.get("preferredTime", "")),
                 })
 
-            self.db.upsert_enquiries(rows)
-            self.db.log_sync("enquiries", "pull", len(rows))
+            counts = self.db.upsert_enquiries(rows)
+            self.db.log_sync("enquiries", "pull", len(rows), counts=counts)
+            self._mark_pulled("enquiries", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "enquiries")
 
             # Detect new enquiries
@@ -511,7 +734,9 @@ class SyncEngine:
 
     def _sync_savings_pots(self):
         try:
-            data = self.api.get("get_savings_pots")
+            data = self._pull("savings_pots", "get_savings_pots")
+            if data is None:
+                return  # unchanged since last pull
             pots_raw = data if isinstance(data, list) else data.get("pots", data.get("data", []))
 
             if not isinstance(pots_raw, list):
@@ -525,8 +750,9 @@ class SyncEngine:
                     "target": self._safe_float(p.get("targetBalance", p.get("target", 0))),
                 })
 
-            self.db.upsert_savings_pots(rows)
-            self.db.log_sync("savings_pots", "pull", len(rows))
+            counts = self.db.upsert_savings_pots(rows)
+            self.db.log_sync("savings_pots", "pull", len(rows), counts=counts)
+            self._mark_pulled("savings_pots", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "savings_pots")
 
         except Exception as e:
@@ -535,7 +761,9 @@ class SyncEngine:
 
     def _sync_business_costs(self):
         try:
-            data = self.api.get("get_business_costs")
+            data = self._pull("business_costs", "get_business_costs")
+            if data is None:
+                return  # unchanged since last pull
             costs_raw = data if isinstance(data, list) else data.get("costs", data.get("data", []))
 
             if not isinstance(costs_raw, list):
@@ -579,8 +807,9 @@ class SyncEngine:
                     "notes": str(c.get("notes", "")),
                 })
 
-            self.db.upsert_business_costs(rows)
-            self.db.log_sync("business_costs", "pull", len(rows))
+            counts = self.db.upsert_business_costs(rows)
+            self.db.log_sync("business_costs", "pull", len(rows), counts=counts)
+            self._mark_pulled("business_costs", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "business_costs")
 
         except Exception as e:
@@ -600,7 +829,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_all_blog_posts")
+            data = self._pull("blog_posts", "get_all_blog_posts")
+            if data is None:
+                return  # unchanged since last pull
             posts_raw = data if isinstance(data, list) else data.get("posts", data.get("data", []))
 
             if not isinstance(posts_raw, list):
@@ -626,8 +857,9 @@ class SyncEngine:
                 })
 
             if rows:
-                self.db.upsert_blog_posts(rows)
-                self.db.log_sync("blog_posts", "pull", len(rows))
+                counts = self.db.upsert_blog_posts(rows)
+                self.db.log_sync("blog_posts", "pull", len(rows), counts=counts)
+                self._mark_pulled("blog_posts", counts)
                 self._emit(SyncEvent.TABLE_UPDATED, "blog_posts")
 
                 # Detect new blog posts
@@ -645,7 +877,9 @@ class SyncEngine:
         """Pull job photos metadata from the Job Photos sheet and
         download any new photos from Google Drive to the local E: drive."""
         try:
-            data = self.api.get("get_all_job_photos")
+            data = self._pull("job_photos", "get_all_job_photos")
+            if data is None:
+                return  # unchanged since last pull
             photos_raw = data if isinstance(data, list) else data.get("photos", data.get("data", []))
 
             if not isinstance(photos_raw, list):
@@ -668,8 +902,9 @@ class SyncEngine:
                 })
 
             if rows:
-                self.db.upsert_job_photos(rows)
-                self.db.log_sync("job_photos", "pull", len(rows))
+                counts = self.db.upsert_job_photos(rows)
+                self.db.log_sync("job_photos", "pull", len(rows), counts=counts)
+                self._mark_pulled("job_photos", counts)
                 self._emit(SyncEvent.TABLE_UPDATED, "job_photos")
                 log.info(f"Synced {len(rows)} job photos metadata")
 
@@ -683,7 +918,9 @@ class SyncEngine:
     def _sync_email_tracking(self):
         """Pull email tracking records from Email Tracking sheet."""
         try:
-            data = self.api.get("get_email_tracking", {"limit": "500"})
+            data = self._pull("email_tracking", "get_email_tracking", {"limit": "500"})
+            if data is None:
+                return  # unchanged since last pull
             emails_raw = data if isinstance(data, list) else data.get("emails", data.get("data", []))
 
             if not isinstance(emails_raw, list):
@@ -702,8 +939,9 @@ class SyncEngine:
                 })
 
             if rows:
-                self.db.upsert_email_tracking(rows)
-                self.db.log_sync("email_tracking", "pull", len(rows))
+                counts = self.db.upsert_email_tracking(rows)
+                self.db.log_sync("email_tracking", "pull", len(rows), counts=counts)
+                self._mark_pulled("email_tracking", counts)
                 self._emit(SyncEvent.TABLE_UPDATED, "email_tracking")
                 log.info(f"Synced {len(rows)} email tracking records")
 
@@ -714,7 +952,9 @@ class SyncEngine:
     def _sync_job_tracking(self):
         """Pull job tracking records (start/end times) from Job Tracking sheet."""
         try:
-            data = self.api.get("get_job_tracking", {"limit": "200"})
+            data = self._pull("job_tracking", "get_job_tracking", {"limit": "200"})
+            if data is None:
+                return  # unchanged since last pull
             records_raw = data if isinstance(data, list) else data.get("records", data.get("data", []))
 
             if not isinstance(records_raw, list):
@@ -733,8 +973,9 @@ class SyncEngine:
                 })
 
             if rows:
-                self.db.upsert_job_tracking(rows)
-                self.db.log_sync("job_tracking", "pull", len(rows))
+                counts = self.db.upsert_job_tracking(rows)
+                self.db.log_sync("job_tracking", "pull", len(rows), counts=counts)
+                self._mark_pulled("job_tracking", counts)
                 self._emit(SyncEvent.TABLE_UPDATED, "job_tracking")
                 log.info(f"Synced {len(rows)} job tracking records")
 
@@ -745,8 +986,6 @@ class SyncEngine:
     def _download_drive_photos(self, photos: list):
         """Download photo files from Google Drive to the local photos dir.
         Skips any photos that already exist locally."""
-        import urllib.request
-        from pathlib import Path
 
         photos_dir = config.PHOTOS_DIR
         if not photos_dir.exists():
@@ -778,7 +1017,7 @@ class SyncEngine:
                 dest_dir.mkdir(parents=True, exist_ok=True)
                 url = f"https://drive.google.com/uc?id={file_id}&export=download"
                 log.info(f"Downloading photo: {filename} → {dest_dir}")
-                urllib.request.urlretrieve(url, str(dest_file))
+                http_client.download(url, dest_file, timeout=60)
                 downloaded += 1
 
                 # Generate thumbnail if photo_storage is available
@@ -817,7 +1056,9 @@ class SyncEngine:
     def _sync_site_analytics(self):
         """Pull site analytics summary from GAS."""
         try:
-            data = self.api.get("get_site_analytics", {"days": "30"})
+            data = self._pull("site_analytics", "get_site_analytics", {"days": "30"})
+            if data is None:
+                return  # unchanged since last pull
             if isinstance(data, dict) and data.get("status") == "success":
                 # Store daily breakdown
                 daily = data.get("daily", [])
@@ -827,6 +1068,7 @@ class SyncEngine:
                 # Store full summary
                 self.db.save_analytics_summary(data)
                 self.db.log_sync("site_analytics", "pull", len(daily))
+                self._mark_pulled("site_analytics")
                 self._emit(SyncEvent.TABLE_UPDATED, "site_analytics")
                 log.info(f"Synced site analytics: {data.get('totalViews', 0)} views over {len(daily)} days")
         except Exception as e:
@@ -836,12 +1078,15 @@ class SyncEngine:
     def _sync_business_recommendations(self):
         """Pull business recommendations from GAS."""
         try:
-            data = self.api.get("get_business_recommendations", {"limit": "50"})
+            data = self._pull("business_recommendations", "get_business_recommendations", {"limit": "50"})
+            if data is None:
+                return  # unchanged since last pull
             if isinstance(data, dict) and data.get("status") == "success":
                 recs = data.get("recommendations", [])
                 if recs:
                     self.db.save_business_recommendations(recs)
                 self.db.log_sync("business_recommendations", "pull", len(recs))
+                self._mark_pulled("business_recommendations")
                 self._emit(SyncEvent.TABLE_UPDATED, "business_recommendations")
                 log.info(f"Synced business recommendations: {len(recs)}")
         except Exception as e:
@@ -861,7 +1106,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_subscribers")
+            data = self._pull("subscribers", "get_subscribers")
+            if data is None:
+                return  # unchanged since last pull
             subs_raw = data if isinstance(data, list) else data.get("subscribers", data.get("data", []))
 
             if not isinstance(subs_raw, list):
@@ -878,8 +1125,9 @@ class SyncEngine:
                     "tier": str(s.get("tier", s.get("source", "Free"))),
                 })
 
-            self.db.upsert_subscribers(rows)
-            self.db.log_sync("subscribers", "pull", len(rows))
+            counts = self.db.upsert_subscribers(rows)
+            self.db.log_sync("subscribers", "pull", len(rows), counts=counts)
+            self._mark_pulled("subscribers", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "subscribers")
 
             # Detect new subscribers
@@ -906,7 +1154,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_complaints")
+            data = self._pull("complaints", "get_complaints")
+            if data is None:
+                return  # unchanged since last pull
             raw = data if isinstance(data, list) else data.get("complaints", data.get("data", []))
 
             if not isinstance(raw, list):
@@ -936,8 +1186,9 @@ class SyncEngine:
                     "created_at": str(c.get("timestamp", "")),
                 })
 
-            self.db.upsert_complaints(rows)
-            self.db.log_sync("complaints", "pull", len(rows))
+            counts = self.db.upsert_complaints(rows)
+            self.db.log_sync("complaints", "pull", len(rows), counts=counts)
+            self._mark_pulled("complaints", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "complaints")
 
             # Detect new complaints
@@ -952,7 +1203,9 @@ class SyncEngine:
     def _sync_vacancies(self):
         """Pull vacancies from GAS."""
         try:
-            data = self.api.get("get_all_vacancies")
+            data = self._pull("vacancies", "get_all_vacancies")
+            if data is None:
+                return  # unchanged since last pull
             raw = data if isinstance(data, list) else data.get("vacancies", data.get("data", []))
 
             if not isinstance(raw, list):
@@ -972,8 +1225,9 @@ class SyncEngine:
                     "posted_date": str(v.get("postedDate", "")),
                 })
 
-            self.db.upsert_vacancies(rows)
-            self.db.log_sync("vacancies", "pull", len(rows))
+            counts = self.db.upsert_vacancies(rows)
+            self.db.log_sync("vacancies", "pull", len(rows), counts=counts)
+            self._mark_pulled("vacancies", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "vacancies")
 
         except Exception as e:
@@ -993,7 +1247,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_applications")
+            data = self._pull("applications", "get_applications")
+            if data is None:
+                return  # unchanged since last pull
             raw = data if isinstance(data, list) else data.get("applications", data.get("data", []))
 
             if not isinstance(raw, list):
@@ -1023,8 +1279,9 @@ class SyncEngine:
                     "created_at": str(a.get("timestamp", "")),
                 })
 
-            self.db.upsert_applications(rows)
-            self.db.log_sync("applications", "pull", len(rows))
+            counts = self.db.upsert_applications(rows)
+            self.db.log_sync("applications", "pull", len(rows), counts=counts)
+            self._mark_pulled("applications", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "applications")
 
             # Detect new applications
@@ -1039,7 +1296,9 @@ class SyncEngine:
     def _sync_products(self):
         """Pull shop products from GAS."""
         try:
-            data = self.api.get("get_products")
+            data = self._pull("products", "get_products")
+            if data is None:
+                return  # unchanged since last pull
             raw = data if isinstance(data, list) else data.get("products", data.get("data", []))
 
             if not isinstance(raw, list):
@@ -1057,8 +1316,9 @@ class SyncEngine:
                     "status": str(p.get("status", "Active")),
                 })
 
-            self.db.upsert_products(rows)
-            self.db.log_sync("products", "pull", len(rows))
+            counts = self.db.upsert_products(rows)
+            self.db.log_sync("products", "pull", len(rows), counts=counts)
+            self._mark_pulled("products", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "products")
 
         except Exception as e:
@@ -1078,7 +1338,9 @@ class SyncEngine:
             except Exception:
                 pass
 
-            data = self.api.get("get_orders")
+            data = self._pull("orders", "get_orders")
+            if data is None:
+                return  # unchanged since last pull
             raw = data if isinstance(data, list) else data.get("orders", data.get("data", []))
 
             if not isinstance(raw, list):
@@ -1100,8 +1362,9 @@ class SyncEngine:
                     "order_status": str(o.get("orderStatus", "Processing")),
                 })
 
-            self.db.upsert_orders(rows)
-            self.db.log_sync("orders", "pull", len(rows))
+            counts = self.db.upsert_orders(rows)
+            self.db.log_sync("orders", "pull", len(rows), counts=counts)
+            self._mark_pulled("orders", counts)
             self._emit(SyncEvent.TABLE_UPDATED, "orders")
 
             # Detect new orders
@@ -1116,170 +1379,194 @@ class SyncEngine:
     # ------------------------------------------------------------------
     # Supabase mirror (best-effort, runs after full Sheets pull)
     # ------------------------------------------------------------------
+    # Supabase table -> (local query, on_conflict key, JSONB columns, mapper).
+    # Rows without a natural key aren't mirrored: they would insert a new
+    # remote row every cycle.
+    _MIRROR_TABLES = [
+        ("clients", "SELECT * FROM clients WHERE sheets_row > 0",
+         "legacy_sheets_row", (), "_mirror_client_row"),
+        ("invoices", "SELECT * FROM invoices WHERE invoice_number != ''",
+         "invoice_number", (), "_mirror_invoice_row"),
+        ("quotes", "SELECT * FROM quotes WHERE quote_number != ''",
+         "quote_number", ("items",), "_mirror_quote_row"),
+        ("enquiries", "SELECT * FROM enquiries WHERE sheets_row > 0",
+         "legacy_sheets_row", (), "_mirror_enquiry_row"),
+        ("subscribers", "SELECT * FROM subscribers WHERE email != ''",
+         "email", (), "_mirror_subscriber_row"),
+    ]
+
     def _mirror_to_supabase(self):
         """Mirror key SQLite tables to Supabase after a full sync.
+        Only rows whose content changed since their last successful mirror
+        are sent, as chunked bulk upserts on each table's natural key.
         Runs best-effort; failures never affect the main sync."""
         sc = _get_supa()
         if not sc:
             return
 
         try:
-            # Mirror clients
-            clients = self.db.fetchall("SELECT * FROM clients LIMIT 2000")
-            mirrored = 0
-            for c in clients:
-                try:
-                    sc.upsert_client({
-                        "name": c.get("name", ""),
-                        "email": c.get("email", ""),
-                        "phone": c.get("phone", ""),
-                        "address": c.get("address", ""),
-                        "postcode": c.get("postcode", ""),
-                        "service": c.get("service", ""),
-                        "date": c.get("date", ""),
-                        "time": c.get("time", ""),
-                        "status": c.get("status", ""),
-                        "price": c.get("price", 0),
-                        "type": c.get("type", ""),
-                        "frequency": c.get("frequency", ""),
-                        "notes": c.get("notes", ""),
-                        "job_number": c.get("job_number", ""),
-                        "legacy_sheets_row": c.get("sheets_row"),
-                    })
-                    mirrored += 1
-                except Exception:
-                    pass
-            if mirrored:
-                log.info(f"Mirrored {mirrored} clients to Supabase")
+            total = 0
+            for table, sql, key, json_fields, mapper in self._MIRROR_TABLES:
+                total += self._mirror_table(sc, table, sql, key, json_fields,
+                                            getattr(self, mapper))
+            if total:
+                sc.log_sync("full_mirror", "push", total)
+            log.info(f"Supabase mirror complete — {total} changed row(s) sent")
 
-            # Mirror invoices
-            invoices = self.db.fetchall("SELECT * FROM invoices LIMIT 2000")
-            mirrored = 0
-            for inv in invoices:
-                try:
-                    sc.upsert_invoice({
-                        "invoice_number": inv.get("invoice_number", ""),
-                        "client_name": inv.get("client_name", ""),
-                        "client_email": inv.get("client_email", ""),
-                        "amount": inv.get("amount", 0),
-                        "status": inv.get("status", ""),
-                        "issue_date": inv.get("issue_date", "") or None,
-                        "due_date": inv.get("due_date", "") or None,
-                        "paid_date": inv.get("paid_date", "") or None,
-                        "notes": inv.get("notes", ""),
-                        "legacy_sheets_row": inv.get("sheets_row"),
-                    })
-                    mirrored += 1
-                except Exception:
-                    pass
-            if mirrored:
-                log.info(f"Mirrored {mirrored} invoices to Supabase")
+        except Exception as e:
+            log.warning(f"Supabase mirror failed (non-critical): {e}")
 
-            # Mirror quotes
-            quotes = self.db.fetchall("SELECT * FROM quotes LIMIT 2000")
-            mirrored = 0
-            for q in quotes:
-                try:
-                    sc.upsert_quote({
-                        "quote_number": q.get("quote_number", ""),
-                        "client_name": q.get("client_name", ""),
-                        "client_email": q.get("client_email", ""),
-                        "client_phone": q.get("client_phone", ""),
-                        "postcode": q.get("postcode", ""),
-                        "address": q.get("address", ""),
-                        "items": q.get("items", ""),
-                        "subtotal": q.get("subtotal", 0),
-                        "discount": q.get("discount", 0),
-                        "total": q.get("total", 0),
-                        "status": q.get("status", ""),
-                        "notes": q.get("notes", ""),
-                        "legacy_sheets_row": q.get("sheets_row"),
-                    })
-                    mirrored += 1
-                except Exception:
-                    pass
-            if mirrored:
-                log.info(f"Mirrored {mirrored} quotes to Supabase")
+    def _mirror_table(self, sc, table: str, sql: str, key: str,
+                      json_fields: tuple, mapper: Callable[[dict], dict]) -> int:
+        """Upsert the changed rows of one table. Returns rows sent."""
+        by_key = {}
+        for row in self.db.fetchall(sql):
+            payload = mapper(row)
+            # Later duplicates win — one request can't touch a key twice
+            by_key[str(payload[key])] = payload
+        changed = self.db.changed_mirror_rows(table, by_key)
+        if not changed:
+            return 0
+
+        keys = list(changed)
+        batch = max(1, config.SUPABASE_MIRROR_BATCH)
+        now = datetime.utcnow().isoformat()
+        sent = 0
+        for i in range(0, len(keys), batch):
+            chunk = keys[i:i + batch]
+            rows = [by_key[k] for k in chunk]
+            if table != "subscribers":
+                rows = [dict(r, updated_at=now) for r in rows]
+            if not sc.upsert_rows(table, rows, on_conflict=key, json_fields=json_fields):
+                break  # retried next cycle — their hashes weren't saved
+            self.db.save_mirror_hashes(table, {k: changed[k] for k in chunk})
+            sent += len(chunk)
+
+        log.info(f"Mirrored {sent}/{len(changed)} changed {table} to Supabase")
+        return sent
 
-            # Mirror enquiries
-            enquiries = self.db.fetchall("SELECT * FROM enquiries LIMIT 2000")
-            mirrored = 0
-            for e in enquiries:
-                try:
-                    sc.upsert_enquiry({
-                        "name": e.get("name", ""),
-                        "email": e.get("email", ""),
-                        "phone": e.get("phone", ""),
-                        "message": e.get("message", ""),
-                        "type": e.get("type", ""),
-                        "status": e.get("status", ""),
-                        "notes": e.get("notes", ""),
-                    })
-                    mirrored += 1
-                except Exception:
-                    pass
-            if mirrored:
-                log.info(f"Mirrored {mirrored} enquiries to Supabase")
+    @staticmethod
+    def _mirror_client_row(c: dict) -> dict:
+        return {
+            "name": c.get("name", ""),
+            "email": c.get("email", ""),
+            "phone": c.get("phone", ""),
+            "address": c.get("address", ""),
+            "postcode": c.get("postcode", ""),
+            "service": c.get("service", ""),
+            "date": c.get("date", ""),
+            "time": c.get("time", ""),
+            "status": c.get("status", ""),
+            "price": c.get("price", 0),
+            "type": c.get("type", ""),
+            "frequency": c.get("frequency", ""),
+            "notes": c.get("notes", ""),
+            "job_number": c.get("job_number", ""),
+            "legacy_sheets_row": c.get("sheets_row"),
+        }
 
-            # Mirror subscribers
-            subscribers = self.db.fetchall("SELECT * FROM subscribers LIMIT 5000")
-            mirrored = 0
-            for s in subscribers:
-                try:
-                    sc.upsert_subscriber({
-                        "email": s.get("email", ""),
-                        "name": s.get("name", ""),
-                        "status": s.get("status", ""),
-                        "tier": s.get("tier", ""),
-                    })
-                    mirrored += 1
-                except Exception:
-                    pass
-            if mirrored:
-                log.info(f"Mirrored {mirrored} subscribers to Supabase")
+    @staticmethod
+    def _mirror_invoice_row(inv: dict) -> dict:
+        return {
+            "invoice_number": inv.get("invoice_number", ""),
+            "client_name": inv.get("client_name", ""),
+            "client_email": inv.get("client_email", ""),
+            "amount": inv.get("amount", 0),
+            "status": inv.get("status", ""),
+            "issue_date": inv.get("issue_date", "") or None,
+            "due_date": inv.get("due_date", "") or None,
+            "paid_date": inv.get("paid_date", "") or None,
+            "notes": inv.get("notes", ""),
+            "legacy_sheets_row": inv.get("sheets_row"),
+        }
 
-            sc.log_sync("full_mirror", "push", len(clients) + len(invoices) + len(quotes))
-            log.info("Supabase mirror complete")
+    @staticmethod
+    def _mirror_quote_row(q: dict) -> dict:
+        return {
+            "quote_number": q.get("quote_number", ""),
+            "client_name": q.get("client_name", ""),
+            "client_email": q.get("client_email", ""),
+            "client_phone": q.get("client_phone", ""),
+            "postcode": q.get("postcode", ""),
+            "address": q.get("address", ""),
+            "items": q.get("items", ""),
+            "subtotal": q.get("subtotal", 0),
+            "discount": q.get("discount", 0),
+            "total": q.get("total", 0),
+            "status": q.get("status", ""),
+            "notes": q.get("notes", ""),
+            "legacy_sheets_row": q.get("sheets_row"),
+        }
 
-        except Exception as e:
-            log.warning(f"Supabase mirror failed (non-critical): {e}")
+    @staticmethod
+    def _mirror_enquiry_row(e: dict) -> dict:
+        return {
+            "name": e.get("name", ""),
+            "email": e.get("email", ""),
+            "phone": e.get("phone", ""),
+            "message": e.get("message", ""),
+            "type": e.get("type", ""),
+            "status": e.get("status", ""),
+            "notes": e.get("notes", ""),
+            "legacy_sheets_row": e.get("sheets_row"),
+        }
+
+    @staticmethod
+    def _mirror_subscriber_row(s: dict) -> dict:
+        return {
+            "email": s.get("email", ""),
+            "name": s.get("name", ""),
+            "status": s.get("status", ""),
+            "tier": s.get("tier", ""),
+        }
 
     # ------------------------------------------------------------------
     # Push local changes to Sheets
     # ------------------------------------------------------------------
     def _process_writes(self):
-        """Process any queued write operations."""
-        while not self.write_queue.empty():
-            try:
-                action, data = self.write_queue.get_nowait()
+        """Drain due writes from the outbox, oldest first.
+
+        Sheets errors and timeouts back the write off exponentially and move
+        on; after OUTBOX_MAX_ATTEMPTS it is parked as failed. If there is no
+        connection at all the pass stops and the whole queue is deferred
+        (backing off while offline), so writes still go out in order."""
+        while True:
+            due = self.db.get_due_outbox()
+            if not due:
+                break
+            for entry in due:
+                action, data = entry["action"], entry["payload"]
                 try:
                     self.api.post(action, data)
-                    self._emit(SyncEvent.WRITE_SYNCED, action)
-                    log.info(f"Write synced: {action}")
-                    # Clear pending delete after successful GAS delete
-                    self._clear_pending_delete_for(action, data)
+                except APIConnectionError as e:
+                    delay = min(config.OUTBOX_BACKOFF_SECONDS * 2 ** self._offline_passes,
+                                config.OUTBOX_BACKOFF_MAX_SECONDS)
+                    self._offline_passes += 1
+                    self.db.defer_outbox(str(e), delay)
+                    log.warning(f"Writes deferred {delay:.0f}s (offline): {action} - {e}")
+                    return
                 except Exception as e:
-                    # Re-queue for retry (with attempt limit)
-                    attempts = data.get("_sync_attempts", 0) + 1
-                    if attempts < 3:
-                        data["_sync_attempts"] = attempts
-                        self.write_queue.put((action, data))
-                        log.warning(f"Write retry ({attempts}/3): {action} - {e}")
-                    else:
-                        log.error(f"Write failed after 3 attempts: {action} - {e}")
+                    if self.db.fail_outbox(entry["id"], str(e)):
+                        log.error(f"Write failed after {config.OUTBOX_MAX_ATTEMPTS} "
+                                  f"attempts: {action} - {e}")
                         self._emit(SyncEvent.SYNC_ERROR, f"Failed to sync: {action}")
-                        # Still clear the pending delete — record is gone from
-                        # Sheets or we've exhausted retries. The stale-purge
-                        # safety valve will clean up in 48h regardless.
-            except queue.Empty:
-                break
-
-        # Also push dirty records from SQLite
-        self._push_dirty_clients()
-        self._push_dirty_invoices()
-        self._push_dirty_quotes()
-        self._push_dirty_enquiries()
-        self._push_dirty_email_preferences()
+                    else:
+                        log.warning(f"Write retry ({entry['attempts'] + 1}/"
+                                    f"{config.OUTBOX_MAX_ATTEMPTS}): {action} - {e}")
+                    continue
+                self._offline_passes = 0
+                self.db.complete_outbox(entry["id"])
+                self._emit(SyncEvent.WRITE_SYNCED, action)
+                log.info(f"Write synced: {action}")
+                # Clear pending delete after successful GAS delete
+                self._clear_pending_delete_for(action, data)
+
+        # Also push dirty records from SQLite, for the tables that changed
+        with self._push_lock:
+            tables, self._push_tables = self._push_tables, set()
+        for table in Database.DIRTY_PUSH_TABLES:
+            if table in tables:
+                getattr(self, f"_push_dirty_{table}")()
 
     def _clear_pending_delete_for(self, action: str, data: dict):
         """Clear the pending_deletes entry after a successful GAS delete."""
@@ -1300,171 +1587,228 @@ class SyncEngine:
 
     def _push_dirty_clients(self):
         """Push locally-modified clients back to Sheets."""
-        dirty = self.db.get_dirty_clients()
+        # Clients without a sheet row aren't on Sheets yet — left dirty
+        dirty = [c for c in self.db.get_dirty_clients() if c.get("sheets_row")]
         if not dirty:
             return
 
-        for client in dirty:
-            try:
-                if client.get("sheets_row"):
-                    # Update existing row
-                    self.api.post("update_client", {
-                        "row": client["sheets_row"],
-                        "name": client["name"],
-                        "email": client["email"],
-                        "phone": client["phone"],
-                        "postcode": client["postcode"],
-                        "address": client.get("address", ""),
-                        "service": client["service"],
-                        "price": client["price"],
-                        "date": client["date"],
-                        "time": client.get("time", ""),
-                        "preferredDay": client.get("preferred_day", ""),
-                        "frequency": client.get("frequency", ""),
-                        "type": client["type"],
-                        "status": client["status"],
-                        "paid": client["paid"],
-                        "notes": client.get("notes", ""),
-                        "wasteCollection": client.get("waste_collection", "Not Set"),
+        pushed = self._push_rows("update_client", dirty, lambda client: {
+            "row": client["sheets_row"],
+            "name": client["name"],
+            "email": client["email"],
+            "phone": client["phone"],
+            "postcode": client["postcode"],
+            "address": client.get("address", ""),
+            "service": client["service"],
+            "price": client["price"],
+            "date": client["date"],
+            "time": client.get("time", ""),
+            "preferredDay": client.get("preferred_day", ""),
+            "frequency": client.get("frequency", ""),
+            "type": client["type"],
+            "status": client["status"],
+            "paid": client["paid"],
+            "notes": client.get("notes", ""),
+            "wasteCollection": client.get("waste_collection", "Not Set"),
+        }, lambda client: client["name"])
+        self.db.mark_clients_synced([client["id"] for client in pushed])
+
+        # Also push to Supabase
+        sc = _get_supa()
+        if sc:
+            for client in pushed:
+                try:
+                    sc.upsert_client({
+                        "name": client["name"], "email": client["email"],
+                        "phone": client["phone"], "postcode": client["postcode"],
+                        "service": client["service"], "status": client["status"],
+                        "price": client["price"], "notes": client.get("notes", ""),
+                        "job_number": client.get("job_number", ""),
                     })
-                    self.db.mark_clients_synced([client["id"]])
-                    log.info(f"Pushed client update: {client['name']}")
-                    # Also push to Supabase
-                    sc = _get_supa()
-                    if sc:
-                        try:
-                            sc.upsert_client({
-                                "name": client["name"], "email": client["email"],
-                                "phone": client["phone"], "postcode": client["postcode"],
-                                "service": client["service"], "status": client["status"],
-                                "price": client["price"], "notes": client.get("notes", ""),
-                                "job_number": client.get("job_number", ""),
-                            })
-                        except Exception:
-                            pass
-            except Exception as e:
-                log.error(f"Failed to push client {client['name']}: {e}")
+                except Exception:
+                    pass
 
     def _push_dirty_invoices(self):
         """Push locally-modified invoices back to Sheets."""
         dirty = self.db.get_dirty_invoices()
         if not dirty:
             return
-        for inv in dirty:
-            try:
-                self.api.post("update_invoice", {
-                    "row": inv.get("sheets_row", ""),
-                    "invoiceNumber": inv.get("invoice_number", ""),
-                    "clientName": inv.get("client_name", ""),
-                    "clientEmail": inv.get("client_email", ""),
-                    "amount": inv.get("amount", 0),
-                    "status": inv.get("status", ""),
-                    "issueDate": inv.get("issue_date", ""),
-                    "dueDate": inv.get("due_date", ""),
-                    "paidDate": inv.get("paid_date", ""),
-                    "notes": inv.get("notes", ""),
-                })
-                self.db.mark_invoices_synced([inv["id"]])
-                log.info(f"Pushed invoice update: {inv.get('invoice_number', '')}")
-                # Also push to Supabase
-                sc = _get_supa()
-                if sc:
-                    try:
-                        sc.upsert_invoice({
-                            "invoice_number": inv.get("invoice_number", ""),
-                            "client_name": inv.get("client_name", ""),
-                            "client_email": inv.get("client_email", ""),
-                            "amount": inv.get("amount", 0),
-                            "status": inv.get("status", ""),
-                            "notes": inv.get("notes", ""),
-                        })
-                    except Exception:
-                        pass
-            except Exception as e:
-                log.error(f"Failed to push invoice {inv.get('invoice_number', '')}: {e}")
+
+        pushed = self._push_rows("update_invoice", dirty, lambda inv: {
+            "row": inv.get("sheets_row", ""),
+            "invoiceNumber": inv.get("invoice_number", ""),
+            "clientName": inv.get("client_name", ""),
+            "clientEmail": inv.get("client_email", ""),
+            "amount": inv.get("amount", 0),
+            "status": inv.get("status", ""),
+            "issueDate": inv.get("issue_date", ""),
+            "dueDate": inv.get("due_date", ""),
+            "paidDate": inv.get("paid_date", ""),
+            "notes": inv.get("notes", ""),
+        }, lambda inv: inv.get("invoice_number", ""))
+        self.db.mark_invoices_synced([inv["id"] for inv in pushed])
+
+        # Also push to Supabase
+        sc = _get_supa()
+        if sc:
+            for inv in pushed:
+                try:
+                    sc.upsert_invoice({
+                        "invoice_number": inv.get("invoice_number", ""),
+                        "client_name": inv.get("client_name", ""),
+                        "client_email": inv.get("client_email", ""),
+                        "amount": inv.get("amount", 0),
+                        "status": inv.get("status", ""),
+                        "notes": inv.get("notes", ""),
+                    })
+                except Exception:
+                    pass
 
     def _push_dirty_quotes(self):
         """Push locally-modified quotes back to Sheets."""
         dirty = self.db.get_dirty_quotes()
         if not dirty:
             return
-        for q in dirty:
-            try:
-                self.api.post("update_quote", {
-                    "row": q.get("sheets_row", ""),
-                    "quoteId": q.get("quote_number", ""),
-                    "clientName": q.get("client_name", ""),
-                    "clientEmail": q.get("client_email", ""),
-                    "clientPhone": q.get("client_phone", ""),
-                    "postcode": q.get("postcode", ""),
-                    "address": q.get("address", ""),
-                    "lineItems": q.get("items", "[]"),
-                    "subtotal": q.get("subtotal", 0),
-                    "discountAmt": q.get("discount", 0),
-                    "vatAmt": q.get("vat", 0),
-                    "grandTotal": q.get("total", 0),
-                    "status": q.get("status", ""),
-                    "dateCreated": q.get("date_created", ""),
-                    "validUntil": q.get("valid_until", ""),
-                    "depositRequired": q.get("deposit_required", 0),
-                    "notes": q.get("notes", ""),
-                })
-                self.db.mark_quotes_synced([q["id"]])
-                log.info(f"Pushed quote update: {q.get('quote_number', '')}")
-                # Also push to Supabase
-                sc = _get_supa()
-                if sc:
-                    try:
-                        sc.upsert_quote({
-                            "quote_number": q.get("quote_number", ""),
-                            "client_name": q.get("client_name", ""),
-                            "client_email": q.get("client_email", ""),
-                            "status": q.get("status", ""),
-                            "total": q.get("total", 0),
-                            "notes": q.get("notes", ""),
-                        })
-                    except Exception:
-                        pass
-            except Exception as e:
-                log.error(f"Failed to push quote {q.get('quote_number', '')}: {e}")
+
+        pushed = self._push_rows("update_quote", dirty, lambda q: {
+            "row": q.get("sheets_row", ""),
+            "quoteId": q.get("quote_number", ""),
+            "clientName": q.get("client_name", ""),
+            "clientEmail": q.get("client_email", ""),
+            "clientPhone": q.get("client_phone", ""),
+            "postcode": q.get("postcode", ""),
+            "address": q.get("address", ""),
+            "lineItems": q.get("items", "[]"),
+            "subtotal": q.get("subtotal", 0),
+            "discountAmt": q.get("discount", 0),
+            "vatAmt": q.get("vat", 0),
+            "grandTotal": q.get("total", 0),
+            "status": q.get("status", ""),
+            "dateCreated": q.get("date_created", ""),
+            "validUntil": q.get("valid_until", ""),
+            "depositRequired": q.get("deposit_required", 0),
+            "notes": q.get("notes", ""),
+        }, lambda q: q.get("quote_number", ""))
+        self.db.mark_quotes_synced([q["id"] for q in pushed])
+
+        # Also push to Supabase
+        sc = _get_supa()
+        if sc:
+            for q in pushed:
+                try:
+                    sc.upsert_quote({
+                        "quote_number": q.get("quote_number", ""),
+                        "client_name": q.get("client_name", ""),
+                        "client_email": q.get("client_email", ""),
+                        "status": q.get("status", ""),
+                        "total": q.get("total", 0),
+                        "notes": q.get("notes", ""),
+                    })
+                except Exception:
+                    pass
 
     def _push_dirty_enquiries(self):
         """Push locally-modified enquiries back to Sheets."""
         dirty = self.db.get_dirty_enquiries()
         if not dirty:
             return
-        for enq in dirty:
+
+        pushed = self._push_rows("update_enquiry", dirty, lambda enq: {
+            "row": enq.get("sheets_row", ""),
+            "name": enq.get("name", ""),
+            "email": enq.get("email", ""),
+            "phone": enq.get("phone", ""),
+            "message": enq.get("message", ""),
+            "type": enq.get("type", ""),
+            "status": enq.get("status", ""),
+            "date": enq.get("date", ""),
+            "replied": enq.get("replied", ""),
+            "notes": enq.get("notes", ""),
+        }, lambda enq: enq.get("name", ""))
+        self.db.mark_enquiries_synced([enq["id"] for enq in pushed])
+
+        # Also push to Supabase
+        sc = _get_supa()
+        if sc:
+            for enq in pushed:
+                try:
+                    sc.upsert_enquiry({
+                        "name": enq.get("name", ""),
+                        "email": enq.get("email", ""),
+                        "phone": enq.get("phone", ""),
+                        "message": enq.get("message", ""),
+                        "status": enq.get("status", ""),
+                        "notes": enq.get("notes", ""),
+                    })
+                except Exception:
+                    pass
+
+    def _push_rows(self, action: str, rows: list[dict],
+                   payload: Callable[[dict], dict],
+                   describe: Callable[[dict], str]) -> list[dict]:
+        """Send ``rows`` to Sheets with ``action`` in batches of
+        SYNC_PUSH_BATCH_SIZE. Returns the rows Sheets accepted; the rest
+        stay dirty for the next push."""
+        pushed = []
+        size = max(config.SYNC_PUSH_BATCH_SIZE, 1)
+        for start in range(0, len(rows), size):
+            chunk = rows[start:start + size]
             try:
-                self.api.post("update_enquiry", {
-                    "row": enq.get("sheets_row", ""),
-                    "name": enq.get("name", ""),
-                    "email": enq.get("email", ""),
-                    "phone": enq.get("phone", ""),
-                    "message": enq.get("message", ""),
-                    "type": enq.get("type", ""),
-                    "status": enq.get("status", ""),
-                    "date": enq.get("date", ""),
-                    "replied": enq.get("replied", ""),
-                    "notes": enq.get("notes", ""),
+                errors = self._post_batch(action, [payload(row) for row in chunk])
+            except APIConnectionError as e:
+                log.warning(f"Push of {action} deferred (offline): {e}")
+                break
+            for row, error in zip(chunk, errors):
+                if error:
+                    log.error(f"Failed to push {action} {describe(row)}: {error}")
+                else:
+                    pushed.append(row)
+        if pushed:
+            log.info(f"Pushed {len(pushed)}/{len(rows)} {action} rows")
+        return pushed
+
+    def _post_batch(self, action: str, items: list[dict]) -> list[str]:
+        """Post several updates in one batch_update call. Returns one error
+        message per item ("" when written — any status other than
+        'success' counts as a failure). Falls back to one call per item
+        if the deployed script doesn't understand the batch."""
+        if len(items) > 1:
+            try:
+                result = self.api.post("batch_update", {
+                    "updateAction": action, "items": items,
                 })
-                self.db.mark_enquiries_synced([enq["id"]])
-                log.info(f"Pushed enquiry update: {enq.get('name', '')}")
-                # Also push to Supabase
-                sc = _get_supa()
-                if sc:
-                    try:
-                        sc.upsert_enquiry({
-                            "name": enq.get("name", ""),
-                            "email": enq.get("email", ""),
-                            "phone": enq.get("phone", ""),
-                            "message": enq.get("message", ""),
-                            "status": enq.get("status", ""),
-                            "notes": enq.get("notes", ""),
-                        })
-                    except Exception:
-                        pass
+                outcomes = result.get("results") if isinstance(result, dict) else None
+            except APIConnectionError:
+                raise
+            except APIError as e:
+                log.warning(f"Batch {action} failed, sending one by one: {e}")
+                outcomes = None
+            if isinstance(outcomes, list) and len(outcomes) == len(items):
+                errors = []
+                for o in outcomes:
+                    if not isinstance(o, dict):
+                        errors.append("malformed result")
+                    else:
+                        errors.append("" if o.get("ok") else str(o.get("error") or "rejected"))
+                return errors
+            if outcomes is not None:
+                log.warning(f"Batch {action} returned {len(outcomes)} results "
+                            f"for {len(items)} items, sending one by one")
+
+        errors = []
+        for item in items:
+            try:
+                result = self.api.post(action, item)
+                status = result.get("status", "success") if isinstance(result, dict) else "success"
+                # The update handlers report a missing row as status
+                # 'error'/'not_found' without an error field
+                errors.append("" if status == "success"
+                              else str(result.get("message") or status))
+            except APIConnectionError:
+                raise
             except Exception as e:
-                log.error(f"Failed to push enquiry {enq.get('name', '')}: {e}")
+                errors.append(str(e) or "failed")
+        return errors
 
     def _push_dirty_email_preferences(self):
         """Push locally-modified email preferences back to Sheets."""
@@ -12,6 +12,7 @@ import urllib.parse
 import logging
 
 from ..ui import theme
+from ..ui.async_refresh import AsyncRefresher
 from ..ui.components.kpi_card import KPICard
 from ..ui.components.data_table import DataTable
 from .. import config
@@ -36,6 +37,9 @@ class DispatchTab(ctk.CTkScrollableFrame):
         self._current_date = date.today()
         self._kpi_cards = {}
         self._job_cards = []
+        self._photo_counts = {}
+        self._field_tracking = {}
+        self._refresher = AsyncRefresher(self)
 
         self._build_ui()
 
@@ -413,7 +417,7 @@ class DispatchTab(ctk.CTkScrollableFrame):
 
         # ── Field Tracking Status (from mobile app) ──
         jn_track = job.get("job_number", "")
-        field_data = self._field_tracking.get(jn_track) if hasattr(self, '_field_tracking') else None
+        field_data = self._field_tracking.get(jn_track)
         if field_data:
             is_active = field_data.get("is_active", 0)
             duration = field_data.get("duration_mins", 0)
@@ -495,7 +499,7 @@ class DispatchTab(ctk.CTkScrollableFrame):
 
         # Photos
         jn = job.get("job_number", "")
-        photo_count = self._photo_counts.get(jn, 0) if hasattr(self, '_photo_counts') else 0
+        photo_count = self._photo_counts.get(jn, 0)
         photo_text = f"📸 {photo_count}" if photo_count else "📸"
         ctk.CTkButton(
             actions_frame, text=photo_text, width=60, height=28,
@@ -1346,65 +1350,79 @@ class DispatchTab(ctk.CTkScrollableFrame):
     # Refresh
     # ------------------------------------------------------------------
     def refresh(self):
-        try:
-            jobs = self._get_jobs_for_date()
+        """Reload the selected day in the background and redraw."""
+        date_str = self._current_date.isoformat()
+        self._refresher.submit([(lambda: self._load_day(date_str), self._render_day)])
 
-            # Preload photo counts for all today's jobs
-            job_numbers = [j.get("job_number", "") for j in jobs if j.get("job_number")]
-            self._photo_counts = self.db.get_photo_counts(job_numbers) if job_numbers else {}
+    def cancel_refresh(self):
+        """Drop a refresh still loading (the tab was hidden)."""
+        self._refresher.cancel()
 
-            # Preload field tracking data for today's jobs
-            try:
-                self._field_tracking = {}
-                tracking = self.db.get_job_tracking(
-                    date=self._current_date.strftime("%Y-%m-%d"), limit=100
-                )
-                for t in tracking:
-                    ref = t.get("job_ref", "")
-                    if ref:
-                        self._field_tracking[ref] = t
-            except Exception:
-                self._field_tracking = {}
+    def _load_day(self, date_str: str) -> dict:
+        """Everything the day view shows, read off the Tk thread."""
+        jobs = self.db.get_todays_jobs(target_date=date_str)
 
-            # KPIs
-            total_rev = sum(float(j.get("price", 0) or 0) for j in jobs)
-            completed_rev = sum(
-                float(j.get("price", 0) or 0)
-                for j in jobs if j.get("status") in ("Complete", "Completed")
-            )
-            materials = sum(
-                self._materials_lower.get((j.get("service", "") or "").lower(), 0)
-                for j in jobs
-            )
-            fuel_est = len(jobs) * config.AVG_TRAVEL_MILES * config.FUEL_RATE_PER_MILE
+        # Preload photo counts for all the day's jobs
+        job_numbers = [j.get("job_number", "") for j in jobs if j.get("job_number")]
+        photo_counts = self.db.get_photo_counts(job_numbers) if job_numbers else {}
+
+        # Preload field tracking data for the day's jobs
+        field_tracking = {}
+        try:
+            for t in self.db.get_job_tracking(date=date_str, limit=100):
+                ref = t.get("job_ref", "")
+                if ref:
+                    field_tracking[ref] = t
+        except Exception:
+            pass
+
+        return {
+            "date": date_str,
+            "jobs": jobs,
+            "photo_counts": photo_counts,
+            "field_tracking": field_tracking,
+            "conflicts": self.db.check_schedule_conflicts(date_str),
+        }
 
-            self._kpi_cards["jobs"].set_value(str(len(jobs)))
-            self._kpi_cards["revenue"].set_value(f"£{total_rev:,.0f}")
-            self._kpi_cards["materials"].set_value(f"£{materials:,.2f}")
-            self._kpi_cards["fuel"].set_value(f"£{fuel_est:,.2f}")
-            self._kpi_cards["profit"].set_value(f"£{completed_rev - materials - fuel_est:,.2f}")
+    def _render_day(self, day: dict):
+        if day["date"] != self._current_date.isoformat():
+            return  # the date changed while loading — its own refresh follows
+        jobs = day["jobs"]
+        self._photo_counts = day["photo_counts"]
+        self._field_tracking = day["field_tracking"]
 
-            # Conflict detection
-            self._check_and_show_conflicts(jobs)
+        # KPIs
+        total_rev = sum(float(j.get("price", 0) or 0) for j in jobs)
+        completed_rev = sum(
+            float(j.get("price", 0) or 0)
+            for j in jobs if j.get("status") in ("Complete", "Completed")
+        )
+        materials = sum(
+            self._materials_lower.get((j.get("service", "") or "").lower(), 0)
+            for j in jobs
+        )
+        fuel_est = len(jobs) * config.AVG_TRAVEL_MILES * config.FUEL_RATE_PER_MILE
 
-            # Jobs
-            self._render_jobs(jobs)
+        self._kpi_cards["jobs"].set_value(str(len(jobs)))
+        self._kpi_cards["revenue"].set_value(f"£{total_rev:,.0f}")
+        self._kpi_cards["materials"].set_value(f"£{materials:,.2f}")
+        self._kpi_cards["fuel"].set_value(f"£{fuel_est:,.2f}")
+        self._kpi_cards["profit"].set_value(f"£{completed_rev - materials - fuel_est:,.2f}")
 
-            # Fund allocation (on completed revenue)
-            self._render_fund_allocation(completed_rev)
+        # Conflict detection
+        self._show_conflicts(day["conflicts"])
 
-            # Summary
-            self._render_summary(jobs)
+        # Jobs
+        self._render_jobs(jobs)
 
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
+        # Fund allocation (on completed revenue)
+        self._render_fund_allocation(completed_rev)
 
-    def _check_and_show_conflicts(self, jobs: list):
-        """Check for scheduling conflicts and show/hide the warning banner."""
-        date_str = self._current_date.isoformat()
-        conflicts = self.db.check_schedule_conflicts(date_str)
+        # Summary
+        self._render_summary(jobs)
 
+    def _show_conflicts(self, conflicts: dict):
+        """Show/hide the scheduling conflict warning banner."""
         if not conflicts["has_conflict"]:
             self._conflict_banner.pack_forget()
             return
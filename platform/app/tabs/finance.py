@@ -7,6 +7,7 @@ import customtkinter as ctk
 from datetime import date, datetime
 
 from ..ui import theme
+from ..ui.async_refresh import AsyncRefresher
 from ..ui.components.kpi_card import KPICard
 from ..ui.components.data_table import DataTable
 from ..ui.components.chart_panel import ChartPanel
@@ -31,6 +32,7 @@ class FinanceTab(ctk.CTkFrame):
         self._sub_buttons = {}
         self._sub_frames = {}
         self._kpi_cards = {}
+        self._refresher = AsyncRefresher(self)
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
@@ -148,7 +150,11 @@ class FinanceTab(ctk.CTkFrame):
         self.alloc_container.pack(fill="x", padx=16, pady=(0, 16))
 
     def _render_dashboard(self):
-        """Render the finance dashboard."""
+        """Render the finance dashboard (queries run in the background)."""
+        self._refresher.submit([(self._load_dashboard, self._apply_dashboard)])
+
+    def _load_dashboard(self) -> dict:
+        """Figures for the dashboard, read off the Tk thread."""
         stats = self.db.get_revenue_stats()
         ytd = stats.get("ytd", 0)
 
@@ -186,8 +192,22 @@ class FinanceTab(ctk.CTkFrame):
         net = ytd - total_costs
         # Months since tax year start for avg calculation
         months_elapsed = max(1, (today.year - tax_year_start.year) * 12 + (today.month - tax_year_start.month))
-        monthly_avg = ytd / months_elapsed
-        sub_revenue = stats.get("subscription_revenue", 0)
+
+        return {
+            "ytd": ytd,
+            "total_costs": total_costs,
+            "job_materials": job_materials,
+            "net": net,
+            "monthly_avg": ytd / months_elapsed,
+            "sub_revenue": stats.get("subscription_revenue", 0),
+            "service_data": self.db.get_revenue_by_service(),
+            "daily": self.db.get_daily_revenue(30),
+        }
+
+    def _apply_dashboard(self, data: dict):
+        ytd, net = data["ytd"], data["net"]
+        total_costs, job_materials = data["total_costs"], data["job_materials"]
+        monthly_avg, sub_revenue = data["monthly_avg"], data["sub_revenue"]
 
         self._kpi_cards["gross_revenue"].set_value(f"£{ytd:,.0f}")
         self._kpi_cards["costs_ytd"].set_value(f"£{total_costs:,.0f}")
@@ -200,7 +220,7 @@ class FinanceTab(ctk.CTkFrame):
         self._kpi_cards["sub_revenue"].set_value(f"£{sub_revenue:,.0f}")
 
         # Revenue by service chart (pie)
-        service_data = self.db.get_revenue_by_service()
+        service_data = data["service_data"]
         if service_data:
             labels = [s["service"] for s in service_data]
             values = [s["revenue"] for s in service_data]
@@ -209,7 +229,7 @@ class FinanceTab(ctk.CTkFrame):
             self.service_chart.pie_chart(["No data"], [1], title="Revenue by Service")
 
         # Monthly revenue chart (bar)
-        daily = self.db.get_daily_revenue(30)
+        daily = data["daily"]
         if daily:
             # Aggregate into month if enough data, otherwise show daily
             labels = []
@@ -730,6 +750,10 @@ class FinanceTab(ctk.CTkFrame):
         if self._current_sub:
             self._refresh_subtab(self._current_sub)
 
+    def cancel_refresh(self):
+        """Drop a dashboard refresh still loading (the tab was hidden)."""
+        self._refresher.cancel()
+
     def on_table_update(self, table_name: str):
         if table_name in ("invoices", "clients", "business_costs", "savings_pots"):
             self.refresh()
@@ -286,6 +286,11 @@ class MarketingTab(ctk.CTkFrame):
                     pass
                 branded_html = wrap_newsletter_html(body_html, subject, image_url=nl_image_url)
 
+                # GAS sendNewsletter owns the opt-out check, per-subscriber
+                # unsubscribe links, tier content and the Newsletters log,
+                # so newsletters stay on it — at GAS's pace and with only
+                # the final sent/failed totals — rather than going through
+                # EmailProvider.send_newsletter's batched Brevo delivery
                 result = self.api.post("send_newsletter", {
                     "subject": subject,
                     "body": branded_html,
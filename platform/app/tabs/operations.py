@@ -14,6 +14,7 @@ from ..ui.components.booking_detail_card import BookingDetailCard
 from ..ui.components.quote_modal import QuoteModal
 from ..ui.components.enquiry_modal import EnquiryModal
 from ..ui.components.day_planner import DayPlanner
+from ..ui.components.round_plan_dialog import RoundPlanDialog
 
 
 class OperationsTab(ctk.CTkFrame):
@@ -317,6 +318,13 @@ class OperationsTab(ctk.CTkFrame):
         )
         self.subs_total_label.grid(row=0, column=1, sticky="e", padx=8)
 
+        ctk.CTkButton(
+            header, text="🗺️ Round Plan", width=120, height=30,
+            fg_color=theme.BG_CARD, hover_color=theme.BG_CARD_HOVER,
+            corner_radius=8, font=theme.font(12),
+            command=self._open_round_plan,
+        ).grid(row=0, column=2, sticky="e")
+
         columns = [
             {"key": "job_number",    "label": "Job #",      "width": 70},
             {"key": "name",          "label": "Client",    "width": 160},
@@ -561,6 +569,18 @@ class OperationsTab(ctk.CTkFrame):
         self.subs_table.set_data(rows)
         self.subs_total_label.configure(text=f"Total Monthly: £{total:,.0f}  •  {len(rows)} clients")
 
+    def _open_round_plan(self):
+        """Review the round planner's proposed subscription day changes."""
+        RoundPlanDialog(
+            self, self.db, self.sync, self.api,
+            on_apply=self._round_plan_applied,
+        )
+
+    def _round_plan_applied(self, applied: int):
+        if applied:
+            self.app.show_toast(f"Moved {applied} subscription day(s)", "success")
+        self._refresh_subtab("subscriptions")
+
     def _load_quotes(self):
         """Load quotes."""
         status_val = self.quote_status_filter.get()
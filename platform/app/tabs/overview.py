@@ -7,6 +7,7 @@ import customtkinter as ctk
 from datetime import datetime, date, timedelta
 
 from ..ui import theme
+from ..ui.async_refresh import AsyncRefresher
 from ..ui.components.kpi_card import KPICard
 from ..ui.components.chart_panel import ChartPanel
 from ..ui.components.client_modal import ClientModal
@@ -29,6 +30,7 @@ class OverviewTab(ctk.CTkScrollableFrame):
 
         self._kpi_cards = {}
         self._job_widgets = []
+        self._refresher = AsyncRefresher(self)
 
         self._build_ui()
 
@@ -384,15 +386,13 @@ class OverviewTab(ctk.CTkScrollableFrame):
             font=theme.font(12), text_color=theme.TEXT_DIM,
         )
 
-    def _render_upcoming_confirmed(self):
+    def _render_upcoming_confirmed(self, bookings: list[dict]):
         """Render the upcoming confirmed bookings list."""
         # Clear existing
         for w in self._upcoming_container.winfo_children():
             if w != getattr(self, "_upcoming_no_label", None):
                 w.destroy()
 
-        bookings = self.db.get_upcoming_confirmed(days=7)
-
         if not bookings:
             self._upcoming_no_label.pack(pady=16)
             self._upcoming_count_label.configure(text="0 bookings · Next 7 days")
@@ -521,10 +521,8 @@ class OverviewTab(ctk.CTkScrollableFrame):
         )
         self._no_bookings_label.pack(pady=16)
 
-    def _render_new_bookings(self):
-        """Render the new bookings list from the database."""
-        bookings = self.db.get_recent_bookings(days=7, limit=10)
-
+    def _render_new_bookings(self, bookings: list[dict]):
+        """Render the new bookings list."""
         children = self._bookings_container.winfo_children()
         for w in children:
             if w == children[0] and isinstance(w, ctk.CTkFrame):
@@ -662,13 +660,13 @@ class OverviewTab(ctk.CTkScrollableFrame):
         )
         self._no_enquiries_label.pack(pady=16)
 
-    def _render_quote_requests(self):
-        """Render pending enquiry cards with quick actions."""
-        enquiries = self.db.get_enquiries(status="New")
+    def _load_quote_requests(self) -> list[dict]:
+        """New enquiries, then "Contacted" ones that haven't been quoted yet."""
+        return (self.db.get_enquiries(status="New")
+                + self.db.get_enquiries(status="Contacted"))
 
-        # Also get "Contacted" enquiries that haven't been quoted yet
-        contacted = self.db.get_enquiries(status="Contacted")
-        all_pending = enquiries + contacted
+    def _render_quote_requests(self, all_pending: list[dict]):
+        """Render pending enquiry cards with quick actions."""
 
         # Clear previous entries
         for w in self._enquiry_container.winfo_children():
@@ -1180,10 +1178,8 @@ class OverviewTab(ctk.CTkScrollableFrame):
         self.chart = ChartPanel(parent, width=400, height=250)
         self.chart.grid(row=1, column=0, sticky="nsew", padx=0, pady=(0, 0))
 
-    def _render_chart(self):
+    def _render_chart(self, daily: list[dict]):
         """Render the revenue bar chart."""
-        daily = self.db.get_daily_revenue(14)
-
         if daily:
             labels = []
             values = []
@@ -1314,8 +1310,20 @@ class OverviewTab(ctk.CTkScrollableFrame):
         commit_str = cfg.GIT_COMMIT or "?"
         card["detail"].configure(text=f"v{cfg.APP_VERSION} ({commit_str})")
 
+    def _load_version_status(self) -> tuple | None:
+        """(version info, update check) — the check runs a git fetch."""
+        if not getattr(self.app, "_heartbeat", None):
+            return None
+        from ..updater import get_current_version_info, check_for_updates
+        info = get_current_version_info()
+        try:
+            updates = check_for_updates()
+        except Exception:
+            updates = None
+        return info, updates
+
     def _render_network_status(self):
-        """Refresh the network status panel with latest node data."""
+        """Refresh the network status node cards with latest heartbeat data."""
         from .. import config as cfg
         hb = getattr(self.app, "_heartbeat", None)
         if not hb:
@@ -1341,25 +1349,23 @@ class OverviewTab(ctk.CTkScrollableFrame):
         if mob_card:
             self._render_peer_card(mob_card, hb, "mobile-field")
 
-        try:
-            from ..updater import get_current_version_info, check_for_updates
-            info = get_current_version_info()
-            commit = info.get("commit", "?")
-            updated = info.get("last_updated", "")
-            if updated:
-                updated = updated[:10]
-            self._git_info_label.configure(text=f"Git: {commit} | Updated: {updated}")
-
-            try:
-                has_updates, summary = check_for_updates()
-                if has_updates:
-                    self._update_label.configure(text=f" {summary}", text_color=theme.AMBER)
-                else:
-                    self._update_label.configure(text=" Up to date", text_color=theme.GREEN_LIGHT)
-            except Exception:
-                self._update_label.configure(text="")
-        except Exception:
-            pass
+    def _render_version_status(self, version: tuple = None):
+        """Show the git version and update check under the node cards."""
+        if not version:
+            return
+        info, updates = version
+        commit = info.get("commit", "?")
+        updated = info.get("last_updated", "")
+        if updated:
+            updated = updated[:10]
+        self._git_info_label.configure(text=f"Git: {commit} | Updated: {updated}")
+
+        if updates is None:
+            self._update_label.configure(text="")
+        elif updates[0]:
+            self._update_label.configure(text=f" {updates[1]}", text_color=theme.AMBER)
+        else:
+            self._update_label.configure(text=" Up to date", text_color=theme.GREEN_LIGHT)
     # ------------------------------------------------------------------
     # Site Traffic Panel
     # ------------------------------------------------------------------
@@ -1534,12 +1540,21 @@ class OverviewTab(ctk.CTkScrollableFrame):
         )
         self._email_empty_label.pack(pady=8)
 
-    def _render_recent_emails(self):
-        """Refresh the recent emails list from local DB."""
+    def _load_recent_emails(self) -> tuple:
+        """(latest 10 tracked emails, email stats or None)."""
         try:
             emails = self.db.get_email_tracking(limit=10)
         except Exception:
             emails = []
+        try:
+            stats = self.db.get_email_stats() if emails else None
+        except Exception:
+            stats = None
+        return emails, stats
+
+    def _render_recent_emails(self, data: tuple):
+        """Refresh the recent emails list."""
+        emails, stats = data
 
         for w in self._email_list_frame.winfo_children():
             w.destroy()
@@ -1552,12 +1567,11 @@ class OverviewTab(ctk.CTkScrollableFrame):
             self._email_count_label.configure(text="")
             return
 
-        try:
-            stats = self.db.get_email_stats()
+        if stats:
             total = stats.get("total", len(emails))
             today = stats.get("today", 0)
             self._email_count_label.configure(text=f"{today} today  •  {total} total")
-        except Exception:
+        else:
             self._email_count_label.configure(text=f"{len(emails)} shown")
 
         for em in emails:
@@ -1625,8 +1639,8 @@ class OverviewTab(ctk.CTkScrollableFrame):
         )
         self._field_empty_label.pack(pady=8)
 
-    def _render_field_activity(self):
-        """Refresh field activity from local job_tracking DB."""
+    def _load_field_activity(self) -> tuple:
+        """(job_tracking stats, today's tracking entries)."""
         try:
             stats = self.db.get_job_tracking_stats()
         except Exception:
@@ -1637,6 +1651,11 @@ class OverviewTab(ctk.CTkScrollableFrame):
             tracking = self.db.get_job_tracking(date=today_str, limit=20)
         except Exception:
             tracking = []
+        return stats, tracking
+
+    def _render_field_activity(self, data: tuple):
+        """Refresh field activity from local job_tracking data."""
+        stats, tracking = data
 
         for w in self._field_list_frame.winfo_children():
             w.destroy()
@@ -1782,61 +1801,54 @@ class OverviewTab(ctk.CTkScrollableFrame):
     # Refresh
     # ------------------------------------------------------------------
     def refresh(self):
-        """Refresh all overview data from SQLite."""
-        try:
-            stats = self.db.get_revenue_stats()
-            self._kpi_cards["today"].set_value(f"£{stats['today']:,.0f}")
-            self._kpi_cards["week"].set_value(f"£{stats['week']:,.0f}")
-            self._kpi_cards["month"].set_value(f"£{stats['month']:,.0f}")
-            self._kpi_cards["ytd"].set_value(f"£{stats['ytd']:,.0f}")
-            self._kpi_cards["subs"].set_value(str(stats["active_subs"]))
-            self._kpi_cards["outstanding"].set_value(f"£{stats['outstanding_amount']:,.0f}")
-
-            if stats["outstanding_amount"] > 0:
-                self._kpi_cards["outstanding"].set_color(theme.RED)
-            else:
-                self._kpi_cards["outstanding"].set_color(theme.GREEN_LIGHT)
-
-            jobs = self.db.get_todays_jobs()
-            self._render_jobs(jobs)
-            self._render_alerts(stats)
-
-            # Refresh the embedded booking calendar
-            if hasattr(self, "_overview_calendar"):
-                try:
-                    self._overview_calendar.refresh()
-                except Exception:
-                    pass
-
-            self._render_upcoming_confirmed()
-            self._render_new_bookings()
-            self._render_quote_requests()
-            self._render_network_status()
-            self._render_chart()
-
-            try:
-                analytics = self.db.get_analytics_summary()
-                self._render_site_traffic(analytics)
-                total_views = analytics.get("totalViews", analytics.get("total_views", 0))
-                self._kpi_cards["site_views"].set_value(f"{int(total_views):,}")
-            except Exception:
-                pass
+        """Refresh all overview data from SQLite.
+        Queries run in the background; each panel redraws once its data
+        is back, so the window stays responsive while a sync lands."""
+        self._refresher.submit([
+            (self.db.get_revenue_stats, self._render_stats),
+            (self.db.get_todays_jobs, self._render_jobs),
+            (lambda: None, self._refresh_calendar),
+            (lambda: self.db.get_upcoming_confirmed(days=7), self._render_upcoming_confirmed),
+            (lambda: self.db.get_recent_bookings(days=7, limit=10), self._render_new_bookings),
+            (self._load_quote_requests, self._render_quote_requests),
+            (lambda: self.db.get_daily_revenue(14), self._render_chart),
+            (self.db.get_analytics_summary, self._render_analytics),
+            (self._load_recent_emails, self._render_recent_emails),
+            (self._load_field_activity, self._render_field_activity),
+            (lambda: None, lambda _: self._render_health_banner()),
+            (lambda: None, lambda _: self._render_network_status()),
+            # Last: the update check waits on the network
+            (self._load_version_status, self._render_version_status),
+        ])
+
+    def cancel_refresh(self):
+        """Drop a refresh still loading (the tab was hidden)."""
+        self._refresher.cancel()
+
+    def _render_stats(self, stats: dict):
+        self._kpi_cards["today"].set_value(f"£{stats['today']:,.0f}")
+        self._kpi_cards["week"].set_value(f"£{stats['week']:,.0f}")
+        self._kpi_cards["month"].set_value(f"£{stats['month']:,.0f}")
+        self._kpi_cards["ytd"].set_value(f"£{stats['ytd']:,.0f}")
+        self._kpi_cards["subs"].set_value(str(stats["active_subs"]))
+        self._kpi_cards["outstanding"].set_value(f"£{stats['outstanding_amount']:,.0f}")
+
+        if stats["outstanding_amount"] > 0:
+            self._kpi_cards["outstanding"].set_color(theme.RED)
+        else:
+            self._kpi_cards["outstanding"].set_color(theme.GREEN_LIGHT)
 
-            # Recent emails + field activity
-            try:
-                self._render_recent_emails()
-            except Exception:
-                pass
-            try:
-                self._render_field_activity()
-            except Exception:
-                pass
+        self._render_alerts(stats)
 
-            self._render_health_banner()
+    def _refresh_calendar(self, _=None):
+        """Refresh the embedded booking calendar."""
+        if hasattr(self, "_overview_calendar"):
+            self._overview_calendar.refresh()
 
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
+    def _render_analytics(self, analytics: dict):
+        self._render_site_traffic(analytics)
+        total_views = analytics.get("totalViews", analytics.get("total_views", 0))
+        self._kpi_cards["site_views"].set_value(f"{int(total_views):,}")
 
     def _render_health_banner(self):
         """Show/hide the health warning banner based on startup checks."""
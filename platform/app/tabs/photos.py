@@ -16,6 +16,7 @@ from typing import Optional
 from ..ui import theme
 from ..ui.components.kpi_card import KPICard
 from .. import config
+from .. import http_client
 
 _log = logging.getLogger("ggm.photos_tab")
 
@@ -549,17 +550,12 @@ class PhotosTab(ctk.CTkScrollableFrame):
     def _bg_download_thumb(self, file_id, drive_url, card, placeholder):
         """Background download of a Drive thumbnail."""
         try:
-            import urllib.request
-
             cache_path = CACHE_DIR / f"{file_id}.jpg"
             thumb_url = f"https://drive.google.com/thumbnail?id={file_id}&sz=w400"
 
-            req = urllib.request.Request(thumb_url, headers={
+            http_client.download(thumb_url, cache_path, timeout=10, headers={
                 "User-Agent": "Mozilla/5.0 GGM-Hub/4.2"
             })
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                with open(str(cache_path), "wb") as f:
-                    f.write(resp.read())
 
             if HAS_PIL and self.winfo_exists():
                 img = Image.open(str(cache_path))
@@ -268,7 +268,7 @@ class AppWindow(ctk.CTk):
         # Search bar
         self.search_entry = theme.create_entry(
             top_bar,
-            placeholder="Search clients, invoices...",
+            placeholder="Search clients, invoices, quotes, emails...",
             width=300,
         )
         self.search_entry.grid(row=0, column=1, padx=20, pady=12)
@@ -285,6 +285,7 @@ class AppWindow(ctk.CTk):
 
         # Notification bell
         self._notification_panel = None
+        self._search_panel = None
         self._bell_frame = ctk.CTkFrame(top_bar, fg_color="transparent", width=44, height=40)
         self._bell_frame.grid(row=0, column=3, padx=(4, 4), pady=12, sticky="e")
         self._bell_frame.grid_propagate(False)
@@ -392,6 +393,18 @@ class AppWindow(ctk.CTk):
         )
         self._version_warn.grid(row=0, column=4, padx=(4, 12), sticky="e")
 
+        # Outbox backlog — writes waiting for Sheets; click retries parked ones
+        self._outbox_label = ctk.CTkLabel(
+            status_bar,
+            text="",
+            font=theme.font(10, "bold"),
+            text_color=theme.TEXT_DIM,
+            anchor="e",
+            cursor="hand2",
+        )
+        self._outbox_label.grid(row=0, column=5, padx=(4, 12), sticky="e")
+        self._outbox_label.bind("<Button-1>", lambda e: self._retry_failed_writes())
+
         # Start periodic badge refresh
         self.after(3000, self._refresh_field_badge)
 
@@ -556,9 +569,12 @@ class AppWindow(ctk.CTk):
                     text_color=theme.TEXT_DIM,
                 )
 
-        # Hide current tab
+        # Hide current tab, dropping any refresh it still has loading
         if self._current_tab and self._current_tab in self._tab_frames:
-            self._tab_frames[self._current_tab].grid_forget()
+            old_frame = self._tab_frames[self._current_tab]
+            old_frame.grid_forget()
+            if hasattr(old_frame, "cancel_refresh"):
+                old_frame.cancel_refresh()
 
         # Show / create new tab
         if tab_id not in self._tab_frames:
@@ -1021,9 +1037,33 @@ class AppWindow(ctk.CTk):
         except Exception:
             pass
 
+        # Writes still waiting for Sheets
+        try:
+            counts = self.db.get_outbox_counts()
+        except Exception:
+            counts = {"pending": 0, "failed": 0}
+        if counts["failed"]:
+            self._outbox_label.configure(
+                text=f"⚠ {counts['failed']} failed writes — click to retry",
+                text_color=theme.RED,
+            )
+        elif counts["pending"]:
+            self._outbox_label.configure(
+                text=f"⏳ {counts['pending']} writes pending",
+                text_color=theme.AMBER,
+            )
+        else:
+            self._outbox_label.configure(text="")
+
     # ------------------------------------------------------------------
     # Actions
     # ------------------------------------------------------------------
+    def _retry_failed_writes(self):
+        """Put writes parked after OUTBOX_MAX_ATTEMPTS back in the queue."""
+        retried = self.sync.retry_failed_writes()
+        if retried and self.toast:
+            self.toast.show(f"Retrying {retried} failed write(s)...", "info")
+
     def _force_sync(self):
         """Force an immediate sync."""
         self.sync_indicator.configure(text="● Syncing...", text_color=theme.AMBER)
@@ -1032,20 +1072,63 @@ class AppWindow(ctk.CTk):
             self.toast.show("Sync started...", "info")
 
     def _on_search(self, event=None):
-        """Handle search submission."""
+        """Handle search submission — show ranked results under the search box."""
+        if self._search_panel and self._search_panel.winfo_exists():
+            self._search_panel.destroy()
+            self._search_panel = None
         query = self.search_entry.get().strip()
         if query:
-            results = self.db.search(query)
-            # If results exist, switch to operations tab and show results
+            results = self.db.search(query, limit=30)
             if results:
-                self._switch_tab("operations")
-                frame = self._tab_frames.get("operations")
-                if frame and hasattr(frame, "show_search_results"):
-                    frame.show_search_results(results)
+                from .components.search_results_panel import SearchResultsPanel
+                self._search_panel = SearchResultsPanel(
+                    self, query, results,
+                    on_click=self._on_search_result_click,
+                )
+                self._search_panel.position_near(self.search_entry)
+                self._search_panel.focus_set()
             else:
                 if self.toast:
                     self.toast.show(f"No results for '{query}'", "info")
 
+    def _on_search_result_click(self, result: dict):
+        """Open the record behind a search result."""
+        table = result.get("source_table", "")
+        record_id = result.get("source_id")
+        tabs = {
+            "clients": "operations", "invoices": "finance", "quotes": "operations",
+            "enquiries": "customer_care", "inbox": "inbox", "blog_posts": "content_studio",
+        }
+        self._switch_tab(tabs.get(table, "overview"))
+
+        on_save = lambda: self.refresh_current_tab()
+        if table == "clients":
+            record = self.db.get_client(record_id)
+            if record:
+                from .components.client_modal import ClientModal
+                self.after(200, lambda: ClientModal(
+                    self, record, self.db, self.sync, on_save=on_save))
+        elif table == "invoices":
+            record = self.db.get_invoice(record_id)
+            if record:
+                from .components.invoice_modal import InvoiceModal
+                self.after(200, lambda: InvoiceModal(
+                    self, record, self.db, self.sync, on_save=on_save))
+        elif table == "quotes":
+            record = self.db.get_quote(record_id)
+            if record:
+                from .components.quote_modal import QuoteModal
+                self.after(200, lambda: QuoteModal(
+                    self, record, self.db, self.sync, on_save=on_save,
+                    email_engine=self._email_engine))
+        elif table == "enquiries":
+            record = self.db.get_enquiry(record_id)
+            if record:
+                from .components.enquiry_modal import EnquiryModal
+                self.after(200, lambda: EnquiryModal(
+                    self, record, self.db, self.sync, on_save=on_save,
+                    email_engine=self._email_engine))
+
     # ------------------------------------------------------------------
     # Public helpers for tabs
     # ------------------------------------------------------------------
@@ -0,0 +1,107 @@
+"""
+Background refresh for GGM Hub tabs.
+
+A tab declares its refresh as (loader, apply) steps. Loaders only read —
+they run on a worker thread, where Database.fetchall/fetchone use the
+pooled WAL read connections, so a refresh never waits on a sync write.
+Each step's apply callback redraws its panel on the Tk thread, via
+after(), as soon as that loader returns.
+
+Each submit() supersedes the one before, so a burst of TABLE_UPDATED
+events costs one load, and cancel() (called when the tab is hidden)
+drops results that are still in flight.
+"""
+
+import logging
+import threading
+from typing import Any, Callable
+
+log = logging.getLogger("ggm.async_refresh")
+
+# (loader run on the worker, apply(result) run on the Tk thread)
+Step = tuple[Callable[[], Any], Callable[[Any], None]]
+
+
+class AsyncRefresher:
+    """Runs a widget's refresh steps off the Tk thread.
+
+        self._refresher = AsyncRefresher(self)
+        self._refresher.submit([
+            (self.db.get_revenue_stats, self._render_stats),
+            (lambda: self.db.get_todays_jobs(), self._render_jobs),
+        ])
+
+    A loader that raises skips only its own apply step.
+    """
+
+    def __init__(self, widget, name: str = ""):
+        self.widget = widget
+        self.name = name or type(widget).__name__
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending: tuple[int, list[Step]] | None = None
+        self._busy = False
+
+    def submit(self, steps: list[Step]):
+        """Load ``steps`` in the background, replacing any refresh that
+        hasn't been applied yet."""
+        with self._lock:
+            self._generation += 1
+            self._pending = (self._generation, list(steps))
+            if self._busy:
+                return  # the running worker picks this up next
+            self._busy = True
+        threading.Thread(target=self._work, daemon=True,
+                         name=f"Refresh-{self.name}").start()
+
+    def cancel(self):
+        """Discard any refresh still loading or waiting to be applied."""
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+
+    def _is_current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    def _work(self):
+        while True:
+            with self._lock:
+                job, self._pending = self._pending, None
+                if job is None:
+                    self._busy = False
+                    return
+            generation, steps = job
+
+            for load, apply in steps:
+                if not self._is_current(generation):
+                    break  # superseded or cancelled — stop loading
+                try:
+                    value = load()
+                except Exception as e:
+                    log.warning(f"{self.name} loader {getattr(load, '__name__', load)} "
+                                f"failed: {e}")
+                    continue
+                try:
+                    self.widget.after(0, lambda g=generation, a=apply, v=value:
+                                      self._apply(g, a, v))
+                except RuntimeError:
+                    with self._lock:  # window closed while loading
+                        self._pending, self._busy = None, False
+                    return
+
+    # ------------------------------------------------------------------
+    # Tk thread
+    # ------------------------------------------------------------------
+    def _apply(self, generation: int, apply: Callable[[Any], None], value):
+        if not self._is_current(generation):
+            return
+        try:
+            if not self.widget.winfo_exists():
+                return
+            apply(value)
+        except Exception as e:
+            log.warning(f"{self.name} apply {getattr(apply, '__name__', apply)} "
+                        f"failed: {e}")
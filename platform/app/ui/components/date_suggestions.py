@@ -0,0 +1,128 @@
+"""
+Date Suggestions — offers the cheapest-to-serve dates for a new booking.
+Ranks the coming days by the drive time the job adds to each day's route
+(booking_scheduler.suggest_dates) and shows them as pick buttons.
+"""
+
+import logging
+import threading
+
+import customtkinter as ctk
+
+from .. import theme
+from ...booking_scheduler import suggest_dates
+
+log = logging.getLogger("ggm.date_suggestions")
+
+
+class DateSuggestions(ctk.CTkFrame):
+    """
+    A row of suggested dates, best first.
+
+    ┌──────────────────────────────────────────────────────┐
+    │ 📍 Best dates  [Find]  [Tue 21 Oct · +6 min] [...]   │
+    └──────────────────────────────────────────────────────┘
+
+    get_postcode / get_service are read when Find is clicked; on_pick is
+    called with the chosen ISO date.
+    """
+
+    def __init__(self, parent, db, get_postcode, get_service=None,
+                 on_pick=None, count: int = 4, **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+        self.db = db
+        self._get_postcode = get_postcode
+        self._get_service = get_service or (lambda: "")
+        self._on_pick = on_pick
+        self._count = count
+        self._request = 0
+
+        ctk.CTkLabel(
+            self, text="📍 Best dates",
+            font=theme.font(12), text_color=theme.TEXT_DIM,
+        ).pack(side="left", padx=(0, 8))
+
+        self._find_btn = ctk.CTkButton(
+            self, text="Find", width=60, height=28,
+            fg_color=theme.GREEN_PRIMARY, hover_color=theme.GREEN_DARK,
+            corner_radius=6, font=theme.font(11, "bold"),
+            command=self.refresh,
+        )
+        self._find_btn.pack(side="left", padx=(0, 8))
+
+        self._results = ctk.CTkFrame(self, fg_color="transparent")
+        self._results.pack(side="left", fill="x", expand=True)
+
+    def refresh(self):
+        """Rank dates in the background and redraw the buttons."""
+        self._request += 1
+        request = self._request
+        postcode = self._get_postcode().strip()
+        service = self._get_service().strip()
+        self._show_message("Checking routes…")
+
+        def _work():
+            try:
+                results = suggest_dates(self.db, postcode, service,
+                                        limit=self._count)
+            except Exception as e:
+                log.warning(f"Date suggestions failed: {e}")
+                results = None
+            try:
+                self.after(0, lambda: self._render(request, results, postcode))
+            except RuntimeError:
+                pass  # widget closed while ranking
+
+        threading.Thread(target=_work, daemon=True, name="DateSuggest").start()
+
+    def _render(self, request: int, results, postcode: str):
+        # A newer Find click (or a closed modal) supersedes this result
+        if request != self._request or not self.winfo_exists():
+            return
+        if results is None:
+            self._show_message("Couldn't check routes")
+            return
+        if not results:
+            self._show_message("No free dates in range")
+            return
+
+        self._clear()
+        for s in results:
+            minutes = s["added_drive_minutes"]
+            if minutes is None:
+                label = f"{s['display']} · {s['available_slots']} slots"
+                colour = theme.TEXT_LIGHT
+            else:
+                label = f"{s['display']} · +{s['added_drive_text']}"
+                if s["near"]:
+                    label += f" · near {s['near']}"
+                colour = theme.GREEN_LIGHT if s["fits"] else theme.AMBER
+            ctk.CTkButton(
+                self._results, text=label, height=28,
+                fg_color=theme.BG_CARD, hover_color=theme.BG_CARD_HOVER,
+                border_width=1, border_color=colour,
+                text_color=colour, corner_radius=6,
+                font=theme.font(11),
+                command=lambda d=s["date"]: self._pick(d),
+            ).pack(side="left", padx=3, pady=2)
+
+        if postcode and results[0]["added_drive_minutes"] is None:
+            ctk.CTkLabel(
+                self._results, text="(postcode not found — by availability)",
+                font=theme.font(10), text_color=theme.TEXT_DIM,
+            ).pack(side="left", padx=4)
+
+    def _pick(self, date_str: str):
+        if self._on_pick:
+            self._on_pick(date_str)
+
+    def _show_message(self, text: str):
+        self._clear()
+        ctk.CTkLabel(
+            self._results, text=text,
+            font=theme.font(11), text_color=theme.TEXT_DIM,
+        ).pack(side="left")
+
+    def _clear(self):
+        for child in self._results.winfo_children():
+            child.destroy()
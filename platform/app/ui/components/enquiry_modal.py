@@ -7,6 +7,7 @@ import json
 import threading
 from datetime import date, timedelta
 from .. import theme
+from .date_suggestions import DateSuggestions
 from ... import config
 
 
@@ -149,6 +150,14 @@ class EnquiryModal(ctk.CTkToplevel):
                 entry.grid(row=i, column=1, padx=(0, 16), pady=4, sticky="ew")
                 self._fields[key] = entry
 
+        DateSuggestions(
+            form, self.db,
+            get_postcode=lambda: self._fields["postcode"].get(),
+            get_service=lambda: self._fields["service"].get(),
+            on_pick=self._set_preferred_date,
+        ).grid(row=len(fields), column=0, columnspan=2,
+               padx=16, pady=(4, 10), sticky="ew")
+
         # ── Message ──
         msg_frame = ctk.CTkFrame(container, fg_color=theme.BG_CARD, corner_radius=12)
         msg_frame.pack(fill="x", padx=16, pady=8)
@@ -591,6 +600,11 @@ class EnquiryModal(ctk.CTkToplevel):
             widget = getattr(widget, "master", None)
         return None
 
+    def _set_preferred_date(self, date_str: str):
+        entry = self._fields["preferred_date"]
+        entry.delete(0, "end")
+        entry.insert(0, date_str)
+
     def _save_data_from_fields(self):
         """Update enquiry_data from current form field values without saving to DB."""
         for key, widget in self._fields.items():
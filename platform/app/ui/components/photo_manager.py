@@ -17,6 +17,7 @@ from typing import Optional
 
 from .. import theme
 from ... import config
+from ... import http_client
 
 log = logging.getLogger("ggm.photos")
 
@@ -429,17 +430,12 @@ class PhotoManager(ctk.CTkToplevel):
     def _download_and_display(self, file_id, drive_url, frame, placeholder):
         """Download thumbnail from Drive in background, cache it, and update UI."""
         try:
-            import urllib.request
-
             cache_path = CACHE_DIR / f"{file_id}.jpg"
             thumb_url = f"https://drive.google.com/thumbnail?id={file_id}&sz=w400"
 
-            req = urllib.request.Request(thumb_url, headers={
+            http_client.download(thumb_url, cache_path, timeout=10, headers={
                 "User-Agent": "Mozilla/5.0 GGM-Hub/3.0"
             })
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                with open(str(cache_path), "wb") as f:
-                    f.write(resp.read())
 
             if HAS_PIL and self.winfo_exists():
                 img = Image.open(str(cache_path))
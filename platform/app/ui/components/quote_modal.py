@@ -9,6 +9,7 @@ Features:
 - Auto 10% deposit
 - Discount % and flat amount support
 - Not-VAT-registered notice
+- Proposed visit dates ranked by added drive time
 """
 
 import customtkinter as ctk
@@ -17,6 +18,7 @@ import logging
 import threading
 from datetime import date, timedelta
 from .. import theme
+from .date_suggestions import DateSuggestions
 from ... import config
 from ...pricing import (
     SERVICE_CATALOGUE, get_service_keys, display_name_from_key,
@@ -364,9 +366,16 @@ class QuoteModal(ctk.CTkToplevel):
             notes_frame, height=80,
             fg_color=theme.BG_INPUT, corner_radius=8, font=theme.font(12),
         )
-        self.notes_box.pack(fill="x", padx=16, pady=(0, 12))
+        self.notes_box.pack(fill="x", padx=16, pady=(0, 6))
         self.notes_box.insert("1.0", self.quote_data.get("notes", "") or "")
 
+        DateSuggestions(
+            notes_frame, self.db,
+            get_postcode=lambda: self._fields["postcode"].get(),
+            get_service=self._quote_service,
+            on_pick=self._propose_date,
+        ).pack(fill="x", padx=16, pady=(0, 12))
+
         # ── Actions (in fixed footer) ──
         self._build_actions(self._footer)
 
@@ -1008,6 +1017,27 @@ class QuoteModal(ctk.CTkToplevel):
             })
         return items
 
+    def _quote_service(self) -> str:
+        """First line item naming a known service (for its duration)."""
+        for item in self._collect_items():
+            desc = item["description"].lower()
+            for service in config.SERVICE_DURATIONS:
+                if service.lower() in desc:
+                    return service
+        return ""
+
+    def _propose_date(self, date_str: str):
+        """Write the picked date into the notes as the proposed visit."""
+        try:
+            shown = date.fromisoformat(date_str).strftime("%a %d %b %Y")
+        except ValueError:
+            shown = date_str
+        lines = [ln for ln in self.notes_box.get("1.0", "end").strip().splitlines()
+                 if not ln.startswith("Proposed visit date:")]
+        lines.append(f"Proposed visit date: {shown}")
+        self.notes_box.delete("1.0", "end")
+        self.notes_box.insert("1.0", "\n".join(lines).strip())
+
     # ──────────────────────────────────────────────────────────────
     # Save / Send / Status
     # ──────────────────────────────────────────────────────────────
@@ -0,0 +1,155 @@
+"""
+Round Plan Dialog — review and accept the round planner's proposed
+subscription day changes.
+"""
+
+import logging
+import threading
+
+import customtkinter as ctk
+
+from .. import theme
+from ...distance import format_drive_time
+from ...round_planner import RoundPlanner, apply_moves, load_proposal
+
+log = logging.getLogger("ggm.round_plan_dialog")
+
+
+class RoundPlanDialog(ctk.CTkToplevel):
+    """Shows the stored proposal as a diff with a tick box per move."""
+
+    def __init__(self, parent, db, sync, api=None, on_apply=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.db = db
+        self.sync = sync
+        self.api = api
+        self.on_apply = on_apply
+        self._checks = []
+
+        self.title("Subscription Round Plan")
+        self.geometry("620x560")
+        self.configure(fg_color=theme.BG_DARK)
+        self.transient(parent)
+
+        self.update_idletasks()
+        px = parent.winfo_rootx() + (parent.winfo_width() - 620) // 2
+        py = parent.winfo_rooty() + (parent.winfo_height() - 560) // 2
+        self.geometry(f"+{max(px,0)}+{max(py,0)}")
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._summary = ctk.CTkLabel(
+            self, text="", justify="left", anchor="w",
+            font=theme.font(12), text_color=theme.TEXT_LIGHT,
+        )
+        self._summary.grid(row=0, column=0, sticky="ew", padx=16, pady=(16, 8))
+
+        self._body = ctk.CTkScrollableFrame(self, fg_color=theme.BG_DARK)
+        self._body.grid(row=1, column=0, sticky="nsew", padx=8)
+
+        footer = ctk.CTkFrame(self, fg_color=theme.BG_DARKER)
+        footer.grid(row=2, column=0, sticky="ew")
+
+        self._replan_btn = ctk.CTkButton(
+            footer, text="🔄 Re-plan", width=110, height=32,
+            fg_color=theme.BG_CARD, hover_color=theme.BG_CARD_HOVER,
+            corner_radius=8, font=theme.font(12),
+            command=self._replan,
+        )
+        self._replan_btn.pack(side="left", padx=16, pady=10)
+
+        self._apply_btn = theme.create_accent_button(
+            footer, "✅ Apply selected", width=150,
+            command=self._apply,
+        )
+        self._apply_btn.pack(side="right", padx=16, pady=10)
+
+        self._show(load_proposal(self.db))
+
+    def _show(self, proposal: dict):
+        for child in self._body.winfo_children():
+            child.destroy()
+        self._checks = []
+
+        if not proposal:
+            self._summary.configure(text="No round plan yet — click Re-plan to check "
+                                         "the subscription days.")
+            self._apply_btn.configure(state="disabled")
+            return
+
+        moves = proposal.get("moves", [])
+        before = proposal.get("before_minutes_per_week", 0)
+        text = f"{proposal.get('week_display', '')}\n"
+        if moves:
+            after = before - sum(m["saved_minutes_per_week"] for m in moves)
+            text += (f"Weekly driving: {format_drive_time(before)} → "
+                     f"{format_drive_time(max(after, 0))}")
+        else:
+            text += f"Weekly driving: {format_drive_time(before)} — no changes proposed"
+        self._summary.configure(text=text)
+        self._apply_btn.configure(state="normal" if moves else "disabled")
+
+        for m in moves:
+            row = ctk.CTkFrame(self._body, fg_color=theme.BG_CARD, corner_radius=8)
+            row.pack(fill="x", padx=8, pady=3)
+
+            var = ctk.BooleanVar(value=True)
+            ctk.CTkCheckBox(
+                row, text="", variable=var, width=24,
+                fg_color=theme.GREEN_PRIMARY, hover_color=theme.GREEN_DARK,
+            ).pack(side="left", padx=(10, 4), pady=8)
+            self._checks.append((var, m))
+
+            info = ctk.CTkFrame(row, fg_color="transparent")
+            info.pack(side="left", fill="x", expand=True, pady=6)
+            ctk.CTkLabel(
+                info, text=f"{m['name']} · {m['postcode']}",
+                font=theme.font_bold(12), text_color=theme.TEXT_LIGHT, anchor="w",
+            ).pack(fill="x")
+            ctk.CTkLabel(
+                info, text=f"{m['service']} ({m['frequency']})",
+                font=theme.font(11), text_color=theme.TEXT_DIM, anchor="w",
+            ).pack(fill="x")
+
+            ctk.CTkLabel(
+                row, text=f"- {m['from_day']}\n+ {m['to_day']}",
+                font=theme.font(12), text_color=theme.AMBER, justify="left",
+            ).pack(side="left", padx=12)
+            ctk.CTkLabel(
+                row, text=f"−{m['saved_minutes_per_week']} min/wk",
+                font=theme.font_bold(12), text_color=theme.GREEN_LIGHT,
+            ).pack(side="right", padx=12)
+
+    def _replan(self):
+        self._replan_btn.configure(state="disabled", text="Planning…")
+
+        def _work():
+            try:
+                proposal = RoundPlanner(self.db, self.api).run()
+            except Exception as e:
+                log.warning(f"Round planning failed: {e}")
+                proposal = None
+            self.after(0, lambda: self._replan_done(proposal))
+
+        threading.Thread(target=_work, daemon=True, name="RoundPlan").start()
+
+    def _replan_done(self, proposal):
+        if not self.winfo_exists():
+            return
+        self._replan_btn.configure(state="normal", text="🔄 Re-plan")
+        if proposal is None:
+            self._summary.configure(text="Round planning failed — see the log.")
+            return
+        self._show(proposal)
+
+    def _apply(self):
+        chosen = [m for var, m in self._checks if var.get()]
+        if not chosen:
+            return
+        applied = apply_moves(self.db, self.sync, chosen)
+        log.info(f"Applied {applied} of {len(chosen)} round plan moves")
+        if self.on_apply:
+            self.on_apply(applied)
+        self._show(load_proposal(self.db))
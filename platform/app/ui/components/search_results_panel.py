@@ -0,0 +1,148 @@
+"""
+Search Results Panel — dropdown showing ranked global search hits.
+Appears below the top-bar search box when the user presses Enter.
+"""
+
+import customtkinter as ctk
+from .. import theme
+
+
+# source_table -> (icon, label)
+SOURCE_LABELS = {
+    "clients":    ("👤", "Client"),
+    "invoices":   ("🧾", "Invoice"),
+    "quotes":     ("📝", "Quote"),
+    "enquiries":  ("📩", "Enquiry"),
+    "inbox":      ("📧", "Email"),
+    "blog_posts": ("✍️", "Blog post"),
+}
+
+
+class SearchResultsPanel(ctk.CTkToplevel):
+    """
+    A dropdown list of search results anchored to the search entry.
+    Results arrive already ranked from Database.search().
+    """
+
+    def __init__(self, parent, query: str, results: list[dict], on_click=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self._query = query
+        self._results = results
+        self._on_click = on_click
+
+        # ── Window setup — borderless dropdown ──
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.configure(fg_color=theme.BG_DARKER)
+        self.geometry("420x460")
+
+        self.update_idletasks()
+
+        self._build_ui()
+
+        # Close when clicking outside or pressing Escape
+        self.bind("<FocusOut>", lambda e: self.after(200, self._maybe_close))
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def position_near(self, widget):
+        """Position the panel below the given widget."""
+        self.update_idletasks()
+        x = widget.winfo_rootx()
+        y = widget.winfo_rooty() + widget.winfo_height() + 4
+        self.geometry(f"420x460+{x}+{y}")
+
+    def _build_ui(self):
+        """Build the panel layout."""
+        border = ctk.CTkFrame(self, fg_color=theme.GREEN_PRIMARY, corner_radius=12)
+        border.pack(fill="both", expand=True, padx=1, pady=1)
+
+        inner = ctk.CTkFrame(border, fg_color=theme.BG_DARKER, corner_radius=11)
+        inner.pack(fill="both", expand=True, padx=1, pady=1)
+
+        # Header
+        header = ctk.CTkFrame(inner, fg_color=theme.BG_CARD, corner_radius=0, height=46)
+        header.pack(fill="x")
+        header.pack_propagate(False)
+        header.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(
+            header,
+            text=f"🔍 “{self._query}”",
+            font=theme.font_bold(14),
+            text_color=theme.TEXT_LIGHT,
+            anchor="w",
+        ).grid(row=0, column=0, padx=14, pady=10, sticky="w")
+
+        ctk.CTkLabel(
+            header,
+            text=f"{len(self._results)} result{'s' if len(self._results) != 1 else ''}",
+            font=theme.font(11),
+            text_color=theme.GREEN_LIGHT,
+        ).grid(row=0, column=1, padx=(4, 14), pady=10)
+
+        # Scrollable result list
+        self._list = ctk.CTkScrollableFrame(
+            inner,
+            fg_color="transparent",
+            scrollbar_button_color=theme.BG_CARD,
+        )
+        self._list.pack(fill="both", expand=True, padx=4, pady=4)
+        self._list.grid_columnconfigure(0, weight=1)
+
+        for result in self._results:
+            self._create_result_row(result)
+
+    def _create_result_row(self, result: dict):
+        """Create a single result row."""
+        icon, label = SOURCE_LABELS.get(result.get("source_table", ""), ("🔹", "Record"))
+
+        row = ctk.CTkFrame(self._list, fg_color=theme.BG_CARD, corner_radius=8, cursor="hand2")
+        row.pack(fill="x", pady=2, padx=2)
+        row.grid_columnconfigure(0, weight=1)
+
+        name = result.get("name") or result.get("email") or "(no name)"
+        title_label = ctk.CTkLabel(
+            row,
+            text=f"{icon} {name}",
+            font=theme.font_bold(12),
+            text_color=theme.TEXT_LIGHT,
+            anchor="w",
+        )
+        title_label.grid(row=0, column=0, sticky="ew", padx=(10, 8), pady=(8, 0))
+
+        ctk.CTkLabel(
+            row, text=label,
+            font=theme.font(10),
+            text_color=theme.GREEN_LIGHT,
+            anchor="e",
+        ).grid(row=0, column=1, padx=(4, 10), pady=(8, 0), sticky="e")
+
+        # Matching context — strip the ** highlight markers for display
+        details = " ".join((result.get("details_hl") or "").replace("**", "").split())
+        sub_label = ctk.CTkLabel(
+            row,
+            text=details or result.get("email", ""),
+            font=theme.font(11),
+            text_color=theme.TEXT_DIM,
+            anchor="w",
+            wraplength=340,
+            justify="left",
+        )
+        sub_label.grid(row=1, column=0, columnspan=2, sticky="ew", padx=(10, 8), pady=(0, 8))
+
+        def on_click(event, r=result):
+            if self._on_click:
+                self._on_click(r)
+            self.destroy()
+
+        for widget in (row, title_label, sub_label):
+            widget.bind("<Button-1>", on_click)
+
+    def _maybe_close(self):
+        """Close the panel if it lost focus."""
+        try:
+            if not self.focus_get():
+                self.destroy()
+        except Exception:
+            self.destroy()
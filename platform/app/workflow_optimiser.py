@@ -250,8 +250,55 @@ class WorkflowOptimiser:
                 "action": "Use Schedule → Generate to auto-cluster by postcode area.",
             })
 
+        insights.extend(self._analyse_drive_time(jobs_by_date))
         return insights
 
+    def _analyse_drive_time(self, jobs_by_date: dict) -> list:
+        """Estimated driving per multi-job day, from one distance matrix
+        over every geocoded postcode in the period."""
+        from .distance import bulk_lookup
+        from .distance_matrix import matrix_for_geos
+
+        days = {d: pcs for d, pcs in jobs_by_date.items() if len(pcs) >= 2}
+        if not days:
+            return []
+
+        try:
+            postcodes = sorted({pc for pcs in days.values() for pc in pcs})
+            geo_by_pc = dict(zip(postcodes, bulk_lookup(postcodes)))
+            matrix = matrix_for_geos(list(geo_by_pc.values()))
+        except Exception as e:
+            log.warning(f"Drive-time analysis skipped: {e}")
+            return []
+
+        day_minutes = []
+        for pcs in days.values():
+            stops = {matrix.index(geo_by_pc[pc]["postcode"])
+                     for pc in pcs if geo_by_pc.get(pc)}
+            if len(stops) >= 2:
+                order = matrix.nearest_neighbour(sorted(stops))
+                day_minutes.append(matrix.route_minutes(order))
+
+        if not day_minutes:
+            return []
+
+        avg = sum(day_minutes) / len(day_minutes)
+        long_days = sum(1 for m in day_minutes if m > 120)
+        if avg <= 60 and not long_days:
+            return []
+
+        return [{
+            "category": "routes",
+            "severity": "high" if long_days > 2 else "medium",
+            "title": "High Driving Time on Multi-Job Days",
+            "detail": (
+                f"Across {len(day_minutes)} multi-job days, estimated driving averaged "
+                f"{avg:.0f} minutes per day (base → jobs → base). "
+                f"{long_days} day(s) needed over 2 hours behind the wheel."
+            ),
+            "action": "Use the day planner's route order and group nearby postcodes on the same day.",
+        }]
+
     def _analyse_revenue(self, data: dict) -> list:
         """Analyse revenue patterns and profitability."""
         insights = []
@@ -40,6 +40,9 @@ CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(name);
 CREATE INDEX IF NOT EXISTS idx_clients_email ON clients(email);
 CREATE INDEX IF NOT EXISTS idx_clients_status ON clients(status);
 CREATE INDEX IF NOT EXISTS idx_clients_service ON clients(service);
+-- Natural key for the hub's bulk mirror upserts (on_conflict) —
+-- uq_clients_sheets_row is built after the Enquiries table below, once
+-- duplicate rows from the old mirror have been merged.
 
 -- ─────────────────────────────────────────────────────────────
 -- Schedule (generated visit schedule)
@@ -150,6 +153,42 @@ CREATE TABLE IF NOT EXISTS enquiries (
 CREATE INDEX IF NOT EXISTS idx_enquiries_status ON enquiries(status);
 CREATE INDEX IF NOT EXISTS idx_enquiries_date ON enquiries(date);
 
+-- Migration order for existing projects: the old mirror inserted a new
+-- row on every sync, so duplicates per legacy_sheets_row must be removed
+-- BEFORE each unique index is built. Runs after schedule/invoices/quotes
+-- exist so their client_id references can be repointed to the kept row.
+-- Clients: keep the newest row per legacy_sheets_row
+CREATE TEMP TABLE clients_dedup AS
+SELECT id, keep_id FROM (
+    SELECT id, FIRST_VALUE(id) OVER (
+               PARTITION BY legacy_sheets_row
+               ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id
+           ) AS keep_id
+    FROM clients
+    WHERE legacy_sheets_row IS NOT NULL
+) ranked
+WHERE id <> keep_id;
+UPDATE schedule t SET client_id = d.keep_id FROM clients_dedup d WHERE t.client_id = d.id;
+UPDATE invoices t SET client_id = d.keep_id FROM clients_dedup d WHERE t.client_id = d.id;
+UPDATE quotes t SET client_id = d.keep_id FROM clients_dedup d WHERE t.client_id = d.id;
+DELETE FROM clients c USING clients_dedup d WHERE c.id = d.id;
+DROP TABLE clients_dedup;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_clients_sheets_row ON clients(legacy_sheets_row);
+
+-- Enquiries: keep the newest row per legacy_sheets_row before the unique
+-- index (nothing references enquiries)
+DELETE FROM enquiries e
+USING (
+    SELECT id, ROW_NUMBER() OVER (
+               PARTITION BY legacy_sheets_row
+               ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id
+           ) AS rn
+    FROM enquiries
+    WHERE legacy_sheets_row IS NOT NULL
+) ranked
+WHERE e.id = ranked.id AND ranked.rn > 1;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_enquiries_sheets_row ON enquiries(legacy_sheets_row);
+
 -- ─────────────────────────────────────────────────────────────
 -- Business Costs (monthly expense tracking)
 -- ─────────────────────────────────────────────────────────────